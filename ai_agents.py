@@ -4,10 +4,15 @@
 # ======================================
 
 import random
-import openai
 import os
-from typing import Dict, List, Tuple, Optional
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from queue import Empty, Queue
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+from llm_cache import cache_key, get_cached_reply, store_reply
+from llm_client import LLM_DEADLINE_SECONDS, chat_completion, stream_chat
 
 # -------------------------------
 # AGE RANGE SYSTEM
@@ -324,26 +329,28 @@ PERSPECTIVE_SHIFT_PROMPTS = [
 # AI RESPONSE GENERATION
 # -------------------------------
 
-def generate_council_discussion(
-    situation: str, 
-    age_profile: Dict,
-    num_perspectives: int = 3
-) -> List[Dict]:
-    """
-    Generate a multi-perspective council discussion about a situation.
-    Returns a list of council member responses.
-    """
-    openai.api_key = os.environ.get("OPENAI_API_KEY")
-    
-    # Select council members for this discussion
-    selected_members = random.sample(list(COUNCIL_MEMBERS.keys()), min(num_perspectives, len(COUNCIL_MEMBERS)))
-    
-    discussions = []
-    
-    for member_key in selected_members:
-        member = COUNCIL_MEMBERS[member_key]
-        
-        system_prompt = f"""You are {member['name']}, a cosmic council member.
+# Council, debate and background stream calls in flight at once, shared by every
+# session in the process. A streamed reply holds its worker until its last token,
+# so this is sized for streaming: visitors at once x up to 5 members each. Workers
+# are only started when needed and mostly wait on the network.
+COUNCIL_MAX_CONCURRENCY = int(os.environ.get("COUNCIL_MAX_CONCURRENCY", "64"))
+_council_executor = ThreadPoolExecutor(max_workers=COUNCIL_MAX_CONCURRENCY, thread_name_prefix="council")
+# Longest the page waits on the council pool for a reply's next words (or a whole
+# reply) before it shows what it has, or the fallback, and moves on
+COUNCIL_WAIT_SECONDS = float(os.environ.get("COUNCIL_WAIT_SECONDS", str(LLM_DEADLINE_SECONDS)))
+
+# Appended to a reply with a fallback when its stream breaks off part-way
+REPLY_INTERRUPTED_NOTE = " *...the transmission breaks off.*"
+
+class ReplyInterrupted(RuntimeError):
+    """A streamed reply broke off part-way; `partial` is the text that arrived."""
+
+    def __init__(self, partial: str):
+        super().__init__("The reply was cut off before it finished.")
+        self.partial = partial
+
+def _council_system_prompt(member: Dict, age_profile: Dict) -> str:
+    return f"""You are {member['name']}, a cosmic council member.
         
 Archetype: {member['archetype']}
 Core Value: {member['core_value']}
@@ -365,28 +372,495 @@ Your task: Offer your unique perspective on the situation. Stay true to your arc
 Be brief but insightful. Add a thought-provoking question at the end.
 Do NOT solve the problem for them - help them see it differently."""
 
+def complete_chat(
+    messages: List[Dict],
+    temperature: float,
+    max_tokens: int,
+    age_profile_key: Optional[str] = None,
+    model: str = "gpt-3.5-turbo"
+) -> str:
+    """
+    The model's reply to `messages`, reused from the response cache when the
+    same prompt (for the same age profile) was answered recently.
+    """
+    key = cache_key(model, messages, temperature, age_profile_key)
+    reply = get_cached_reply(key)
+    if reply is None:
+        reply = chat_completion(messages, temperature, max_tokens, model=model)
+        store_reply(key, reply)
+    return reply
+
+def stream_chat_completion(
+    messages: List[Dict],
+    temperature: float,
+    max_tokens: int,
+    fallback: Optional[str] = None,
+    age_profile_key: Optional[str] = None,
+    model: str = "gpt-3.5-turbo"
+) -> Iterator[str]:
+    """
+    Yield the reply's text as the model produces it (all at once when it is
+    cached). If the call fails before any text arrives, yield `fallback`
+    instead (or raise if None). A failure part-way through ends the reply
+    with REPLY_INTERRUPTED_NOTE when there is a fallback, and otherwise
+    raises ReplyInterrupted; only complete replies are cached.
+    """
+    key = cache_key(model, messages, temperature, age_profile_key)
+    reply = get_cached_reply(key)
+    if reply is not None:
+        yield reply
+        return
+
+    parts = []
+    try:
+        for token in stream_chat(messages, temperature, max_tokens, model=model):
+            parts.append(token)
+            yield token
+    except Exception as e:
+        if parts:
+            if fallback is None:
+                raise ReplyInterrupted("".join(parts)) from e
+            yield REPLY_INTERRUPTED_NOTE
+            return
+        if fallback is None:
+            raise
+        yield fallback
+        return
+    store_reply(key, "".join(parts))
+
+def _stream_in_background(tokens: Iterator[str], fallback: str) -> Iterator[str]:
+    """
+    Read `tokens` on the council pool now; the returned iterator replays them
+    as they land. If nothing lands for COUNCIL_WAIT_SECONDS it ends the reply
+    with REPLY_INTERRUPTED_NOTE, or with `fallback` if it never started.
+    """
+    queue = Queue()
+    # When the pump last made progress; a stall is timed from here, not from when reading starts
+    active_at = [time.monotonic()]
+
+    def pump():
         try:
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Please share your perspective on this situation:\n\n{situation}"}
-                ],
+            for token in tokens:
+                active_at[0] = time.monotonic()
+                queue.put(token)
+            queue.put(None)
+        except Exception as e:
+            queue.put(e)
+
+    _council_executor.submit(pump)
+
+    def replay():
+        started = False
+        while True:
+            try:
+                item = queue.get(timeout=max(active_at[0] + COUNCIL_WAIT_SECONDS - time.monotonic(), 0))
+            except Empty:
+                if time.monotonic() - active_at[0] < COUNCIL_WAIT_SECONDS:
+                    continue
+                yield REPLY_INTERRUPTED_NOTE if started else fallback
+                return
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            started = True
+            yield item
+
+    return replay()
+
+def _council_messages(member: Dict, situation: str, age_profile: Dict) -> List[Dict]:
+    return [
+        {"role": "system", "content": _council_system_prompt(member, age_profile)},
+        {"role": "user", "content": f"Please share your perspective on this situation:\n\n{situation}"}
+    ]
+
+def _ask_council_member(member: Dict, situation: str, age_profile: Dict) -> Dict:
+    """One member's response, or their meditating fallback if the call fails."""
+    try:
+        return {
+            "member": member,
+            "response": complete_chat(
+                _council_messages(member, situation, age_profile),
                 temperature=0.85,
-                max_tokens=age_profile['max_response_length'] + 50
+                max_tokens=age_profile['max_response_length'] + 50,
+                age_profile_key=age_profile['key']
             )
-            
-            discussions.append({
-                "member": member,
-                "response": response.choices[0].message.content
-            })
-        except Exception as e:
-            discussions.append({
-                "member": member,
-                "response": f"*{member['name']} is meditating on this...*"
+        }
+    except Exception as e:
+        return {
+            "member": member,
+            "response": f"*{member['name']} is meditating on this...*"
+        }
+
+def consult_council(members: List[Dict], situation: str, age_profile: Dict) -> List[Dict]:
+    """
+    Ask every member at once; responses come back in the order of `members`.
+    Members still working after COUNCIL_WAIT_SECONDS are left meditating.
+    """
+    futures = [_council_executor.submit(_ask_council_member, member, situation, age_profile) for member in members]
+    deadline = time.monotonic() + COUNCIL_WAIT_SECONDS
+    discussions = []
+    for member, future in zip(members, futures):
+        try:
+            discussions.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        except FutureTimeout:
+            future.cancel()
+            discussions.append({"member": member, "response": f"*{member['name']} is meditating on this...*"})
+    return discussions
+
+def stream_council(members: List[Dict], situation: str, age_profile: Dict) -> List[Iterator[str]]:
+    """
+    Ask every member at once, streaming. Returns one token iterator per
+    member, in the order of `members`; later members keep generating while
+    earlier ones are being read, so each is ready to show when its turn comes.
+    """
+    return [
+        _stream_in_background(stream_chat_completion(
+            _council_messages(member, situation, age_profile),
+            temperature=0.85,
+            max_tokens=age_profile['max_response_length'] + 50,
+            fallback=f"*{member['name']} is meditating on this...*",
+            age_profile_key=age_profile['key']
+        ), f"*{member['name']} is meditating on this...*")
+        for member in members
+    ]
+
+def select_council_members(num_perspectives: int = 3) -> List[Dict]:
+    """A random selection of distinct council members."""
+    selected_members = random.sample(list(COUNCIL_MEMBERS.keys()), min(num_perspectives, len(COUNCIL_MEMBERS)))
+    return [COUNCIL_MEMBERS[key] for key in selected_members]
+
+def generate_council_discussion(
+    situation: str, 
+    age_profile: Dict,
+    num_perspectives: int = 3
+) -> List[Dict]:
+    """
+    Generate a multi-perspective council discussion about a situation.
+    Returns a list of council member responses.
+    """
+    return consult_council(select_council_members(num_perspectives), situation, age_profile)
+
+# A debater hears the last DEBATE_CONTEXT_TURNS statements, cut to
+# DEBATE_CONTEXT_CHARS characters each, so their turn can start as soon as
+# those statements have streamed that far
+DEBATE_CONTEXT_TURNS = 3
+DEBATE_CONTEXT_CHARS = 200
+# Recent debates kept for stage timing metrics
+DEBATE_TIMING_SAMPLES = 200
+
+def _debate_messages(topic: str, age_profile: Dict, member: Dict, round_num: int, debate: List[Dict]) -> List[Dict]:
+    """A debater's prompt, answering the last few statements before theirs."""
+    # Build context from previous statements
+    context = ""
+    if debate:
+        context = "\n\nPrevious statements:\n" + "\n".join([
+            f"{d['member']['name']}: {d['statement'][:DEBATE_CONTEXT_CHARS]}..."
+            for d in debate[-DEBATE_CONTEXT_TURNS:]
+        ])
+    
+    system_prompt = f"""You are {member['name']}, participating in a friendly cosmic debate.
+
+Archetype: {member['archetype']}
+Core Value: {member['core_value']}
+Speaking Style: {member['speaking_style']}
+Perspective Approach: {member['perspective_approach']}
+
+The listener is {age_profile['label']} (age {age_profile['user_age']}).
+{age_profile['content_guidelines']}
+
+DEBATE RULES:
+- Respectfully engage with other viewpoints
+- Stay true to your unique perspective
+- Build on or thoughtfully disagree with previous points
+- Keep responses brief ({age_profile['max_response_length']} words max)
+- Model healthy disagreement - be curious, not combative
+- Use your signature speaking style
+- End with a thought-provoking insight or question
+
+This is round {round_num + 1} of the debate."""
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"The topic: {topic}{context}"}
+    ]
+
+class _DebateStage:
+    """One streamed reply in a debate, readable while it is still being generated."""
+
+    def __init__(self, label: str, entry: Dict, fallback: str):
+        self.label = label
+        self.entry = entry
+        self.fallback = fallback
+        self.done = False
+        self.stalled = False
+        # Seconds from the start of the debate
+        self.issued_at = self.first_token_at = self.done_at = None
+        # When it was issued or last received text; a stall is timed from here
+        self.active_at = None
+        self._changed = threading.Condition()
+
+    def add(self, token: str, now: float) -> bool:
+        """Append a token; True when this is what gives the next turns their context."""
+        with self._changed:
+            if self.done:
+                # Given up on as stalled; late text is dropped
+                return False
+            before = len(self.entry['statement'])
+            if self.first_token_at is None:
+                self.first_token_at = now
+            self.active_at = now
+            self.entry['statement'] += token
+            self._changed.notify_all()
+            return before < DEBATE_CONTEXT_CHARS <= len(self.entry['statement'])
+
+    def finish(self, now: float):
+        with self._changed:
+            if not self.done:
+                self.done = True
+                self.done_at = now
+                self._changed.notify_all()
+
+    def give_up(self, now: float):
+        """End a stalled reply with REPLY_INTERRUPTED_NOTE, or with the fallback if it never started."""
+        with self._changed:
+            if self.done:
+                return
+            self.entry['statement'] += REPLY_INTERRUPTED_NOTE if self.entry['statement'] else self.fallback
+            self.stalled = True
+            self.finish(now)
+
+    def has_context(self) -> bool:
+        return self.done or len(self.entry['statement']) >= DEBATE_CONTEXT_CHARS
+
+    def tokens(self, now: Callable[[], float]) -> Iterator[str]:
+        """
+        The text so far, then the rest as it arrives. If nothing arrives for
+        COUNCIL_WAIT_SECONDS (counted from when the stage was issued or last
+        received text, else from when reading began) it is given up on.
+        """
+        sent = 0
+        reading_from = now()
+        while True:
+            with self._changed:
+                while not (self.done or len(self.entry['statement']) > sent):
+                    since = self.active_at if self.active_at is not None else reading_from
+                    remaining = since + COUNCIL_WAIT_SECONDS - now()
+                    if remaining <= 0:
+                        self.give_up(now())
+                        break
+                    self._changed.wait(remaining)
+                text, done = self.entry['statement'], self.done
+            if len(text) > sent:
+                yield text[sent:]
+                sent = len(text)
+            elif done:
+                return
+
+_debate_timings = deque(maxlen=DEBATE_TIMING_SAMPLES)
+_debate_timings_lock = threading.Lock()
+
+class DebatePipeline:
+    """
+    A multi-round debate between council members, generated as a pipeline.
+    Each turn is issued on the council pool as soon as the statements it
+    answers have streamed far enough to quote, rather than after they
+    finish, and the synthesis starts the moment the last statement is
+    complete (usually while the page is still showing the final round).
+        pipeline = DebatePipeline(topic, age_profile, rounds).start()
+        for entry, tokens in pipeline.turns(): ...
+        for token in pipeline.synthesis_tokens(): ...
+    """
+
+    def __init__(self, topic: str, age_profile: Dict, rounds: int = 2, num_debaters: int = 3,
+                 synthesize: bool = True):
+        self.topic = topic
+        self.age_profile = age_profile
+        debaters = random.sample(list(COUNCIL_MEMBERS.keys()), min(num_debaters, len(COUNCIL_MEMBERS)))
+        self.stages = [
+            _DebateStage(
+                f"Round {round_num + 1} • {COUNCIL_MEMBERS[key]['name']}",
+                {"member": COUNCIL_MEMBERS[key], "statement": "", "round": round_num + 1},
+                f"*{COUNCIL_MEMBERS[key]['name']} pauses to gather thoughts...*"
+            )
+            for round_num in range(rounds)
+            for key in debaters
+        ]
+        self.synthesis = _DebateStage(
+            "Synthesis", {"statement": ""}, "The cosmic synthesis is still forming... Please try again! ✨"
+        ) if synthesize else None
+        self._started = None
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    @property
+    def debate(self) -> List[Dict]:
+        return [stage.entry for stage in self.stages]
+
+    def start(self) -> "DebatePipeline":
+        self._started = time.perf_counter()
+        self._issue_ready()
+        return self
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._started
+
+    def _issue_ready(self):
+        """Issue every stage whose inputs are now available."""
+        ready = []
+        with self._lock:
+            for i, stage in enumerate(self.stages):
+                answered = self.stages[max(0, i - DEBATE_CONTEXT_TURNS):i]
+                if stage.issued_at is None and all(s.has_context() for s in answered):
+                    stage.issued_at = stage.active_at = self._now()
+                    ready.append((self._run_turn, i))
+            if self.synthesis and self.synthesis.issued_at is None and all(s.done for s in self.stages):
+                self.synthesis.issued_at = self.synthesis.active_at = self._now()
+                ready.append((self._run_synthesis,))
+        for job in ready:
+            _council_executor.submit(*job)
+
+    def _stream_into(self, stage: _DebateStage, tokens: Iterator[str]):
+        try:
+            for token in tokens:
+                if stage.add(token, self._now()):
+                    self._issue_ready()
+        finally:
+            stage.finish(self._now())
+            self._issue_ready()
+            self._record_if_finished()
+
+    def _run_turn(self, i: int):
+        stage = self.stages[i]
+        member = stage.entry['member']
+        answered = [dict(s.entry) for s in self.stages[max(0, i - DEBATE_CONTEXT_TURNS):i]]
+        self._stream_into(stage, stream_chat_completion(
+            _debate_messages(self.topic, self.age_profile, member, stage.entry['round'] - 1, answered),
+            temperature=0.9,
+            max_tokens=self.age_profile['max_response_length'] + 50,
+            fallback=f"*{member['name']} pauses to gather thoughts...*",
+            age_profile_key=self.age_profile['key']
+        ))
+
+    def _run_synthesis(self):
+        self._stream_into(self.synthesis, stream_debate_synthesis(self.topic, self.debate, self.age_profile))
+
+    def _read(self, stage: _DebateStage) -> Iterator[str]:
+        yield from stage.tokens(self._now)
+        if stage.stalled:
+            # The stages waiting on it can go ahead without it
+            self._issue_ready()
+            self._record_if_finished()
+
+    def turns(self) -> Iterator[Tuple[Dict, Iterator[str]]]:
+        """(entry, tokens) for each turn in order; entry['statement'] fills in as tokens arrive."""
+        for stage in self.stages:
+            yield stage.entry, self._read(stage)
+
+    def synthesis_tokens(self) -> Iterator[str]:
+        return self._read(self.synthesis)
+
+    def wait(self) -> List[Dict]:
+        """Block until every stage is done (or given up on as stalled); returns the debate."""
+        for stage in self.stages + ([self.synthesis] if self.synthesis else []):
+            for _ in self._read(stage):
+                pass
+        return self.debate
+
+    def stage_timings(self) -> List[Dict]:
+        """When each stage was issued, first spoke and finished (seconds from start)."""
+        return [
+            {
+                "stage": stage.label,
+                "issued_s": stage.issued_at,
+                "first_token_s": stage.first_token_at,
+                "done_s": stage.done_at,
+            }
+            for stage in self.stages + ([self.synthesis] if self.synthesis else [])
+        ]
+
+    def _record_if_finished(self):
+        stages = self.stages + ([self.synthesis] if self.synthesis else [])
+        with self._lock:
+            if self._recorded or not all(s.done for s in stages):
+                return
+            self._recorded = True
+        total = max(s.done_at for s in stages)
+        with _debate_timings_lock:
+            _debate_timings.append({
+                "turns": len(self.stages),
+                "first_words_s": self.stages[0].first_token_at if self.stages else 0.0,
+                "turn_gap_s": (self.stages[-1].issued_at / (len(self.stages) - 1)) if len(self.stages) > 1 else 0.0,
+                "synthesis_issued_s": self.synthesis.issued_at if self.synthesis else None,
+                "total_s": total,
+                # Time the stages would have taken one after another
+                "serial_s": sum(s.done_at - s.issued_at for s in stages),
             })
+
+def reset_debate_metrics():
+    with _debate_timings_lock:
+        _debate_timings.clear()
+
+def debate_metrics() -> Dict:
+    """Stage timings over recent debates (seconds)."""
+    with _debate_timings_lock:
+        timings = list(_debate_timings)
+
+    def average(key: str) -> float:
+        values = [t[key] for t in timings if t[key] is not None]
+        return sum(values) / len(values) if values else 0.0
+
+    first_words = sorted(t["first_words_s"] for t in timings)
+    return {
+        "debates": len(timings),
+        "first_words_avg_s": average("first_words_s"),
+        "first_words_p95_s": first_words[min(len(first_words) - 1, int(0.95 * len(first_words)))] if first_words else 0.0,
+        "turn_gap_avg_s": average("turn_gap_s"),
+        "synthesis_issued_avg_s": average("synthesis_issued_s"),
+        "total_avg_s": average("total_s"),
+        "serial_avg_s": average("serial_s"),
+    }
+
+def generate_agent_debate(topic: str, age_profile: Dict, rounds: int = 2, num_debaters: int = 3) -> List[Dict]:
+    """Generate a multi-round debate between council members."""
+    return DebatePipeline(topic, age_profile, rounds, num_debaters, synthesize=False).start().wait()
+
+def stream_debate_synthesis(topic: str, debate: List[Dict], age_profile: Dict) -> Iterator[str]:
+    """Stream a synthesis/summary of the debate that highlights key insights."""
+    debate_summary = "\n\n".join([
+        f"{d['member']['name']}: {d['statement']}"
+        for d in debate
+    ])
     
-    return discussions
+    system_prompt = f"""You are the Cosmic Synthesizer, helping to integrate multiple perspectives.
+
+The listener is {age_profile['label']} (age {age_profile['user_age']}).
+{age_profile['content_guidelines']}
+
+Your task: Create a beautiful synthesis of the debate that:
+1. Highlights where different perspectives overlapped
+2. Notes where they productively disagreed
+3. Identifies the core insights from each viewpoint
+4. Offers wisdom about how different perspectives enrich understanding
+5. Asks a reflective question for the listener to consider
+
+Be warm, insightful, and {age_profile['tone']}.
+Keep your response under {age_profile['max_response_length'] + 100} words."""
+
+    return stream_chat_completion(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Topic: {topic}\n\nDebate:\n{debate_summary}"}
+        ],
+        temperature=0.8,
+        max_tokens=age_profile['max_response_length'] + 150,
+        fallback="The cosmic synthesis is still forming... Please try again! ✨",
+        age_profile_key=age_profile['key']
+    )
+
+def generate_debate_synthesis(topic: str, debate: List[Dict], age_profile: Dict) -> str:
+    """Generate a synthesis/summary of the debate that highlights key insights."""
+    return "".join(stream_debate_synthesis(topic, debate, age_profile))
 
 def generate_diplomatic_guidance(
     scenario: Dict,
@@ -396,8 +870,6 @@ def generate_diplomatic_guidance(
     """
     Generate guidance on a user's approach to a diplomatic scenario.
     """
-    openai.api_key = os.environ.get("OPENAI_API_KEY")
-    
     system_prompt = f"""You are a wise but warm Diplomatic Mentor in a cosmic academy.
     
 The student is {age_profile['label']} (age {age_profile['user_age']}).
@@ -428,16 +900,15 @@ The student's approach:
 Learning goal: {scenario['learning_goal']}"""
 
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        return complete_chat(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_content}
             ],
             temperature=0.8,
-            max_tokens=age_profile['max_response_length'] + 100
+            max_tokens=age_profile['max_response_length'] + 100,
+            age_profile_key=age_profile['key']
         )
-        return response.choices[0].message.content
     except Exception as e:
         return "The cosmic winds are swirling... Please try again! ✨"
 
@@ -449,8 +920,6 @@ def generate_empathy_bridge(
     """
     Generate a bridge between two perspectives, showing how they might understand each other.
     """
-    openai.api_key = os.environ.get("OPENAI_API_KEY")
-    
     system_prompt = f"""You are the Empathy Bridge, a cosmic translator between hearts and minds.
     
 The person you're helping is {age_profile['label']} (age {age_profile['user_age']}).
@@ -472,16 +941,15 @@ Your task: Help them see how two different perspectives might actually understan
 Be gentle, poetic, and wise. Use cosmic/nature metaphors where appropriate."""
 
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        return complete_chat(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Please build a bridge between these two perspectives:\n\nPerspective A: {perspective_a}\n\nPerspective B: {perspective_b}"}
             ],
             temperature=0.85,
-            max_tokens=age_profile['max_response_length'] + 100
+            max_tokens=age_profile['max_response_length'] + 100,
+            age_profile_key=age_profile['key']
         )
-        return response.choices[0].message.content
     except Exception as e:
         return "The bridge is forming through the cosmic mist... Please try again! 🌉✨"
 
@@ -492,8 +960,6 @@ def generate_perspective_meditation(
     """
     Generate a guided meditation/reflection exercise for perspective-taking.
     """
-    openai.api_key = os.environ.get("OPENAI_API_KEY")
-    
     system_prompt = f"""You are a Cosmic Meditation Guide helping with perspective-taking.
     
 The person you're guiding is {age_profile['label']} (age {age_profile['user_age']}).
@@ -510,18 +976,18 @@ Make it appropriate for their age - playful for young ones, reflective for older
 Include calming imagery and encourage self-compassion."""
 
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        meditation = complete_chat(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Create a perspective-taking meditation for this situation:\n\n{situation}"}
             ],
             temperature=0.8,
-            max_tokens=300
+            max_tokens=300,
+            age_profile_key=age_profile['key']
         )
         
         return {
-            "meditation": response.choices[0].message.content,
+            "meditation": meditation,
             "reflection_prompt": random.choice(PERSPECTIVE_SHIFT_PROMPTS)
         }
     except Exception as e:
@@ -11,8 +11,9 @@ import tempfile
 from pathlib import Path
 import streamlit as st
 import streamlit_authenticator as stauth
-from auth import get_user, create_user
-from database import SessionLocal, User
+from auth import get_user, create_user, AuthenticatorCredentials, install_password_checker
+from password_hashing import HashingBusy
+from database import session_scope
 from styles import get_cosmic_css, get_starfield_html
 from connection_features import get_cosmic_quote
 
@@ -31,21 +32,14 @@ def _build_authenticator():
     if "_authenticator" in st.session_state:
         return st.session_state["_authenticator"]
 
-    credentials = {"usernames": {}}
-    with SessionLocal() as db:
-        users = db.query(User).all()
-        for user in users:
-            credentials["usernames"][user.username] = {
-                "name": user.username,
-                "password": user.hashed_password,
-            }
-
     authenticator = stauth.Authenticate(
-        credentials,
+        AuthenticatorCredentials(),  # users are looked up on demand
         "interplanetary_pen_pal",  # cookie name
         _get_cookie_key(),  # cookie key
         cookie_expiry_days=30,
+        auto_hash=False,  # stored passwords are always bcrypt hashes
     )
+    install_password_checker(authenticator)
     st.session_state["_authenticator"] = authenticator
     return authenticator
 
@@ -118,14 +112,17 @@ def render_registration_form():
                 submitted = st.form_submit_button("Register")
                 if submitted:
                     if password == confirm_password:
-                        with SessionLocal() as db:
+                        with session_scope() as db:
                             if get_user(db, new_username):
                                 st.error("Username already exists")
                             else:
-                                create_user(db, new_username, password, email)
+                                try:
+                                    create_user(db, new_username, password, email)
+                                except HashingBusy:
+                                    st.warning("🌠 Too many sign-ups in progress, please try again in a moment.")
+                                    return
                                 st.success("You have successfully registered!")
                                 st.session_state.pop("_auth_cookie_key", None)
-                                st.session_state.pop("_authenticator", None)
                                 st.rerun()
                     else:
                         st.error("Passwords do not match")
@@ -134,7 +131,15 @@ def render_registration_form():
 
 
 authenticator = _build_authenticator()
-name, authentication_status, username = authenticator.login("Login", "main")
+try:
+    authenticator.login(location="main")
+except HashingBusy as e:
+    st.warning(f"🌠 {e}")
+    st.stop()
+
+name = st.session_state.get("name")
+authentication_status = st.session_state.get("authentication_status")
+username = st.session_state.get("username")
 
 if authentication_status:
     st.sidebar.write(f"Welcome, {name}!")
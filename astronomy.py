@@ -0,0 +1,80 @@
+# ======================================
+# 🔭 ASTRONOMY - Sidereal Time & Alt/Az
+# ======================================
+
+from datetime import datetime, timezone
+from typing import Tuple, Union
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+J2000_JULIAN_DATE = 2451545.0
+UNIX_EPOCH_JULIAN_DATE = 2440587.5
+SECONDS_PER_DAY = 86400.0
+# Degrees the sky turns per solar day (one sidereal day is ~23h56m)
+SIDEREAL_DEGREES_PER_DAY = 360.98564736629
+
+# -------------------------------
+# TIME
+# -------------------------------
+
+def julian_date(when: datetime) -> float:
+    """
+    Julian date for a datetime. Naive datetimes are treated as UTC.
+    """
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return UNIX_EPOCH_JULIAN_DATE + when.timestamp() / SECONDS_PER_DAY
+
+def gmst_degrees(jd: ArrayLike) -> ArrayLike:
+    """
+    Greenwich Mean Sidereal Time in degrees (IAU 1982 expression, good to
+    well under a second of time for present-day dates).
+    """
+    d = np.asarray(jd, dtype=np.float64) - J2000_JULIAN_DATE
+    t = d / 36525.0
+    gmst = 280.46061837 + SIDEREAL_DEGREES_PER_DAY * d + 0.000387933 * t ** 2 - t ** 3 / 38710000.0
+    return gmst % 360.0
+
+def local_sidereal_time(jd: ArrayLike, longitude: ArrayLike) -> ArrayLike:
+    """Local Sidereal Time in degrees for east-positive longitudes."""
+    return (gmst_degrees(jd) + np.asarray(longitude, dtype=np.float64)) % 360.0
+
+def hour_angle(lst_degrees: ArrayLike, ra_degrees: ArrayLike) -> ArrayLike:
+    """Hour angle in degrees, wrapped to [-180, 180). Zero means on the meridian."""
+    return (np.asarray(lst_degrees) - np.asarray(ra_degrees) + 180.0) % 360.0 - 180.0
+
+# -------------------------------
+# COORDINATES
+# -------------------------------
+
+def altitude_azimuth(ra_degrees: ArrayLike, dec_degrees: ArrayLike, latitude: ArrayLike,
+                     lst_degrees: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Altitude and azimuth (degrees, azimuth measured from north through east).
+    All inputs broadcast, so stars x observers is e.g. ra[None, :] with lat[:, None].
+    """
+    ha = np.radians(hour_angle(lst_degrees, ra_degrees))
+    dec = np.radians(dec_degrees)
+    lat = np.radians(latitude)
+
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(ha)
+    alt = np.arcsin(np.clip(sin_alt, -1.0, 1.0))
+
+    az = np.arctan2(
+        -np.cos(dec) * np.sin(ha),
+        np.sin(dec) * np.cos(lat) - np.cos(dec) * np.sin(lat) * np.cos(ha)
+    )
+    return np.degrees(alt), np.degrees(az) % 360.0
+
+def angular_separation(ra1: ArrayLike, dec1: ArrayLike, ra2: ArrayLike, dec2: ArrayLike) -> np.ndarray:
+    """Great-circle separation in degrees between two sky positions (broadcasting)."""
+    ra1, dec1, ra2, dec2 = (np.radians(x) for x in (ra1, dec1, ra2, dec2))
+    # Haversine form stays accurate at the sub-degree separations used for zenith checks
+    h = np.sin((dec2 - dec1) / 2) ** 2 + np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2) ** 2
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0))))
+
+def zenith_distance(ra_degrees: ArrayLike, dec_degrees: ArrayLike, latitude: ArrayLike,
+                    lst_degrees: ArrayLike) -> np.ndarray:
+    """Angle in degrees between a star and the observer's zenith (RA = LST, Dec = latitude)."""
+    return angular_separation(ra_degrees, dec_degrees, lst_degrees, latitude)
@@ -1,29 +1,46 @@
 # ======================================
 #  AUTHENTICATION SETUP
 # ======================================
+# Written against streamlit-authenticator 0.4.2 (pinned in requirements.txt).
+# Besides its public constructor this relies on two things to re-check when
+# upgrading: AuthenticationModel.check_credentials, which install_password_checker
+# replaces, and the "logged_in" / "failed_login_attempts" keys it keeps in each
+# credentials["usernames"] entry, which _LoginEntry stores outside the cache.
 
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Optional
 import streamlit as st
-import streamlit_authenticator as stauth
-from passlib.context import CryptContext
-from database import SessionLocal, User
+from sqlalchemy import func
+from database import session_scope, User
+from password_hashing import hash_password, verify_and_update
+from password_hashing import verify_password as verify_hash
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Recently used login entries kept per process (username -> name and hash)
+CREDENTIAL_CACHE_SIZE = 10_000
 
 def get_db():
-    db = SessionLocal()
-    try:
+    with session_scope() as db:
         yield db
-    finally:
-        db.close()
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_hash(plain_password, hashed_password)
+
+def save_password_hash(username: str, hashed_password: str):
+    """Store a new hash for a user and drop the stale cached login entry."""
+    with session_scope() as db:
+        db.query(User).filter(func.lower(User.username) == username.lower()).update(
+            {User.hashed_password: hashed_password}, synchronize_session=False)
+        db.commit()
+    forget_credentials(username)
 
 def get_user(db, username: str):
-    return db.query(User).filter(User.username == username).first()
+    # Case-insensitive, like login: "Alice" and "alice" are the same account
+    return db.query(User).filter(func.lower(User.username) == username.lower()).first()
 
 def create_user(db, username: str, password: str, email: str):
     hashed_password = get_password_hash(password)
@@ -32,3 +49,195 @@ def create_user(db, username: str, password: str, email: str):
     db.commit()
     db.refresh(db_user)
     return db_user
+
+# -------------------------------
+# ON-DEMAND CREDENTIALS
+# -------------------------------
+
+_credential_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_credential_lock = threading.Lock()
+
+# username -> failed logins since the last success; kept apart from the cache so
+# eviction or forget_credentials doesn't reset a lockout (only real users get here)
+_failed_logins: Dict[str, int] = {}
+_failed_logins_lock = threading.Lock()
+# Per browser session: usernames the authenticator has marked logged in there
+_LOGGED_IN_KEY = "_auth_logged_in"
+
+def _load_credentials(username: str) -> Optional[Dict]:
+    # The authenticator lowercases what is typed, so match case-insensitively
+    # (served by ix_users_username_lower)
+    with session_scope() as db:
+        row = db.query(User.username, User.hashed_password).filter(
+            func.lower(User.username) == username.lower()
+        ).first()
+    if row is None:
+        return None
+    return {"name": row.username, "password": row.hashed_password}
+
+def forget_credentials(username: str):
+    """Drop a cached login entry, e.g. after its password hash changes."""
+    with _credential_lock:
+        _credential_cache.pop(username.lower(), None)
+
+def _remember(username: str, entry: Dict, replace: bool = True) -> Dict:
+    with _credential_lock:
+        if replace or username not in _credential_cache:
+            _credential_cache[username] = entry
+        _credential_cache.move_to_end(username)
+        while len(_credential_cache) > CREDENTIAL_CACHE_SIZE:
+            _credential_cache.popitem(last=False)
+        return _credential_cache[username]
+
+class _LoginEntry(MutableMapping):
+    """
+    One user's credentials entry as the authenticator sees it. Name and
+    hash live in the shared cache; the failed login count is per account
+    (see _failed_logins) and "logged_in" is per browser session.
+    """
+
+    def __init__(self, username: str, entry: Dict):
+        self.username = username
+        self.entry = entry
+
+    def __getitem__(self, key: str):
+        if key == "failed_login_attempts":
+            with _failed_logins_lock:
+                if self.username not in _failed_logins:
+                    raise KeyError(key)
+                return _failed_logins[self.username]
+        if key == "logged_in":
+            return self.username in st.session_state.get(_LOGGED_IN_KEY, ())
+        return self.entry[key]
+
+    def __setitem__(self, key: str, value):
+        if key == "failed_login_attempts":
+            with _failed_logins_lock:
+                if value:
+                    _failed_logins[self.username] = value
+                else:
+                    _failed_logins.pop(self.username, None)
+        elif key == "logged_in":
+            logged_in = set(st.session_state.get(_LOGGED_IN_KEY, ()))
+            if value:
+                logged_in.add(self.username)
+            else:
+                logged_in.discard(self.username)
+            st.session_state[_LOGGED_IN_KEY] = logged_in
+        else:
+            self.entry[key] = value
+
+    def __delitem__(self, key: str):
+        del self.entry[key]
+
+    def __iter__(self):
+        return iter(self.entry)
+
+    def __len__(self) -> int:
+        return len(self.entry)
+
+def record_failed_login(username: str):
+    with _failed_logins_lock:
+        _failed_logins[username] = _failed_logins.get(username, 0) + 1
+
+class UserCredentials(MutableMapping):
+    """
+    The authenticator's credentials["usernames"] mapping, filled on demand:
+    looking up a username reads only that user (an indexed query) and keeps
+    the entry in a process-wide LRU. Keys are lowercase, as the
+    authenticator normalises them, while "name" keeps the registered case.
+    Iterating covers cached entries only; the users table is never enumerated.
+    """
+
+    def __getitem__(self, username: str) -> _LoginEntry:
+        username = username.lower()
+        with _credential_lock:
+            entry = _credential_cache.get(username)
+            if entry is not None:
+                _credential_cache.move_to_end(username)
+                return _LoginEntry(username, entry)
+        entry = _load_credentials(username)
+        if entry is None:
+            raise KeyError(username)
+        # Keep an entry another session loaded meanwhile (it may hold a rehash)
+        return _LoginEntry(username, _remember(username, entry, replace=False))
+
+    def __setitem__(self, username: str, entry: Dict):
+        if isinstance(entry, _LoginEntry):
+            entry = entry.entry
+        _remember(username.lower(), entry)
+
+    def __delitem__(self, username: str):
+        with _credential_lock:
+            del _credential_cache[username.lower()]
+
+    def __contains__(self, username) -> bool:
+        try:
+            self[username]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        with _credential_lock:
+            return iter(list(_credential_cache))
+
+    def __len__(self) -> int:
+        with _credential_lock:
+            return len(_credential_cache)
+
+class AuthenticatorCredentials(MutableMapping):
+    """
+    The `credentials` argument for stauth.Authenticate: {"usernames":
+    UserCredentials()}. The authenticator's constructor replaces
+    credentials["usernames"] with a plain (normalised) dict; here that
+    dict's entries are merged into the on-demand mapping instead.
+    """
+
+    def __init__(self):
+        self.usernames = UserCredentials()
+
+    def __getitem__(self, key: str):
+        if key != "usernames":
+            raise KeyError(key)
+        return self.usernames
+
+    def __setitem__(self, key: str, value):
+        if key != "usernames":
+            raise KeyError(key)
+        if value is not self.usernames:
+            for username, entry in value.items():
+                self.usernames[username] = entry
+
+    def __delitem__(self, key: str):
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(["usernames"])
+
+    def __len__(self) -> int:
+        return 1
+
+def install_password_checker(authenticator):
+    """
+    Route the authenticator's password check through the bcrypt worker
+    pool, rehashing on login when BCRYPT_ROUNDS has changed. May raise
+    password_hashing.HashingBusy when the pool is saturated.
+    """
+    model = authenticator.authentication_controller.authentication_model
+
+    def check_credentials(username: str, password: str) -> bool:
+        credentials = model.credentials["usernames"]
+        if username not in credentials:
+            return False
+        entry = credentials[username]
+        valid, new_hash = verify_and_update(password, entry["password"])
+        if not valid:
+            record_failed_login(username)
+            return False
+        if new_hash:
+            save_password_hash(username, new_hash)
+            entry["password"] = new_hash
+        return True
+
+    model.check_credentials = check_credentials
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Council Latency Benchmark
+
+Runs council discussions of 1-8 members against a local fake completion
+server with a fixed per-call latency, comparing one call after another
+(as before) with consult_council's concurrent fan-out. Checks that
+responses keep the members' order and that a failing upstream still
+yields each member's fallback text.
+
+Run from the repository root:
+    python -m benchmarks.council_latency_benchmark [latency_seconds]
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.fake_openai_server import FakeCompletionServer
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+_server = FakeCompletionServer(latency=LATENCY).start()
+
+# Point the OpenAI client at the fake server before the app imports it
+os.environ["OPENAI_BASE_URL"] = _server.base_url
+os.environ["OPENAI_API_KEY"] = "fake-key"
+# Every request should reach the server; repeated prompts would otherwise be cached
+os.environ["LLM_CACHE_SIZE"] = "0"
+
+from ai_agents import COUNCIL_MEMBERS, _ask_council_member, consult_council, get_age_profile
+
+SITUATION = "My friend and I both want to lead the science fair project."
+
+
+def council_of(size: int):
+    """`size` distinct members, reusing the real archetypes."""
+    archetypes = list(COUNCIL_MEMBERS.values())
+    return [{**archetypes[i % len(archetypes)], "name": f"Council Member {i + 1}"} for i in range(size)]
+
+
+def check_order(members, discussions):
+    assert [d["member"]["name"] for d in discussions] == [m["name"] for m in members]
+    for member, discussion in zip(members, discussions):
+        assert f"You are {member['name']}," in discussion["response"], discussion["response"]
+
+
+def run():
+    age_profile = get_age_profile(14)
+    try:
+        for size in range(1, 9):
+            members = council_of(size)
+
+            start = time.perf_counter()
+            serial = [_ask_council_member(m, SITUATION, age_profile) for m in members]
+            serial_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            concurrent = consult_council(members, SITUATION, age_profile)
+            concurrent_s = time.perf_counter() - start
+
+            check_order(members, serial)
+            check_order(members, concurrent)
+            print(f"🌌 {size} member{'s' if size > 1 else ' '}: one by one {serial_s:5.2f}s, "
+                  f"concurrent {concurrent_s:5.2f}s ({serial_s / concurrent_s:4.1f}x)")
+
+        # A failing upstream still gives every member their fallback, in order
+        _server.fail_status = 400
+        members = council_of(4)
+        discussions = consult_council(members, SITUATION, age_profile)
+        assert [d["response"] for d in discussions] == [f"*{m['name']} is meditating on this...*" for m in members]
+        print(f"✓ Responses keep member order; failures fall back per member "
+              f"(peak {_server.max_in_flight} calls in flight)")
+    finally:
+        _server.stop()
+
+
+if __name__ == "__main__":
+    run()
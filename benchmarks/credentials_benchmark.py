@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Login Credentials Benchmark
+
+Grows a throwaway SQLite users table and compares what a new browser
+session paid before logging in: loading every user's hash into the
+authenticator's credentials dict, versus the on-demand UserCredentials
+lookup of just the username being authenticated (cold, then cached).
+
+Run from the repository root:
+    python -m benchmarks.credentials_benchmark [max_users]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "credentials_benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+from database import init_db, session_scope, User
+from auth import UserCredentials, forget_credentials
+
+BATCH = 50_000
+FAKE_HASH = "$2b$12$" + "x" * 53  # bcrypt-shaped; nothing is verified here
+LOOKUPS = 200
+
+
+def add_users(start: int, stop: int):
+    with session_scope() as db:
+        for offset in range(start, stop, BATCH):
+            db.execute(User.__table__.insert(), [
+                {"username": f"traveler{i}", "email": f"traveler{i}@example.com", "hashed_password": FAKE_HASH}
+                for i in range(offset, min(offset + BATCH, stop))
+            ])
+        db.commit()
+
+
+def legacy_credentials():
+    """The old _build_authenticator body: every user, every new session."""
+    credentials = {"usernames": {}}
+    with session_scope() as db:
+        for user in db.query(User).all():
+            credentials["usernames"][user.username] = {
+                "name": user.username,
+                "password": user.hashed_password,
+            }
+    return credentials
+
+
+def measure_legacy():
+    start = time.perf_counter()
+    credentials = legacy_credentials()
+    elapsed = time.perf_counter() - start
+    assert "traveler1" in credentials["usernames"]
+    del credentials
+
+    # Memory in a separate, traced pass (tracing slows the timed one down)
+    tracemalloc.start()
+    legacy_credentials()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 2**20
+
+
+def measure_lazy(total: int):
+    usernames = [f"traveler{(i * 7919) % total}" for i in range(LOOKUPS)]
+    for username in usernames:
+        forget_credentials(username)
+    credentials = UserCredentials()
+
+    start = time.perf_counter()
+    for username in usernames:
+        assert credentials[username]["name"] == username
+    cold = (time.perf_counter() - start) / LOOKUPS
+
+    start = time.perf_counter()
+    for username in usernames:
+        credentials[username]
+    warm = (time.perf_counter() - start) / LOOKUPS
+    return cold * 1000, warm * 1e6
+
+
+def run(max_users: int):
+    init_db()
+    sizes = [n for n in (10_000, 100_000, 1_000_000) if n <= max_users] or [max_users]
+    loaded = 0
+    try:
+        for total in sizes:
+            add_users(loaded, total)
+            loaded = total
+            legacy_ms, legacy_mib = measure_legacy()
+            cold_ms, warm_us = measure_lazy(total)
+            print(f"👥 {total:>9,} users: load-all {legacy_ms:9.1f} ms ({legacy_mib:6.1f} MiB) per session | "
+                  f"on-demand {cold_ms:6.3f} ms cold, {warm_us:6.2f} us cached per login")
+    finally:
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
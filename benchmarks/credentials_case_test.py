@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Mixed-case Username Test
+
+streamlit-authenticator lowercases the username it is given before checking
+credentials. Registers "Alice" in a throwaway SQLite database and checks
+that the on-demand credentials, the current-user lookup and a password
+rehash all find that account under "alice" as well as "Alice".
+
+Run from the repository root:
+    python -m benchmarks.credentials_case_test
+"""
+
+import os
+import tempfile
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "credentials_case_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+from database import init_db, session_scope, User
+from auth import AuthenticatorCredentials, create_user, get_user, save_password_hash
+from current_user import load_current_user
+from password_hashing import verify_password
+
+FAKE_HASH = "$2b$12$" + "x" * 53  # bcrypt-shaped; only compared, never verified
+
+
+def run():
+    init_db()
+    try:
+        with session_scope() as db:
+            create_user(db, "Alice", "stardust", "alice@example.com")
+
+        usernames = AuthenticatorCredentials()["usernames"]
+        for typed in ("alice", "Alice", "ALICE"):
+            assert typed in usernames, typed
+            entry = usernames[typed]
+            assert entry["name"] == "Alice", entry["name"]
+            assert verify_password("stardust", entry["password"])
+        assert "bob" not in usernames
+        # One cache entry, under the key the authenticator uses
+        assert list(usernames) == ["alice"], list(usernames)
+
+        with session_scope() as db:
+            assert get_user(db, "alice").username == "Alice"
+            assert load_current_user(db, "alice").username == "Alice"
+
+        # Rehash-on-login passes the lowercased name back in
+        save_password_hash("alice", FAKE_HASH)
+        with session_scope() as db:
+            assert db.query(User.hashed_password).filter(User.username == "Alice").scalar() == FAKE_HASH
+        assert usernames["alice"]["password"] == FAKE_HASH
+        print("✓ mixed-case username found under its lowercase login name")
+    finally:
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run()
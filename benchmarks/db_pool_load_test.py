@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Database Pool Load Test
+
+Simulates concurrent page runs against a throwaway SQLite database, each
+holding one pooled connection through session_scope() while it queries
+and renders. Some runs end early the way st.rerun() does. For rising
+concurrency it reports runs/s and pool checkout wait (p50/p95/max), then
+checks that every connection went back to the pool. Finally runs pages
+that wait on an AI reply between queries, holding the connection
+throughout and then with db.release() before the reply.
+
+Size the pool the same way the app does:
+    DB_POOL_SIZE=5 DB_MAX_OVERFLOW=10 python -m benchmarks.db_pool_load_test
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "db_pool_load_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+
+from database import init_db, session_scope, pool_metrics, reset_pool_metrics, Echo, User
+
+RUNS_PER_THREAD = 40
+RENDER_SECONDS = 0.01  # time a page holds its connection between queries
+RERUN_RATE = 0.1
+CONCURRENCY = [1, 5, 15, 30, 60]
+AI_REPLY_SECONDS = 0.5  # a streamed AI reply on pages 6, 10 and 11
+AI_PAGE_CONCURRENCY = 30
+
+
+class _Rerun(BaseException):
+    """Stands in for Streamlit's rerun/stop control-flow exceptions."""
+
+
+def seed():
+    with session_scope() as db:
+        db.execute(User.__table__.insert(), [
+            {"username": f"traveler{i}", "email": f"traveler{i}@example.com"} for i in range(100)
+        ])
+        db.execute(Echo.__table__.insert(), [
+            {"user_id": i % 100 + 1, "echo_type": "thought", "content": f"echo {i}"} for i in range(1_000)
+        ])
+        db.commit()
+
+
+def page_run(rng: random.Random):
+    with session_scope() as db:
+        db.query(User).filter(User.username == f"traveler{rng.randrange(100)}").first()
+        time.sleep(RENDER_SECONDS)
+        db.query(Echo).order_by(Echo.id.desc()).limit(20).all()
+        if rng.random() < RERUN_RATE:
+            raise _Rerun()
+        time.sleep(RENDER_SECONDS)
+
+
+def ai_page_run(rng: random.Random, release: bool):
+    with session_scope() as db:
+        user = db.query(User).filter(User.username == f"traveler{rng.randrange(100)}").first()
+        if release:
+            db.release()
+        time.sleep(AI_REPLY_SECONDS)
+        user.is_premium = not user.is_premium
+        db.commit()
+
+
+def ai_pages(release: bool):
+    errors = []
+
+    def worker(seed_value):
+        try:
+            ai_page_run(random.Random(seed_value), release)
+        except Exception as e:
+            errors.append(e)
+
+    reset_pool_metrics()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(AI_PAGE_CONCURRENCY)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    metrics = pool_metrics()
+    label = "released for the reply" if release else "held through the reply"
+    print(f"🤖 {AI_PAGE_CONCURRENCY} AI pages, connection {label:<23} {elapsed:5.2f}s, "
+          f"checkout wait max {metrics['wait_max_ms']:7.1f} ms, timeouts {metrics['timeouts'] + len(errors)}")
+    assert metrics["checked_out"] == 0, f"{metrics['checked_out']} connections leaked"
+
+
+def load(threads: int):
+    errors = []
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        for _ in range(RUNS_PER_THREAD):
+            try:
+                page_run(rng)
+            except _Rerun:
+                pass
+            except Exception as e:
+                errors.append(e)
+
+    reset_pool_metrics()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    metrics = pool_metrics()
+    print(f"{threads:3d} concurrent runs: {metrics['checkouts'] / elapsed:7.0f} runs/s, "
+          f"checkout wait p50 {metrics['wait_p50_ms']:7.2f} ms, p95 {metrics['wait_p95_ms']:7.2f} ms, "
+          f"max {metrics['wait_max_ms']:7.1f} ms, timeouts {metrics['timeouts'] + len(errors)}")
+    assert metrics["checked_out"] == 0, f"{metrics['checked_out']} connections leaked"
+
+
+def run():
+    init_db()
+    seed()
+    config = pool_metrics()
+    print(f"🔌 {config['pool']}: pool_size {config['size']}, max_overflow {config['max_overflow']}")
+    try:
+        for threads in CONCURRENCY:
+            load(threads)
+        print("✓ Every connection returned to the pool, including early-ending runs")
+        ai_pages(release=False)
+        ai_pages(release=True)
+    finally:
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Debate Pipeline Benchmark
+
+Runs Perspective Bridge debates of 1-3 rounds and 3-5 debaters against a
+local fake completion server that streams word by word. Compares the old
+schedule (every turn waits for the previous statement to finish, then the
+synthesis) with DebatePipeline, where a turn starts once the statements it
+quotes have streamed far enough. Checks that both send the model exactly
+the same prompts and produce the same debate, and prints the per-stage
+timings of one pipelined run.
+
+Run from the repository root:
+    python -m benchmarks.debate_pipeline_benchmark [latency_seconds] [token_delay_seconds]
+"""
+
+import os
+import random
+import sys
+import time
+
+from benchmarks.fake_openai_server import FakeCompletionServer
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.4
+TOKEN_DELAY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+REPLY_WORDS = 80
+_server = FakeCompletionServer(latency=LATENCY, token_delay=TOKEN_DELAY, reply_words=REPLY_WORDS).start()
+
+# Point the OpenAI client at the fake server before the app imports it
+os.environ["OPENAI_BASE_URL"] = _server.base_url
+os.environ["OPENAI_API_KEY"] = "fake-key"
+# Every request should reach the server; repeated prompts would otherwise be cached
+os.environ["LLM_CACHE_SIZE"] = "0"
+
+from ai_agents import (
+    COUNCIL_MEMBERS,
+    DebatePipeline,
+    _debate_messages,
+    debate_metrics,
+    generate_debate_synthesis,
+    get_age_profile,
+    stream_chat_completion,
+)
+
+TOPIC = "Should our class spend the prize money on a telescope or a field trip?"
+
+
+def one_after_another(age_profile, rounds: int, num_debaters: int):
+    """The old generate_agent_debate + generate_debate_synthesis schedule."""
+    debaters = random.sample(list(COUNCIL_MEMBERS.keys()), num_debaters)
+    debate = []
+    for round_num in range(rounds):
+        for key in debaters:
+            member = COUNCIL_MEMBERS[key]
+            statement = "".join(stream_chat_completion(
+                _debate_messages(TOPIC, age_profile, member, round_num, debate),
+                temperature=0.9,
+                max_tokens=age_profile['max_response_length'] + 50,
+                fallback=f"*{member['name']} pauses to gather thoughts...*",
+                age_profile_key=age_profile['key']
+            ))
+            debate.append({"member": member, "statement": statement, "round": round_num + 1})
+    return debate, generate_debate_synthesis(TOPIC, debate, age_profile)
+
+
+def pipelined(age_profile, rounds: int, num_debaters: int):
+    pipeline = DebatePipeline(TOPIC, age_profile, rounds, num_debaters).start()
+    debate = pipeline.wait()
+    return pipeline, debate, "".join(pipeline.synthesis_tokens())
+
+
+def prompts():
+    """Prompts sent since the last call, in a stable order."""
+    bodies, _server.bodies = _server.bodies, []
+    return sorted(tuple(m["content"] for m in body["messages"]) for body in bodies)
+
+
+def run():
+    age_profile = get_age_profile(14)
+    print(f"🌌 {LATENCY:.2f}s to first token, {TOKEN_DELAY * 1000:.0f} ms per word, {REPLY_WORDS}-word replies")
+    try:
+        for num_debaters in (3, 4, 5):
+            for rounds in (1, 2, 3):
+                random.seed(rounds * 10 + num_debaters)
+                prompts()
+                start = time.perf_counter()
+                serial_debate, serial_synthesis = one_after_another(age_profile, rounds, num_debaters)
+                serial_s = time.perf_counter() - start
+                serial_prompts = prompts()
+
+                random.seed(rounds * 10 + num_debaters)
+                start = time.perf_counter()
+                pipeline, debate, synthesis = pipelined(age_profile, rounds, num_debaters)
+                pipeline_s = time.perf_counter() - start
+
+                assert prompts() == serial_prompts
+                assert debate == serial_debate and synthesis == serial_synthesis
+                print(f"🎭 {num_debaters} debaters x {rounds} round{'s' if rounds > 1 else ' '}: "
+                      f"one after another {serial_s:5.2f}s, pipelined {pipeline_s:5.2f}s "
+                      f"({serial_s / pipeline_s:4.1f}x)")
+        print("✓ Same prompts, debate and synthesis as one after another")
+
+        print("\n⏱️ Stages of the last run (seconds from start):")
+        for stage in pipeline.stage_timings():
+            print(f"   {stage['stage']:<34} issued {stage['issued_s']:5.2f}  "
+                  f"first words {stage['first_token_s']:5.2f}  done {stage['done_s']:5.2f}")
+
+        metrics = debate_metrics()
+        print(f"\n📊 {metrics['debates']} debates: first words avg {metrics['first_words_avg_s']:.2f}s, "
+              f"next speaker every {metrics['turn_gap_avg_s']:.2f}s, "
+              f"synthesis issued at {metrics['synthesis_issued_avg_s']:.2f}s, "
+              f"whole debate {metrics['total_avg_s']:.2f}s vs {metrics['serial_avg_s']:.2f}s of stage time")
+    finally:
+        _server.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Echo Feed Cache Load Test
+
+Simulates 500 concurrent Echo Wall readers per writer against a
+throwaway SQLite database, first reading straight from the database
+(echo_feed) and then through the write-through cache (echo_cache).
+Reports render throughput, latency percentiles and SELECTs issued by
+readers, and checks that every published echo is visible to readers
+once its writer returns. Ends by timing reads and a publish while one
+feed's database load is slowed down, which should not hold them up.
+
+Run from the repository root:
+    python -m benchmarks.echo_cache_load_test [writers]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "echo_cache_load_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.pop("ECHO_FEED_CACHE_PATH", None)
+
+import numpy as np
+from sqlalchemy import event
+from database import init_db, engine, SessionLocal, Echo, User
+from echo_feed import ECHO_TYPES, get_echo_feed
+import echo_cache
+from echo_cache import get_cached_feed, invalidate_feed_cache, publish_echo
+
+READERS_PER_WRITER = 500
+READS_PER_READER = 10
+WRITES_PER_WRITER = 20
+NUM_USERS = 1_000
+NUM_ECHOES = 50_000
+
+_selects = 0
+_selects_lock = threading.Lock()
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_select(conn, cursor, statement, parameters, context, executemany):
+    global _selects
+    if statement.lstrip().upper().startswith("SELECT"):
+        with _selects_lock:
+            _selects += 1
+
+
+def seed(db):
+    rng = random.Random(5)
+    db.execute(User.__table__.insert(), [
+        {"username": f"traveler{i}", "email": f"traveler{i}@example.com"} for i in range(NUM_USERS)
+    ])
+    start = datetime(2025, 1, 1)
+    db.execute(Echo.__table__.insert(), [
+        {
+            "user_id": rng.randrange(NUM_USERS) + 1,
+            "echo_type": rng.choice(list(ECHO_TYPES)),
+            "content": f"echo number {i}",
+            "timestamp": start + timedelta(seconds=i * 30),
+        }
+        for i in range(NUM_ECHOES)
+    ])
+    db.commit()
+
+
+def render(db, fetch):
+    """The Echo Wall's three lists."""
+    return (fetch(db)[0], fetch(db, limit=10, echo_type="gratitude")[0], fetch(db, limit=10, echo_type="sync")[0])
+
+
+def reader(fetch, barrier, latencies):
+    barrier.wait()
+    db = SessionLocal()
+    try:
+        for _ in range(READS_PER_READER):
+            start = time.perf_counter()
+            render(db, fetch)
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.001)
+    finally:
+        db.close()
+
+
+def writer(writer_id, cached, barrier, published, stale):
+    rng = random.Random(writer_id)
+    barrier.wait()
+    db = SessionLocal()
+    try:
+        for i in range(WRITES_PER_WRITER):
+            echo_type = rng.choice(["gratitude", "sync", "thought"])
+            content = f"live echo {writer_id}-{i}"
+            if cached:
+                echo = publish_echo(db, writer_id + 1, f"traveler{writer_id}", echo_type, content)
+                # Read-your-write: the next cached read must already show it
+                if echo["id"] not in {e["id"] for e in get_cached_feed(db, echo_type=echo_type)[0]}:
+                    stale.append(echo["id"])
+            else:
+                db_echo = Echo(user_id=writer_id + 1, echo_type=echo_type, content=content)
+                db.add(db_echo)
+                db.commit()
+                echo = {"id": db_echo.id}
+            published.append(echo["id"])
+            time.sleep(0.01)
+    finally:
+        db.close()
+
+
+def run_scenario(label: str, cached: bool, writers: int):
+    global _selects
+    fetch = get_cached_feed if cached else get_echo_feed
+    invalidate_feed_cache()
+
+    readers = writers * READERS_PER_WRITER
+    barrier = threading.Barrier(readers + writers)
+    latencies, published, stale = [], [], []
+    threads = [threading.Thread(target=reader, args=(fetch, barrier, latencies)) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(w, cached, barrier, published, stale)) for w in range(writers)]
+
+    _selects = 0
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    renders = len(latencies)
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    print(f"{label:<12} {readers} readers / {writers} writer(s): {renders / elapsed:8,.0f} renders/s, "
+          f"p50 {p50:6.2f} ms, p99 {p99:7.2f} ms, {_selects / renders:5.2f} SELECTs/render")
+
+    # After the writers finish, every reader path must match the database
+    db = SessionLocal()
+    try:
+        assert render(db, fetch) == render(db, get_echo_feed), "cached feed diverged from the database"
+        latest = {e["id"] for e in get_echo_feed(db, limit=len(published))[0]}
+        assert set(published) <= latest
+        assert not stale, f"{len(stale)} published echoes missing from the next cached read"
+    finally:
+        db.close()
+
+
+def slow_load(delay: float = 0.5):
+    """Read the other feeds and publish while the "sync" feed takes `delay` seconds to load."""
+    invalidate_feed_cache()
+    db = SessionLocal()
+    try:
+        get_cached_feed(db)
+        get_cached_feed(db, echo_type="gratitude")
+
+        def slow_get_echo_feed(db, *args, **kwargs):
+            time.sleep(delay)
+            return get_echo_feed(db, *args, **kwargs)
+
+        def load_sync():
+            loader_db = SessionLocal()
+            try:
+                get_cached_feed(loader_db, echo_type="sync")
+            finally:
+                loader_db.close()
+
+        echo_cache.get_echo_feed = slow_get_echo_feed
+        loader = threading.Thread(target=load_sync)
+        loader.start()
+        time.sleep(0.05)
+        start = time.perf_counter()
+        get_cached_feed(db)
+        get_cached_feed(db, echo_type="gratitude")
+        echo = publish_echo(db, 1, "traveler0", "sync", "published while the sync feed loads")
+        blocked_ms = (time.perf_counter() - start) * 1000
+        loader.join()
+        echo_cache.get_echo_feed = get_echo_feed
+
+        assert blocked_ms < delay * 1000 / 2, f"reads waited {blocked_ms:.0f} ms behind another feed's load"
+        assert get_cached_feed(db, echo_type="sync")[0][0]["id"] == echo["id"], "echo lost by the overlapping load"
+        print(f"✓ While one feed loaded for {delay * 1000:.0f} ms, two reads and a publish took {blocked_ms:.2f} ms; "
+              f"the overlapping publish was merged into the loaded feed")
+    finally:
+        echo_cache.get_echo_feed = get_echo_feed
+        db.close()
+
+
+def run(writers: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    print(f"Seeded {NUM_ECHOES:,} echoes; {READS_PER_READER} renders per reader, "
+          f"{WRITES_PER_WRITER} echoes per writer")
+
+    try:
+        run_scenario("Database", cached=False, writers=writers)
+        run_scenario("Feed cache", cached=True, writers=writers)
+        slow_load()
+    finally:
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
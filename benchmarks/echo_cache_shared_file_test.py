@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Echo Feed Shared Cache File Test
+
+Runs several app processes against one throwaway SQLite database and one
+shared feed cache file (ECHO_FEED_CACHE_PATH). Each process warms the
+feeds, then they all publish echoes at the same moment. Afterwards the
+shared snapshot must match the database for every feed, so no process's
+write-through was overwritten by another's.
+
+Run from the repository root:
+    python -m benchmarks.echo_cache_shared_file_test [processes] [echoes_per_process]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Point the app's engine and feed cache at scratch files before they are imported;
+# the writer processes started below inherit them
+_WRITER = sys.argv[1:2] == ["--writer"]
+if not _WRITER:
+    _tmp_dir = tempfile.mkdtemp()
+    _db_path = os.path.join(_tmp_dir, "echo_cache_shared.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+    os.environ["ECHO_FEED_CACHE_PATH"] = os.path.join(_tmp_dir, "echo_feed_cache.json")
+
+from database import init_db, SessionLocal, Echo, User
+from echo_feed import get_echo_feed
+import echo_cache
+from echo_cache import get_cached_feed, publish_echo
+
+ECHO_TYPES = ["gratitude", "sync", "thought"]
+FEED_KEYS = [None] + ECHO_TYPES
+NUM_USERS = 20
+
+
+def writer(writer_id: int, count: int, start_at: float):
+    """One app process: warm every feed, then publish `count` echoes from `start_at`."""
+    db = SessionLocal()
+    try:
+        for key in FEED_KEYS:
+            get_cached_feed(db, echo_type=key)
+        time.sleep(max(start_at - time.time(), 0))
+        for i in range(count):
+            publish_echo(db, writer_id + 1, f"traveler{writer_id}", ECHO_TYPES[i % len(ECHO_TYPES)],
+                         f"shared echo {writer_id}-{i}")
+    finally:
+        db.close()
+
+
+def run(processes: int, count: int):
+    assert echo_cache.FEED_CACHE_PATH, "the shared file mode needs fcntl"
+    init_db()
+    db = SessionLocal()
+    try:
+        db.execute(User.__table__.insert(), [
+            {"username": f"traveler{i}", "email": f"traveler{i}@example.com"} for i in range(NUM_USERS)
+        ])
+        db.execute(Echo.__table__.insert(), [
+            {"user_id": i % NUM_USERS + 1, "echo_type": ECHO_TYPES[i % len(ECHO_TYPES)], "content": f"echo {i}"}
+            for i in range(30)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    start_at = time.time() + 3.0
+    start = time.perf_counter()
+    workers = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.echo_cache_shared_file_test",
+                          "--writer", str(w), str(count), repr(start_at)])
+        for w in range(processes)
+    ]
+    assert all(worker.wait() == 0 for worker in workers), "a writer process failed"
+    elapsed = time.perf_counter() - start
+
+    # This process reads the feeds straight from the snapshot the writers left
+    db = SessionLocal()
+    try:
+        published = {e["id"] for e in get_echo_feed(db, processes * count)[0]}
+        cached = {e["id"] for e in get_cached_feed(db, limit=processes * count)[0]}
+        missing = published - cached
+        assert not missing, f"{len(missing)} of {len(published)} published echoes lost from the shared feed"
+        for key in FEED_KEYS:
+            assert get_cached_feed(db, echo_type=key) == get_echo_feed(db, echo_type=key), \
+                f"shared {key or 'all'} feed diverged from the database"
+    finally:
+        db.close()
+    print(f"✓ {processes} processes published {processes * count} echoes at once through one cache file "
+          f"({elapsed:.2f}s including start-up); every feed in the snapshot matches the database")
+
+
+if __name__ == "__main__":
+    if _WRITER:
+        writer(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        try:
+            run(int(sys.argv[1]) if len(sys.argv) > 1 else 4, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+        finally:
+            os.remove(_db_path)
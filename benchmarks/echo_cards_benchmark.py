@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Echo Card Fragment Benchmark
+
+Simulates Echo Wall reruns (20 wall cards, 10 gratitude, 10 sync) and
+compares formatting every card's f-string per rerun, one st.markdown
+element each, with the fragment cache, which emits one element per list.
+Reports Python formatting time and markdown elements per render.
+
+Run from the repository root:
+    python -m benchmarks.echo_cards_benchmark
+"""
+
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+# No queries are run, but importing the app's models needs a valid engine URL
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from echo_feed import ECHO_TYPES
+from echo_cards import render_echo_cards, fragment_cache_info, clear_fragment_cache
+
+RENDERS = 2_000
+NEW_ECHOES_EVERY = 50  # renders between broadcasts
+
+
+def make_echo(i: int, echo_type: str) -> dict:
+    when = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return {
+        "id": i, "user_id": i % 97, "echo_type": echo_type, "username": f"traveler{i % 97}",
+        "content": f"Echo {i}: the stars were <bright> & kind tonight\nand the wind agreed.",
+        "timestamp": when, "updated_at": when,
+    }
+
+
+def legacy_render(lists):
+    """The page's original per-card f-strings (one st.markdown call each)."""
+    payloads = []
+    for echo in lists["wall"]:
+        payloads.append(f"""
+            <div class="cosmic-card">
+                <p style="color: #9D8FFF; font-weight: bold;">{echo['username']}</p>
+                <p style="font-size: 0.85em; color: #888;">{ECHO_TYPES.get(echo['echo_type'], '')} • {echo['timestamp'].strftime('%Y-%m-%d %H:%M')}</p>
+                <p style="margin-top: 1rem; font-size: 1.05em;">"{echo['content']}"</p>
+                <div style="margin-top: 1rem; display: flex; gap: 1rem;">
+                    <span style="cursor: pointer;">💫 Resonate</span>
+                    <span style="cursor: pointer;">🌟 Inspire</span>
+                    <span style="cursor: pointer;">🙏 Grateful</span>
+                </div>
+            </div>
+            """)
+    for style, emoji in (("gratitude", "🙏"), ("sync", "✨")):
+        for echo in lists[style]:
+            payloads.append(f"""
+            <div class="cosmic-card">
+                <p style="color: #9D8FFF; font-size: 0.9em;">{echo['username']}</p>
+                <p style="margin-top: 0.5rem;">{emoji} {echo['content']}</p>
+            </div>
+            """)
+    return payloads
+
+
+def fragment_render(lists):
+    return [render_echo_cards(lists[style], style) for style in ("wall", "gratitude", "sync") if lists[style]]
+
+
+def simulate(render):
+    rng = random.Random(3)
+    next_id = 1_000
+    lists = {
+        "wall": [make_echo(i, rng.choice(list(ECHO_TYPES))) for i in range(20)],
+        "gratitude": [make_echo(100 + i, "gratitude") for i in range(10)],
+        "sync": [make_echo(200 + i, "sync") for i in range(10)],
+    }
+    elements = payload_bytes = 0
+    start = time.perf_counter()
+    for n in range(RENDERS):
+        if n % NEW_ECHOES_EVERY == 0:
+            # Someone broadcasts: the new echo enters the wall and its type's list
+            style = rng.choice(["gratitude", "sync"])
+            echo = make_echo(next_id, style)
+            next_id += 1
+            lists["wall"] = [echo] + lists["wall"][:-1]
+            lists[style] = [echo] + lists[style][:-1]
+        payloads = render(lists)
+        elements += len(payloads)
+        payload_bytes += sum(len(p.encode()) for p in payloads)
+    elapsed = time.perf_counter() - start
+    return elapsed / RENDERS * 1e6, elements / RENDERS, payload_bytes / RENDERS
+
+
+def check_markup():
+    hostile = make_echo(1, "thought")
+    hostile["content"] = "<script>alert(1)</script>\n\nnew paragraph"
+    html = render_echo_cards([hostile, make_echo(2, "wisdom")])
+    assert "<script>" not in html and "&lt;script&gt;" in html
+    assert "\n" not in html, "a blank line would end the markdown HTML block"
+    print("✓ Cards are escaped and form a single HTML block")
+
+
+def run():
+    check_markup()
+    clear_fragment_cache()
+    for label, render in (("Per-card f-strings", legacy_render), ("Fragment cache", fragment_render)):
+        us, elements, size = simulate(render)
+        print(f"{label:<20} {us:7.1f} us/render, {elements:4.1f} markdown elements/render, "
+              f"{size / 1024:5.1f} KiB/render")
+    info = fragment_cache_info()
+    print(f"Fragment cache: {info['hits']:,} hits, {info['misses']:,} misses "
+          f"({info['hits'] / (info['hits'] + info['misses']):.1%} hit rate)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Echo Feed Benchmark
+
+Renders the Echo Wall's three lists (latest 20, latest 10 gratitudes,
+latest 10 synchronicities) the old way (LIKE prefix filters, per-echo
+user lookups), backfills echo_type with migrate_echo_types, and renders
+them again through echo_feed, against a throwaway SQLite database.
+Reports SQL statements and latency per render, then compares deep
+scrolling with keyset pagination against OFFSET.
+
+Run from the repository root:
+    python -m benchmarks.echo_feed_benchmark [num_echoes]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "echo_feed_benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+from sqlalchemy import event
+from database import init_db, engine, SessionLocal, Echo, User
+from echo_feed import FEED_PAGE_SIZE, get_echo_feed, get_echo_feed_pages
+from migrate_echo_types import backfill_echo_types
+
+NUM_USERS = 2_000
+RENDERS = 200
+# Deepest page the scroll comparison reads (fewer when there aren't enough echoes)
+DEEP_SCROLL_PAGES = 2_000
+PREFIXES = ["[💭 Thought] ", "[💖 Feeling] ", "[GRATITUDE] 🙏 ", "[SYNC] ✨ "]
+
+_statements = 0
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global _statements
+    _statements += 1
+
+
+def seed(db, num_echoes: int):
+    rng = random.Random(11)
+    db.execute(User.__table__.insert(), [
+        {"username": f"traveler{i}", "email": f"traveler{i}@example.com"} for i in range(NUM_USERS)
+    ])
+    start = datetime(2025, 1, 1)
+    db.execute(Echo.__table__.insert(), [
+        {
+            "user_id": rng.randrange(NUM_USERS) + 1,
+            "content": f"{rng.choice(PREFIXES)}echo number {i}",
+            "timestamp": start + timedelta(seconds=i * 30 + rng.randrange(30)),
+        }
+        for i in range(num_echoes)
+    ])
+    db.commit()
+
+
+def render_legacy(db):
+    """The page's original queries: each list, then one user lookup per echo."""
+    lists = [db.query(Echo).order_by(Echo.timestamp.desc()).limit(20).all()]
+    for prefix in ("[GRATITUDE]%", "[SYNC]%"):
+        lists.append(db.query(Echo).filter(Echo.content.like(prefix))
+                     .order_by(Echo.timestamp.desc()).limit(10).all())
+    return [
+        [(db.query(User).filter(User.id == echo.user_id).first().username, echo.id) for echo in echoes]
+        for echoes in lists
+    ]
+
+
+def render_feed(db):
+    lists = [get_echo_feed(db)[0]]
+    for echo_type in ("gratitude", "sync"):
+        lists.append(get_echo_feed(db, limit=10, echo_type=echo_type)[0])
+    return [[(echo["username"], echo["id"]) for echo in echoes] for echoes in lists]
+
+
+def measure(label: str, render, db):
+    global _statements
+    _statements = 0
+    start = time.perf_counter()
+    for _ in range(RENDERS):
+        render(db)
+        # A fresh identity map per render, like a fresh Streamlit rerun
+        db.expunge_all()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {_statements / RENDERS:5.1f} statements/render  "
+          f"{elapsed / RENDERS * 1000:7.2f} ms/render")
+
+
+def _offset_page(db, page: int):
+    """What an OFFSET-paginated feed would run for the same page."""
+    return (db.query(Echo.id, Echo.user_id, Echo.content, Echo.timestamp, User.username)
+            .join(User, User.id == Echo.user_id)
+            .order_by(Echo.timestamp.desc(), Echo.id.desc())
+            .offset((page - 1) * FEED_PAGE_SIZE).limit(FEED_PAGE_SIZE).all())
+
+
+def measure_deep_scroll(db, pages: int, repeats: int = 50):
+    echoes, _ = get_echo_feed_pages(db, pages)
+    _, cursor = get_echo_feed_pages(db, pages - 1)
+    assert [e["id"] for e in echoes[-FEED_PAGE_SIZE:]] == [r.id for r in _offset_page(db, pages)]
+
+    for page, page_cursor in ((2, get_echo_feed(db)[1]), (pages, cursor)):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            get_echo_feed(db, before=page_cursor)
+        keyset_ms = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            _offset_page(db, page)
+        offset_ms = (time.perf_counter() - start) / repeats * 1000
+        print(f"Page {page:>4}: keyset {keyset_ms:6.2f} ms, OFFSET {offset_ms:6.2f} ms")
+
+
+def run(num_echoes: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        seed(db, num_echoes)
+        print(f"Seeded {num_echoes:,} echoes from {NUM_USERS:,} users in {time.perf_counter() - start:.1f}s")
+
+        legacy = render_legacy(db)
+        measure("Legacy (N+1 lookups)", render_legacy, db)
+
+        start = time.perf_counter()
+        backfill_echo_types(db, batch_size=50_000)
+        print(f"Backfilled echo_type in {time.perf_counter() - start:.1f}s")
+
+        assert legacy == render_feed(db), "feed differs from the legacy render"
+        measure("echo_feed (joined)", render_feed, db)
+        # Only full pages; page 2 and the deepest page are compared
+        pages = min(DEEP_SCROLL_PAGES, num_echoes // FEED_PAGE_SIZE)
+        if pages > 2:
+            measure_deep_scroll(db, pages)
+        else:
+            print(f"Skipping deep scroll: {num_echoes:,} echoes fill fewer than 3 pages")
+    finally:
+        db.close()
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
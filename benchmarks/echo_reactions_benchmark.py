@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Echo Reactions Benchmark
+
+Hammers a handful of popular echoes with reactions from many threads
+against a throwaway SQLite database: first one transaction per click
+(insert the event, bump a single counter row), then through
+echo_reactions' in-memory aggregation with batched, sharded flushes.
+Reports accepted reactions/s, click latency, and transactions written,
+and checks that the database totals match the clicks. Then re-reads
+totals from the database on every read while clicks and flushes go on,
+checking that no read ever counts a batch twice or misses one. Ends with
+a long database outage (nothing is lost, and new reactions are refused
+once the buffer is full) and a batch with rows the database rejects
+(only those are dropped).
+
+Run from the repository root:
+    python -m benchmarks.echo_reactions_benchmark [clicks]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "echo_reactions_benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+import numpy as np
+from sqlalchemy import create_engine, event, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from database import init_db, engine, SessionLocal, Echo, User, EchoReaction, EchoReactionCount
+import echo_reactions
+from echo_reactions import REACTIONS, ReactionBufferFull, add_reaction, flush_reactions, get_reaction_counts
+
+THREADS = 32
+HOT_ECHOES = 5
+NAIVE_CLICKS = 2_000
+
+_commits = 0
+
+@event.listens_for(engine, "commit")
+def _count_commit(conn):
+    global _commits
+    _commits += 1
+
+
+def seed(db):
+    db.execute(User.__table__.insert(), [
+        {"username": f"traveler{i}", "email": f"traveler{i}@example.com"} for i in range(100)
+    ])
+    db.execute(Echo.__table__.insert(), [
+        {"user_id": 1, "echo_type": "thought", "content": f"popular echo {i}"} for i in range(HOT_ECHOES)
+    ])
+    db.commit()
+
+
+def naive_click(db, echo_id: int, user_id: int, reaction: str):
+    """One transaction per click, all clicks on an echo updating the same counter row."""
+    db.add(EchoReaction(echo_id=echo_id, user_id=user_id, reaction=reaction))
+    updated = db.query(EchoReactionCount).filter(
+        EchoReactionCount.echo_id == echo_id,
+        EchoReactionCount.reaction == reaction,
+        EchoReactionCount.shard == 0
+    ).update({EchoReactionCount.count: EchoReactionCount.count + 1})
+    if not updated:
+        db.add(EchoReactionCount(echo_id=echo_id, reaction=reaction, shard=0, count=1))
+    db.commit()
+
+
+def clicks_for(thread_id: int, n: int):
+    rng = random.Random(thread_id)
+    return [(rng.randrange(HOT_ECHOES) + 1, rng.randrange(100) + 1, rng.choice(list(REACTIONS))) for _ in range(n)]
+
+
+def hammer(label: str, clicks: int, click):
+    per_thread = clicks // THREADS
+    latencies = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(thread_id):
+        db = SessionLocal()
+        planned = clicks_for(thread_id, per_thread)
+        barrier.wait()
+        try:
+            for echo_id, user_id, reaction in planned:
+                start = time.perf_counter()
+                click(db, echo_id, user_id, reaction)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    print(f"{label:<20} {len(latencies) / elapsed:10,.0f} reactions/s, "
+          f"click p50 {p50:7.3f} ms, p99 {p99:8.3f} ms")
+    return per_thread * THREADS
+
+
+def check_totals(db, expected: int):
+    total = db.query(func.sum(EchoReactionCount.count)).scalar() or 0
+    events = db.query(func.count(EchoReaction.id)).scalar()
+    assert total == expected and events == expected, (total, events, expected)
+
+
+def reset(db):
+    db.query(EchoReaction).delete()
+    db.query(EchoReactionCount).delete()
+    db.commit()
+
+
+def consistent_reads(seconds: float = 3.0, readers: int = 4):
+    """Every read's total lies between the clicks accepted before and after it."""
+    echo_ids = list(range(1, HOT_ECHOES + 1))
+    ttl = echo_reactions.REACTION_COUNTS_TTL_SECONDS
+    # Re-read the database on every read, so reads keep overlapping flushes
+    echo_reactions.REACTION_COUNTS_TTL_SECONDS = 0.0
+    echo_reactions.REACTION_FLUSH_SECONDS = 0.01
+    db = SessionLocal()
+    base = sum(sum(c.values()) for c in get_reaction_counts(db, echo_ids).values())
+    db.close()
+    # Clicks begun and clicks accepted; a read must land between them
+    begun, accepted = [0], [0]
+    stop = time.perf_counter() + seconds
+    bad, reads = [], [0]
+
+    def clicker():
+        rng = random.Random(1)
+        while time.perf_counter() < stop:
+            begun[0] += 1
+            add_reaction(rng.randrange(HOT_ECHOES) + 1, rng.randrange(100) + 1, rng.choice(list(REACTIONS)))
+            accepted[0] += 1
+            time.sleep(0.0002)
+
+    def reader():
+        db = SessionLocal()
+        try:
+            while time.perf_counter() < stop:
+                before = accepted[0]
+                total = sum(sum(c.values()) for c in get_reaction_counts(db, echo_ids).values()) - base
+                after = begun[0]
+                reads[0] += 1
+                if not before <= total <= after:
+                    bad.append((before, total, after))
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=clicker)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    echo_reactions.REACTION_COUNTS_TTL_SECONDS = ttl
+    flush_reactions()
+    assert not bad, f"{len(bad)} of {reads[0]} reads miscounted, e.g. {bad[:3]}"
+    print(f"✓ {reads[0]:,} database reads during {accepted[0]:,} clicks and ongoing flushes all counted exactly")
+
+
+def flush_failures(db, outage_flushes: int = 20, rejected: int = 3):
+    # Flush only when told to
+    echo_reactions.REACTION_FLUSH_SECONDS = 3600
+    flush_reactions()
+    before = db.query(func.sum(EchoReactionCount.count)).scalar() or 0
+
+    # An outage much longer than a few flush intervals: every flush fails and nothing is dropped
+    session_local = echo_reactions.SessionLocal
+    echo_reactions.SessionLocal = sessionmaker(bind=create_engine("sqlite:////nonexistent/echo_reactions.db"))
+    for i in range(1_000):
+        add_reaction(i % HOT_ECHOES + 1, i % 100 + 1, "resonate")
+    for _ in range(outage_flushes):
+        try:
+            flush_reactions()
+            raise AssertionError("a flush during the outage should fail")
+        except OperationalError:
+            pass
+    limit = echo_reactions.REACTION_BUFFER_LIMIT
+    echo_reactions.REACTION_BUFFER_LIMIT = 1_010
+    refused = 0
+    for i in range(20):
+        try:
+            add_reaction(1, 1, "inspire")
+        except ReactionBufferFull:
+            refused += 1
+    echo_reactions.REACTION_BUFFER_LIMIT = limit
+    echo_reactions.SessionLocal = session_local
+    assert refused == 10, refused
+    assert flush_reactions() == 1_010
+    check_total = db.query(func.sum(EchoReactionCount.count)).scalar()
+    assert check_total == before + 1_010, (check_total, before)
+    print(f"✓ {outage_flushes} failed flushes in a row (a {outage_flushes * 5}s outage at the default interval) "
+          f"lost none of 1,010 reactions; {refused} more were refused once the buffer was full")
+
+    # Rows the database rejects on their own are the only ones dropped
+    db.execute(text("CREATE TRIGGER reject_reaction BEFORE INSERT ON echo_reactions WHEN NEW.user_id < 0 "
+                    "BEGIN SELECT RAISE(ABORT, 'rejected reaction'); END"))
+    db.commit()
+    for i in range(1_000):
+        add_reaction(i % HOT_ECHOES + 1, -1 if i % (1_000 // rejected) == 7 else i % 100 + 1, "grateful")
+    written = flush_reactions()
+    db.execute(text("DROP TRIGGER reject_reaction"))
+    db.commit()
+    check_total = db.query(func.sum(EchoReactionCount.count)).scalar()
+    assert written == 1_000 - rejected and check_total == before + 1_010 + written, (written, check_total)
+    print(f"✓ A batch of 1,000 with {rejected} rejected rows wrote the other {written} and dropped only those")
+
+
+def run(clicks: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        seed(db)
+
+        done = hammer("Per-click commit", NAIVE_CLICKS, naive_click)
+        check_totals(db, done)
+        print(f"{'':<20} {done:,} transactions")
+        reset(db)
+
+        echo_reactions.REACTION_FLUSH_SECONDS = 0.25
+        # The burst outpaces any flush interval; let it all buffer
+        echo_reactions.REACTION_BUFFER_LIMIT = max(clicks, echo_reactions.REACTION_BUFFER_LIMIT)
+        global _commits
+        _commits = 0
+        done = hammer("Buffered + sharded", clicks, lambda _db, *args: add_reaction(*args))
+        # Reads see unflushed reactions immediately
+        counts = get_reaction_counts(db, list(range(1, HOT_ECHOES + 1)))
+        assert sum(sum(c.values()) for c in counts.values()) == done
+
+        flush_reactions()
+        check_totals(db, done)
+        shards = db.query(func.count(EchoReactionCount.id)).scalar()
+        print(f"{'':<20} {_commits:,} flush transactions, {shards} counter rows "
+              f"for {len(REACTIONS) * HOT_ECHOES} echo/reaction pairs")
+
+        consistent_reads()
+        flush_failures(db)
+    finally:
+        db.close()
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
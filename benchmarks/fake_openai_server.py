@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Fake Chat Completion Server
+
+A local stand-in for the OpenAI chat completions endpoint, for timing the
+app's model calls without network access or API keys. Every request waits
+`latency` seconds and answers with a reply that names the first line of the
+system prompt, so callers can check which request a reply belongs to.
+Replies are `reply_words` words long and take `token_delay` seconds per
+word to generate; requests with "stream": true get them word by word as
+server-sent events, like the real API. Setting `fail_status` makes every
+request fail with that HTTP status, or only the next `fail_remaining`.
+Setting `cut_after` makes streams drop the connection after that many
+pieces, like an upstream that dies part-way through a reply.
+
+    with FakeCompletionServer(latency=0.5) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        ...
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+_REPLY_PHRASE = "A thoughtful reply from afar.".split()
+
+
+class FakeCompletionServer:
+    def __init__(self, latency: float = 0.5, fail_status: Optional[int] = None,
+                 token_delay: float = 0.0, reply_words: int = 5):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply_words = reply_words
+        self.fail_status = fail_status
+        self.fail_remaining: Optional[int] = None
+        self.cut_after: Optional[int] = None
+        self.requests = 0
+        self.bodies = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeCompletionServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeCompletionServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reply_for(self, body: Dict) -> str:
+        return "".join(self.tokens_for(body))
+
+    def tokens_for(self, body: Dict) -> List[str]:
+        """The reply split into the pieces a stream delivers: the tag, then one word each."""
+        system = next((m["content"] for m in body.get("messages", []) if m["role"] == "system"), "")
+        words = [_REPLY_PHRASE[i % len(_REPLY_PHRASE)] for i in range(self.reply_words)]
+        return [f"[{system.splitlines()[0] if system else 'no system prompt'}]"] + [f" {w}" for w in words]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                    server.bodies.append(body)
+                    fail_status = server.fail_status if server.fail_remaining != 0 else None
+                    if fail_status and server.fail_remaining is not None:
+                        server.fail_remaining -= 1
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                try:
+                    time.sleep(server.latency)
+                    if fail_status:
+                        self._send_json(fail_status, {"error": {"message": "fake failure", "type": "server_error"}})
+                    elif body.get("stream"):
+                        self._send_stream(body)
+                    else:
+                        time.sleep(server.token_delay * len(server.tokens_for(body)))
+                        self._send_json(200, server.completion(body))
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting (a timeout under test)
+                    pass
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+            def _send_json(self, status: int, payload: Dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, body: Dict):
+                cut_after = server.cut_after
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                if cut_after is not None:
+                    # Promise more than is sent, so the client sees the connection drop mid-reply
+                    self.send_header("Content-Length", str(1 << 20))
+                    self.close_connection = True
+                self.end_headers()
+                for i, token in enumerate(server.tokens_for(body)):
+                    if i == cut_after:
+                        return
+                    time.sleep(server.token_delay)
+                    self._send_event(server.chunk(body, {"role": "assistant", "content": token}))
+                self._send_event(server.chunk(body, {}, finish_reason="stop"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_event(self, payload: Dict):
+                self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+                self.wfile.flush()
+
+        return Handler
+
+    def completion(self, body: Dict) -> Dict:
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply_for(body)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def chunk(self, body: Dict, delta: Dict, finish_reason: Optional[str] = None) -> Dict:
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache Benchmark
+
+Replays a burst of meditation, empathy bridge and guidance requests drawn
+from a handful of identical inputs (the same scenario for the same age
+profile, clicked again and again) against a local fake completion server,
+with the response cache off and then on. Also checks the cache key's
+temperature buckets, LRU eviction, that fallbacks are never cached, and
+that the SQLite tier answers after a simulated restart.
+
+Run from the repository root:
+    python -m benchmarks.llm_cache_benchmark [latency_seconds] [requests]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_openai_server import FakeCompletionServer
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+_server = FakeCompletionServer(latency=LATENCY).start()
+
+# Point the OpenAI client at the fake server before the app imports it
+os.environ["OPENAI_BASE_URL"] = _server.base_url
+os.environ["OPENAI_API_KEY"] = "fake-key"
+
+import llm_cache
+from ai_agents import (
+    DIPLOMATIC_SCENARIOS,
+    generate_diplomatic_guidance,
+    generate_empathy_bridge,
+    generate_perspective_meditation,
+    get_age_profile,
+)
+from llm_cache import cache_key, clear_llm_cache, llm_cache_metrics, reset_llm_cache_metrics
+
+AGES = [9, 15, 34, 70]
+SITUATIONS = [
+    "My best friend sat with someone else at lunch.",
+    "My brother always picks the movie.",
+    "A coworker keeps interrupting me in meetings.",
+]
+
+
+def workload(n: int):
+    """n requests over a few distinct inputs, the way repeat clicks arrive."""
+    rng = random.Random(42)
+    calls = []
+    for _ in range(n):
+        age_profile = get_age_profile(rng.choice(AGES))
+        kind = rng.choice(["meditation", "bridge", "guidance"])
+        if kind == "meditation":
+            calls.append(lambda a=age_profile, s=rng.choice(SITUATIONS): generate_perspective_meditation(s, a)["meditation"])
+        elif kind == "bridge":
+            calls.append(lambda a=age_profile: generate_empathy_bridge("I want quiet evenings.", "I want to have friends over.", a))
+        else:
+            scenario = DIPLOMATIC_SCENARIOS[age_profile["key"]][0]
+            calls.append(lambda a=age_profile, sc=scenario: generate_diplomatic_guidance(sc, "I would listen first.", a))
+    return calls
+
+
+def replay(calls):
+    requests_before = _server.requests
+    latencies = []
+    start = time.perf_counter()
+    for call in calls:
+        t = time.perf_counter()
+        assert call()
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(latencies) / len(latencies), _server.requests - requests_before
+
+
+def checks():
+    messages = [{"role": "user", "content": "hello"}]
+    assert cache_key("m", messages, 0.80, "teen_navigator") == cache_key("m", messages, 0.81, "teen_navigator")
+    assert cache_key("m", messages, 0.80, "teen_navigator") != cache_key("m", messages, 0.90, "teen_navigator")
+    assert cache_key("m", messages, 0.80, "teen_navigator") != cache_key("m", messages, 0.80, "young_explorer")
+
+    # Fallbacks are not cached: the next identical request asks the model again
+    age_profile = get_age_profile(15)
+    _server.fail_status = 400
+    assert "cosmic mist" in generate_empathy_bridge("Fallback A", "Fallback B", age_profile)
+    _server.fail_status = None
+    assert "cosmic mist" not in generate_empathy_bridge("Fallback A", "Fallback B", age_profile)
+
+    # Least recently used replies go first once the cache is full
+    llm_cache.LLM_CACHE_SIZE = 2
+    clear_llm_cache()
+    for text in ("one", "two", "three"):
+        llm_cache.store_reply(text, text)
+    assert llm_cache.get_cached_reply("one") is None and llm_cache.get_cached_reply("three") == "three"
+    llm_cache.LLM_CACHE_SIZE = 1024
+
+    # The SQLite tier answers after a restart (an empty memory tier)
+    llm_cache.LLM_CACHE_PATH = os.path.join(tempfile.mkdtemp(), "llm_cache.db")
+    clear_llm_cache()
+    generate_empathy_bridge("Persist A", "Persist B", age_profile)
+    clear_llm_cache()
+    requests_before = _server.requests
+    start = time.perf_counter()
+    generate_empathy_bridge("Persist A", "Persist B", age_profile)
+    disk_ms = (time.perf_counter() - start) * 1000
+    assert _server.requests == requests_before and llm_cache_metrics()["disk_hits"] >= 1
+    os.remove(llm_cache.LLM_CACHE_PATH)
+    print(f"✓ Temperature buckets, LRU eviction, uncached fallbacks; "
+          f"restart served from SQLite in {disk_ms:.2f} ms without a model call")
+
+
+def run():
+    calls = workload(REQUESTS)
+    print(f"🌌 {REQUESTS} requests over {len(AGES)} age profiles, {LATENCY:.2f}s per model call")
+    try:
+        llm_cache.LLM_CACHE_SIZE = 0
+        elapsed, avg, requests = replay(calls)
+        print(f"🧠 Cache off: {elapsed:6.2f}s total, {avg * 1000:7.1f} ms avg per request, {requests} model calls")
+
+        llm_cache.LLM_CACHE_SIZE = 1024
+        clear_llm_cache()
+        reset_llm_cache_metrics()
+        elapsed, avg, requests = replay(calls)
+        metrics = llm_cache_metrics()
+        print(f"🧠 Cache on:  {elapsed:6.2f}s total, {avg * 1000:7.1f} ms avg per request, {requests} model calls "
+              f"(hit rate {metrics['hit_rate']:.0%}, {metrics['size']} cached)")
+
+        start = time.perf_counter()
+        for call in calls:
+            call()
+        hit_us = (time.perf_counter() - start) / len(calls) * 1e6
+        print(f"⚡ Warm cache: {hit_us:.0f} us per request including prompt building")
+
+        checks()
+    finally:
+        _server.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+LLM Client Benchmark
+
+Exercises llm_client against a local fake completion server: transient
+429/503s are retried with backoff, bad requests are not, and during an
+outage (every call failing, or the upstream hanging) council consultations
+wait for the per-call deadline only until the circuit opens, after which
+the meditating fallbacks come back instantly. The module-level OpenAI
+client the app used before is timed on the same outages for comparison.
+Ends by checking the circuit closes again once the upstream recovers.
+
+Run from the repository root:
+    python -m benchmarks.llm_client_benchmark
+"""
+
+import os
+import time
+
+from benchmarks.fake_openai_server import FakeCompletionServer
+
+_server = FakeCompletionServer(latency=0.05).start()
+
+# Point the OpenAI client at the fake server before the app imports it; short
+# timeouts and cooldown keep the run brief, and every call should reach the server
+os.environ["OPENAI_BASE_URL"] = _server.base_url
+os.environ["OPENAI_API_KEY"] = "fake-key"
+os.environ["LLM_CACHE_SIZE"] = "0"
+os.environ["LLM_TIMEOUT_SECONDS"] = "1"
+os.environ["LLM_DEADLINE_SECONDS"] = "3"
+os.environ["LLM_BREAKER_COOLDOWN_SECONDS"] = "2"
+
+import openai
+import llm_client
+from ai_agents import consult_council, get_age_profile, select_council_members
+from llm_client import LLMUnavailable, chat_completion, llm_client_metrics, reset_llm_client_metrics
+
+MESSAGES = [
+    {"role": "system", "content": "You are The Sage, an ancient cosmic guide."},
+    {"role": "user", "content": "What do the stars say about patience?"},
+]
+SITUATION = "My friend and I both want to lead the science fair project."
+CONSULTATIONS = 10
+
+
+def transient(status: int):
+    reset_llm_client_metrics()
+    _server.fail_status, _server.fail_remaining = status, 2
+    start = time.perf_counter()
+    assert chat_completion(MESSAGES, 0.8, 200).startswith("[You are The Sage")
+    elapsed = time.perf_counter() - start
+    _server.fail_status, _server.fail_remaining = None, None
+    assert llm_client_metrics()["retries"] == 2
+    print(f"🔁 Two {status}s then success: answered after 2 retries in {elapsed:.2f}s")
+
+
+def bad_request():
+    requests_before = _server.requests
+    _server.fail_status = 400
+    try:
+        chat_completion(MESSAGES, 0.8, 200)
+        raise AssertionError("a 400 should raise")
+    except openai.BadRequestError:
+        pass
+    _server.fail_status = None
+    assert _server.requests == requests_before + 1
+    print("✓ 400 is not retried")
+
+
+def legacy_member_call() -> float:
+    """One council member the old way: the module-level client with SDK defaults."""
+    start = time.perf_counter()
+    try:
+        openai.chat.completions.create(model="gpt-3.5-turbo", messages=MESSAGES, temperature=0.85, max_tokens=200)
+    except Exception:
+        pass
+    return time.perf_counter() - start
+
+
+def outage(label: str):
+    """Consult the council repeatedly while the upstream is down."""
+    age_profile = get_age_profile(14)
+    legacy_s = legacy_member_call()
+    reset_llm_client_metrics()
+    timings = []
+    for _ in range(CONSULTATIONS):
+        members = select_council_members(3)
+        start = time.perf_counter()
+        discussions = consult_council(members, SITUATION, age_profile)
+        timings.append(time.perf_counter() - start)
+        assert [d["response"] for d in discussions] == [f"*{m['name']} is meditating on this...*" for m in members]
+    metrics = llm_client_metrics()
+    print(f"🌑 {label}: old client {legacy_s:5.2f}s per consultation | llm_client first "
+          f"{timings[0]:4.2f}s, then {sum(timings[-5:]) / 5 * 1000:6.2f} ms once the circuit is {metrics['breaker']} "
+          f"({metrics['short_circuited']} calls skipped, {sum(timings):5.2f}s for {CONSULTATIONS} consultations)")
+    assert metrics["breaker"] == "open"
+
+
+def recovery():
+    _server.fail_status = None
+    _server.latency = 0.05
+    try:
+        chat_completion(MESSAGES, 0.8, 200)
+        raise AssertionError("the open circuit should answer at once")
+    except LLMUnavailable:
+        pass
+    time.sleep(llm_client.LLM_BREAKER_COOLDOWN_SECONDS)
+    assert chat_completion(MESSAGES, 0.8, 200)
+    assert llm_client_metrics()["breaker"] == "closed"
+    print("✓ After the cooldown one trial call goes out and closes the circuit")
+
+
+def run():
+    print(f"🛰️ {llm_client.LLM_TIMEOUT_SECONDS:.0f}s per attempt, {llm_client.LLM_DEADLINE_SECONDS:.0f}s per call, "
+          f"{llm_client.LLM_MAX_RETRIES} retries, circuit opens after {llm_client.LLM_BREAKER_THRESHOLD} failed calls")
+    try:
+        transient(503)
+        transient(429)
+        bad_request()
+
+        _server.fail_status = 503
+        outage("Upstream returning 503")
+
+        time.sleep(llm_client.LLM_BREAKER_COOLDOWN_SECONDS)
+        _server.fail_status = None
+        _server.latency = 5.0
+        outage("Upstream hanging 5s ")
+
+        recovery()
+        assert llm_client.get_client() is llm_client.get_client()
+    finally:
+        _server.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Benchmark
+
+Simulates login storms at several concurrency levels: bcrypt checks run
+inline in each script thread (as before), then through the bounded worker
+pool in password_hashing. Alongside each storm a probe thread does a
+small slice of Python work in a loop, standing in for other sessions'
+reruns, and reports its latency. Ends with a burst beyond the queue limit
+to show backpressure (HashingBusy) instead of unbounded queueing.
+
+Run from the repository root (cost defaults to 10 to keep it short):
+    BCRYPT_ROUNDS=12 python -m benchmarks.password_hashing_benchmark
+"""
+
+import os
+import threading
+import time
+
+os.environ.setdefault("BCRYPT_ROUNDS", "10")
+
+import bcrypt
+import numpy as np
+import password_hashing
+from password_hashing import HashingBusy, verify_password
+
+CONCURRENCY = [1, 4, 16, 64]
+LOGINS_PER_LEVEL = 64
+PASSWORD = "correct horse battery staple"
+
+
+def inline_verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def probe(stop: threading.Event, latencies: list):
+    """A stand-in rerun: ~1 ms of Python work, timed end to end."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(20_000))
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.005)
+
+
+def storm(threads: int, verify, hashed: str):
+    per_thread = max(1, LOGINS_PER_LEVEL // threads)
+    stop = threading.Event()
+    probe_latencies = []
+    prober = threading.Thread(target=probe, args=(stop, probe_latencies))
+
+    rejected = []
+
+    def worker():
+        for _ in range(per_thread):
+            try:
+                assert verify(PASSWORD, hashed)
+            except HashingBusy:
+                rejected.append(1)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    prober.start()
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    p50, p99 = np.percentile(np.array(probe_latencies) * 1000, [50, 99])
+    return (per_thread * threads - len(rejected)) / elapsed, len(rejected), p50, p99
+
+
+def backpressure(hashed: str):
+    """Burst well past the queue limit with a short wait for a slot."""
+    password_hashing.HASH_QUEUE_TIMEOUT = 0.05
+    accepted = rejected = 0
+    lock = threading.Lock()
+
+    def login():
+        nonlocal accepted, rejected
+        try:
+            verify_password(PASSWORD, hashed)
+            outcome = "accepted"
+        except HashingBusy:
+            outcome = "rejected"
+        with lock:
+            if outcome == "accepted":
+                accepted += 1
+            else:
+                rejected += 1
+
+    burst = [threading.Thread(target=login) for _ in range(password_hashing.HASH_QUEUE_LIMIT * 4)]
+    for t in burst:
+        t.start()
+    for t in burst:
+        t.join()
+    print(f"Burst of {len(burst)} logins (queue limit {password_hashing.HASH_QUEUE_LIMIT}): "
+          f"{accepted} accepted, {rejected} told to retry")
+
+
+def run():
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(password_hashing.BCRYPT_ROUNDS)).decode()
+    print(f"🔐 bcrypt cost {password_hashing.BCRYPT_ROUNDS}, {password_hashing.HASH_WORKERS} hashing workers, "
+          f"{os.cpu_count()} cores")
+    verify_password(PASSWORD, hashed)  # start the pool outside the timings
+    try:
+        for threads in CONCURRENCY:
+            for label, verify in (("Inline", inline_verify), ("Worker pool", verify_password)):
+                rate, rejected, p50, p99 = storm(threads, verify, hashed)
+                print(f"{threads:3d} concurrent  {label:<12} {rate:7.1f} logins/s ({rejected:2d} told to retry), "
+                      f"rerun probe p50 {p50:6.2f} ms, p99 {p99:7.2f} ms")
+        backpressure(hashed)
+    finally:
+        password_hashing.shutdown_hashing_pool()
+
+
+if __name__ == "__main__":
+    run()
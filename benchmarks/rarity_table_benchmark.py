@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Rarity Table Micro-benchmark
+
+Compares per-star recomputation (calculate_rarity_score + tier walk)
+with the precomputed (hour, month) rarity table lookup.
+
+Run from the repository root:
+    python -m benchmarks.rarity_table_benchmark
+"""
+
+import timeit
+import numpy as np
+from star_system import (
+    STAR_DATABASE,
+    RARITY_TIERS,
+    RARITY_TIER_NAMES,
+    calculate_rarity_score,
+    get_rarity_tier,
+    get_rarity_table,
+    lookup_rarity
+)
+
+REPEATS = 2_000
+
+
+def linear_rarity_tier(score: float) -> str:
+    """The previous linear walk over RARITY_TIERS, kept for comparison."""
+    for tier, data in RARITY_TIERS.items():
+        min_score, max_score = data["score_range"]
+        if min_score <= score < max_score:
+            return tier
+    return "Mythic"
+
+
+def recompute_path(hour: int, month: int, tier_fn):
+    time_factors = {"hour": hour, "month": month}
+    for star in STAR_DATABASE:
+        tier_fn(calculate_rarity_score(star["base_rarity"], star["category"], time_factors))
+
+
+def table_path(hour: int, month: int, indices: np.ndarray):
+    _, tiers = lookup_rarity(indices, hour, month)
+    [RARITY_TIER_NAMES[t] for t in tiers.tolist()]
+
+
+def run():
+    indices = np.arange(len(STAR_DATABASE))
+    start = timeit.default_timer()
+    get_rarity_table()
+    build_us = (timeit.default_timer() - start) * 1e6
+
+    # Both paths must agree for every (hour, month)
+    for hour in range(24):
+        for month in range(1, 13):
+            scores, tiers = lookup_rarity(indices, hour, month)
+            for star, score, tier in zip(STAR_DATABASE, scores.tolist(), tiers.tolist()):
+                expected = calculate_rarity_score(star["base_rarity"], star["category"],
+                                                  {"hour": hour, "month": month})
+                assert score == expected and RARITY_TIER_NAMES[tier] == linear_rarity_tier(expected)
+
+    cases = {
+        "recompute + linear tier walk": lambda: recompute_path(3, 12, linear_rarity_tier),
+        "recompute + bisect tier": lambda: recompute_path(3, 12, get_rarity_tier),
+        "precomputed table lookup": lambda: table_path(3, 12, indices),
+    }
+    print(f"Catalog: {len(STAR_DATABASE)} stars, table built in {build_us:.0f}us")
+    for label, fn in cases.items():
+        per_call = min(timeit.repeat(fn, number=REPEATS, repeat=5)) / REPEATS * 1e6
+        print(f"  {label:<30} {per_call:8.2f} us per catalog pass")
+
+    score = 72.5
+    for label, fn in (("linear walk", linear_rarity_tier), ("bisect", get_rarity_tier)):
+        per_call = min(timeit.repeat(lambda: fn(score), number=100_000, repeat=5)) / 100_000 * 1e9
+        print(f"  tier classification ({label}): {per_call:6.0f} ns")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Full-text Search Benchmark
+
+Fills a throwaway SQLite database with synthetic echoes (1,000,000 by
+default) through the FTS5 triggers, so every row is indexed on insert,
+then times search_content for rare, common, multi-word and stemmed
+queries against a LIKE '%...%' scan of the same table.
+
+Run from the repository root:
+    python -m benchmarks.search_benchmark [echoes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "search_benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+import numpy as np
+from sqlalchemy import text
+from database import init_db, SessionLocal, Echo, User
+from search_index import ensure_search_index, search_content
+
+BATCH = 50_000
+REPEATS = 50
+WORDS_PER_ECHO = 12
+
+COSMIC_WORDS = [
+    "star", "nebula", "dream", "light", "ocean", "gratitude", "silence", "orbit",
+    "signal", "garden", "river", "moon", "harmony", "echo", "seed", "wonder",
+]
+# Zipf-like vocabulary: a few very common words and a long tail of rare ones
+VOCABULARY = COSMIC_WORDS + [f"word{i}" for i in range(50_000)]
+
+QUERIES = {
+    "rare word": "word3000",
+    "common word": "star",
+    "two words": "nebula gratitude",
+    "stemmed": "dreams",
+    "no match": "supercalifragilistic",
+}
+
+
+def synthetic_contents(rng, n: int):
+    ranks = np.minimum(rng.zipf(1.3, size=(n, WORDS_PER_ECHO)) - 1, len(VOCABULARY) - 1)
+    return [" ".join(VOCABULARY[r] for r in row) for row in ranks]
+
+
+def seed(db, total: int) -> float:
+    db.execute(User.__table__.insert(), [
+        {"username": f"traveler{i}", "email": f"traveler{i}@example.com"} for i in range(1_000)
+    ])
+    db.commit()
+    ensure_search_index()
+
+    rng = np.random.default_rng(16)
+    start_time = datetime(2025, 1, 1)
+    start = time.perf_counter()
+    for offset in range(0, total, BATCH):
+        n = min(BATCH, total - offset)
+        contents = synthetic_contents(rng, n)
+        db.execute(Echo.__table__.insert(), [
+            {
+                "user_id": (offset + i) % 1_000 + 1,
+                "echo_type": "thought",
+                "content": content,
+                "timestamp": start_time + timedelta(seconds=offset + i),
+            }
+            for i, content in enumerate(contents)
+        ])
+        db.commit()
+    return time.perf_counter() - start
+
+
+def time_query(fn, repeats: int = REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(np.array(timings) * 1000, [50, 99])
+    return p50, p99, len(result)
+
+
+def like_scan(db, word: str):
+    return db.execute(text(
+        "SELECT e.id FROM echoes e WHERE lower(e.content) LIKE :pattern "
+        "ORDER BY e.timestamp DESC LIMIT 20"
+    ), {"pattern": f"%{word}%"}).fetchall()
+
+
+def run(total: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        elapsed = seed(db, total)
+        print(f"📡 Indexed {total:,} echoes on insert in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+        worst = 0.0
+        for label, query in QUERIES.items():
+            p50, p99, hits = time_query(lambda: search_content(db, query, sources=("echoes",)))
+            worst = max(worst, p99)
+            print(f"FTS5   {label:<12} p50 {p50:7.2f} ms, p99 {p99:7.2f} ms ({hits} results)")
+
+        for label in ("rare word", "common word"):
+            p50, _, hits = time_query(lambda: like_scan(db, QUERIES[label]), repeats=3)
+            print(f"LIKE   {label:<12} p50 {p50:7.2f} ms ({hits} results)")
+
+        # A new echo is searchable as soon as it is committed
+        db.execute(Echo.__table__.insert(), {"user_id": 1, "echo_type": "thought", "content": "a brand new zephyrine thought"})
+        db.commit()
+        assert search_content(db, "zephyrine", sources=("echoes",)), "new echo was not indexed"
+        print("✓ New echoes are searchable immediately")
+        print(f"{'✓' if worst < 50 else '✗'} Worst FTS p99: {worst:.2f} ms (target < 50 ms)")
+    finally:
+        db.close()
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Sky Index Benchmark
+
+Compares zenith-query latency of the RA/Dec grid index against a full
+vectorized scan for catalogs from 16 to 1M stars.
+
+Run from the repository root:
+    python -m benchmarks.sky_index_benchmark
+"""
+
+import time
+import numpy as np
+from sky_index import SkyIndex
+
+CATALOG_SIZES = [16, 256, 4_096, 8_192, 16_384, 65_536, 1_048_576]
+QUERIES = 2_000
+THRESHOLD = 5.0  # degrees, matches STAR_ALIGNMENT_THRESHOLD on the Star Finder page
+
+
+def linear_first_at_zenith(ra_degrees, declination, lst, lat, threshold):
+    ra_diff = np.abs(ra_degrees - lst)
+    ra_diff = np.where(ra_diff > 180, 360 - ra_diff, ra_diff)
+    hits = np.flatnonzero((ra_diff < threshold) & (np.abs(declination - lat) < threshold))
+    return int(hits[0]) if hits.size else None
+
+
+def run():
+    rng = np.random.default_rng(42)
+    lsts = rng.uniform(0, 360, QUERIES)
+    lats = rng.uniform(-60, 60, QUERIES)
+
+    print(f"{'stars':>10} {'build ms':>10} {'scan us/q':>10} {'index us/q':>11} {'speedup':>8}")
+    for size in CATALOG_SIZES:
+        ra = rng.uniform(0, 360, size)
+        # Uniform on the sphere: dec = asin(u)
+        dec = np.degrees(np.arcsin(rng.uniform(-1, 1, size)))
+
+        start = time.perf_counter()
+        # scan_below=0 times the grid itself at every size
+        index = SkyIndex(ra, dec, scan_below=0)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        n = QUERIES if size <= 65_536 else QUERIES // 10
+        start = time.perf_counter()
+        linear = [linear_first_at_zenith(ra, dec, lsts[i], lats[i], THRESHOLD) for i in range(n)]
+        scan_us = (time.perf_counter() - start) / n * 1e6
+
+        start = time.perf_counter()
+        indexed = [index.first_at_zenith(lsts[i], lats[i], THRESHOLD) for i in range(n)]
+        index_us = (time.perf_counter() - start) / n * 1e6
+
+        assert linear == indexed, "index and scan disagree"
+        default = SkyIndex(ra, dec)
+        assert indexed == [default.first_at_zenith(lsts[i], lats[i], THRESHOLD) for i in range(n)]
+        assert all(default.first_within(lsts[i], lats[i], THRESHOLD) == index.first_within(lsts[i], lats[i], THRESHOLD)
+                   for i in range(min(n, 200))), "cone scan and index disagree"
+        print(f"{size:>10,} {build_ms:>10.1f} {scan_us:>10.1f} {index_us:>11.1f} {scan_us / index_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Star Catalog Memory Benchmark
+
+Compares the list-of-dicts STAR_DATABASE layout with the struct-of-arrays
+StarCatalog: memory per star, and allocations/bytes per visible-stars
+request (dict copies vs. a zero-copy StarSubset rendering 9 cards), and
+the time to render those cards with and without a seeding user.
+
+Run from the repository root:
+    python -m benchmarks.star_catalog_benchmark [num_stars]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import star_system
+from star_catalog import StarCatalog
+from star_system import STAR_CATEGORIES
+
+RENDERED_CARDS = 9  # the Star Finder page shows the first 9 visible stars
+OBSERVED_AT = datetime(2025, 1, 15, 3, 0, tzinfo=timezone.utc)
+
+
+def synthetic_stars(n: int):
+    rng = random.Random(1)
+    categories = list(STAR_CATEGORIES)
+    colors = [f"#{rng.randrange(0x1000000):06X}" for _ in range(64)]
+    personalities = [f"Personality archetype {i}" for i in range(64)]
+    return [{
+        "name": f"Star-{i:07d}",
+        "category": rng.choice(categories),
+        "base_rarity": rng.randint(1, 99),
+        "color": rng.choice(colors),
+        "tone_frequency": float(rng.randint(100, 1200)),
+        "personality": rng.choice(personalities),
+        "right_ascension": rng.uniform(0, 24),
+        "declination": rng.uniform(-90, 90),
+    } for i in range(n)]
+
+
+def measure(fn):
+    """(result, retained blocks, retained bytes, peak bytes) of one call."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    size = sum(s.size_diff for s in stats if s.size_diff > 0)
+    return result, blocks, size, peak
+
+
+def run(n: int):
+    # Strings are built first so both layouts share them and only layout overhead is compared
+    names = [f"Star-{i:07d}" for i in range(n)]
+    template = synthetic_stars(n)
+
+    dicts, _, dict_bytes, _ = measure(lambda: [{**s, "name": names[i]} for i, s in enumerate(template)])
+    catalog, _, catalog_bytes, _ = measure(lambda: StarCatalog.from_star_list(dicts, STAR_CATEGORIES))
+    print(f"Memory per star ({n:,} stars): dicts {dict_bytes / n:6.0f} B, StarCatalog {catalog_bytes / n:6.0f} B")
+
+    # Per-request cost against the same catalog size
+    star_system.STAR_DATABASE[:] = dicts
+    star_system.get_star_catalog()
+    star_system.get_rarity_table()
+
+    def dict_request():
+        return star_system.get_visible_stars(40.0, -74.0, 3, 1, observed_at=OBSERVED_AT, user_id=1)
+
+    def subset_request():
+        subset = star_system.get_visible_star_subset(40.0, -74.0, 3, 1, observed_at=OBSERVED_AT, user_id=1)
+        return subset, [view["name"] for view in subset[:RENDERED_CARDS]]
+
+    dict_request()  # warm the observer-sky memo so both requests measure the same work
+    for label, fn in (("list of dict copies", dict_request), ("zero-copy StarSubset", subset_request)):
+        _, blocks, size, peak = measure(fn)
+        print(f"  {label:<22} retained {blocks:>9,} blocks / {size / 1024:>9,.0f} KiB, peak {peak / 1024:>9,.0f} KiB")
+
+    # Seeded chat rolls are deferred, so a render should cost the same with or without a user
+    for user_id in (None, 1):
+        start = time.perf_counter()
+        for _ in range(10):
+            subset = star_system.get_visible_star_subset(40.0, -74.0, 3, 1, observed_at=OBSERVED_AT, user_id=user_id)
+            cards = [view.to_dict() for view in subset[:RENDERED_CARDS]]
+        elapsed_ms = (time.perf_counter() - start) / 10 * 1000
+        print(f"  render {len(cards)} cards, user_id={str(user_id):<4}   {elapsed_ms:8.2f} ms per request")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
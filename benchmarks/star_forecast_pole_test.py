@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Star Forecast Pole Test
+
+At latitude ±90 every star keeps the same zenith distance all day, so a
+star within the threshold of the pole must get a full-day window
+(half-width 180°) and one outside it must get none. Also checks that
+forecast_transits turns those full-day windows into back-to-back days
+for an observer at the pole.
+
+Run from the repository root:
+    python -m benchmarks.star_forecast_pole_test
+"""
+
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from star_forecast import encounter_half_widths, forecast_transits
+from star_system import get_star_catalog
+
+THRESHOLD = 5.0
+
+
+def check_half_widths():
+    for pole in (90.0, -90.0):
+        sign = np.sign(pole)
+        near = sign * np.array([90.0, 89.0, 86.0])
+        far = sign * np.array([84.0, 0.0, -88.0])
+        assert np.array_equal(encounter_half_widths(pole, near, THRESHOLD), [180.0, 180.0, 180.0]), pole
+        assert np.isnan(encounter_half_widths(pole, far, THRESHOLD)).all(), pole
+
+    # A star sitting on the pole, seen from just inside the threshold
+    assert encounter_half_widths(87.0, np.array([90.0]), THRESHOLD)[0] == 180.0
+    # Away from the poles the window is still the partial arc around transit
+    assert 0.0 < encounter_half_widths(40.0, np.array([42.0]), THRESHOLD)[0] < 180.0
+    print("✓ half-widths at the poles")
+
+
+def check_forecast_at_pole():
+    dec = get_star_catalog().columns["declination"]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for pole in (90.0, -90.0):
+        # Put the threshold just past the catalog star nearest this pole
+        threshold = float(np.min(np.abs(dec - pole))) + 1.0
+        windows = forecast_transits(pole, 0.0, start, transits_per_star=2, threshold=threshold)
+        assert windows, pole
+        for w in windows:
+            # One sidereal day long (~23h56m)
+            length = w["window_end"] - w["window_start"]
+            assert timedelta(hours=23, minutes=55) < length < timedelta(hours=23, minutes=57), (pole, length)
+        assert any(w["window_start"] <= start < w["window_end"] for w in windows), pole
+    print("✓ full-day windows from the poles")
+
+
+def run():
+    check_half_widths()
+    check_forecast_at_pole()
+
+
+if __name__ == "__main__":
+    run()
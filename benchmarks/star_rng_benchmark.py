@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Seeded Star RNG Benchmark
+
+Checks that seeded star outcomes are stable (across calls and across
+processes with different hash seeds), then simulates repeated Star Finder
+renders to measure how often a render cache can safely serve the result.
+
+Run from the repository root:
+    python -m benchmarks.star_rng_benchmark
+"""
+
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from star_system import (
+    get_visible_stars,
+    get_star_rng,
+    generate_star_message,
+    get_star_chat_response,
+    STAR_RNG_BUCKET_SECONDS
+)
+
+USERS = 200
+RENDERS_PER_USER = 30
+START = datetime(2025, 1, 15, 2, 0, tzinfo=timezone.utc)
+
+_PROBE = (
+    "from datetime import datetime, timezone\n"
+    "from star_system import get_star_rng, generate_star_message\n"
+    "rng = get_star_rng(42, 'Seraphix', datetime(2025, 1, 15, 2, tzinfo=timezone.utc), 'message')\n"
+    "print(generate_star_message('Seraphix', 'Celestial', 'Angelic', 'Night', rng=rng)['content'])\n"
+)
+
+
+def check_determinism():
+    when = START + timedelta(minutes=7)
+    first = get_visible_stars(40.0, -74.0, 2, 1, observed_at=when, user_id=1)
+    assert first == get_visible_stars(40.0, -74.0, 2, 1, observed_at=when, user_id=1)
+
+    msg = lambda: generate_star_message("Seraphix", "Celestial", "Angelic", "Night",
+                                        rng=get_star_rng(1, "Seraphix", when, "message"))
+    assert msg() == msg()
+    reply = lambda: get_star_chat_response("Seraphix", "Angelic", "hello",
+                                           rng=get_star_rng(1, "Seraphix", when, "chat:hello"))
+    assert reply() == reply()
+
+    outputs = set()
+    for hash_seed in ("0", "1", "12345"):
+        env = {**os.environ, "PYTHONHASHSEED": hash_seed}
+        out = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True,
+                             text=True, check=True).stdout
+        outputs.add(out)
+    assert len(outputs) == 1, "seeded output differs between processes"
+    print("✓ Seeded outputs stable across calls and processes")
+
+
+def simulate(seeded: bool):
+    """Each user re-renders the page at random minutes within one RNG bucket."""
+    rng = random.Random(0)
+    cache = {}
+    hits = valid_hits = 0
+    total = USERS * RENDERS_PER_USER
+
+    for user_id in range(USERS):
+        lat, lon = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        for _ in range(RENDERS_PER_USER):
+            when = START + timedelta(seconds=rng.uniform(0, STAR_RNG_BUCKET_SECONDS - 60))
+            # Visible set is memoized per minute, can_chat per RNG bucket
+            key = (user_id, int(when.timestamp() // 60))
+            stars = get_visible_stars(lat, lon, when.hour, when.month, observed_at=when,
+                                      user_id=user_id if seeded else None)
+            rendered = [(s["name"], s["can_chat"], s["chat_duration"]) for s in stars]
+            if key in cache:
+                hits += 1
+                valid_hits += cache[key] == rendered
+            cache[key] = rendered
+
+    return hits / total, valid_hits / total
+
+
+def run():
+    check_determinism()
+    for label, seeded in (("global random", False), ("seeded per user/star/hour", True)):
+        hit_rate, usable = simulate(seeded)
+        print(f"{label:<28} cache hit rate {hit_rate:6.1%}, hits identical to a fresh render {usable:6.1%}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Star Sweep Benchmark
+
+Runs the encounter sweep end to end against a throwaway SQLite database
+seeded with synthetic profiles (1M by default).
+
+Run from the repository root:
+    python -m benchmarks.star_sweep_benchmark [num_profiles]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Point the app's engine at a scratch database before it is imported
+_db_path = os.path.join(tempfile.mkdtemp(), "sweep_benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+import numpy as np
+from database import init_db, SessionLocal, Profile, Star, CollectedStar
+from initialize_stars import star_rows
+from star_system import STAR_DATABASE
+from star_sweep import sweep_encounters, record_encounters
+
+
+def seed(db, num_profiles: int):
+    rng = np.random.default_rng(7)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, num_profiles)))
+    lons = rng.uniform(-180, 180, num_profiles)
+
+    db.execute(Star.__table__.insert(), list(star_rows(STAR_DATABASE)))
+    db.execute(Profile.__table__.insert(), [
+        {"user_id": i + 1, "latitude": float(lat), "longitude": float(lon)}
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    ])
+    db.commit()
+
+
+def run(num_profiles: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        seed(db, num_profiles)
+        print(f"Seeded {num_profiles:,} profiles in {time.perf_counter() - start:.1f}s")
+
+        now = datetime(2025, 1, 15, 3, 30)
+        start = time.perf_counter()
+        encounters = sweep_encounters(db, now)
+        sweep_s = time.perf_counter() - start
+        print(f"Sweep:  {len(encounters):,} encounters in {sweep_s:.2f}s "
+              f"({num_profiles / sweep_s:,.0f} profiles/s)")
+
+        start = time.perf_counter()
+        record_encounters(db, encounters, now)
+        record_s = time.perf_counter() - start
+        print(f"Insert: {len(encounters) * 3:,} rows in {record_s:.2f}s "
+              f"({len(encounters) * 3 / max(record_s, 1e-9):,.0f} rows/s)")
+
+        # A second sweep at the same instant must find nothing new
+        assert not sweep_encounters(db, now), "collected stars were re-emitted"
+        assert db.query(CollectedStar).count() == len(encounters)
+    finally:
+        db.close()
+        os.remove(_db_path)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Streaming Replies Benchmark
+
+Times how long a visitor waits before the first words of a reply appear,
+against a local fake completion server that streams word by word. For a
+Pen Pal reply, a council of five and a two-round debate with synthesis,
+compares waiting for whole completions (as before) with the streaming
+helpers the pages now render incrementally, and checks both produce the
+same text. Then has several visitors stream a council at once, on the old
+8-worker pool and on the default one, since each stream holds a worker
+until its last word. Ends by checking failed and cut-off replies.
+
+Run from the repository root:
+    python -m benchmarks.streaming_benchmark [latency_seconds] [token_delay_seconds]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_openai_server import FakeCompletionServer
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.4
+TOKEN_DELAY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+REPLY_WORDS = 80
+_server = FakeCompletionServer(latency=LATENCY, token_delay=TOKEN_DELAY, reply_words=REPLY_WORDS).start()
+
+# Point the OpenAI client at the fake server before the app imports it
+os.environ["OPENAI_BASE_URL"] = _server.base_url
+os.environ["OPENAI_API_KEY"] = "fake-key"
+# Every request should reach the server; repeated prompts would otherwise be cached
+os.environ["LLM_CACHE_SIZE"] = "0"
+
+import openai
+import ai_agents
+from ai_agents import (
+    REPLY_INTERRUPTED_NOTE,
+    DebatePipeline,
+    ReplyInterrupted,
+    consult_council,
+    generate_agent_debate,
+    generate_debate_synthesis,
+    get_age_profile,
+    select_council_members,
+    stream_chat_completion,
+    stream_council,
+)
+
+SITUATION = "My friend and I both want to lead the science fair project."
+MESSAGES = [
+    {"role": "system", "content": "You are The Sage, an ancient cosmic guide."},
+    {"role": "user", "content": "How do I stay patient with my little brother?"},
+]
+
+
+class Timer:
+    """Seconds to the first token and to the last, over any number of streams."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first = None
+
+    def read(self, tokens) -> str:
+        text = ""
+        for token in tokens:
+            if self.first is None:
+                self.first = time.perf_counter() - self.start
+            text += token
+        return text
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+
+def report(label: str, blocking_s: float, first_s: float, total_s: float):
+    print(f"💬 {label:<22} whole replies {blocking_s:5.2f}s | streaming: first words {first_s:5.2f}s, "
+          f"last {total_s:5.2f}s ({blocking_s - first_s:4.2f}s sooner)")
+
+
+def pen_pal():
+    start = time.perf_counter()
+    response = openai.chat.completions.create(model="gpt-3.5-turbo", messages=MESSAGES, temperature=0.8, max_tokens=250)
+    blocking_s = time.perf_counter() - start
+
+    timer = Timer()
+    text = timer.read(stream_chat_completion(MESSAGES, temperature=0.8, max_tokens=250))
+    assert text == response.choices[0].message.content, (text, response.choices[0].message.content)
+    report("Pen Pal reply", blocking_s, timer.first, timer.total)
+
+
+def council(age_profile):
+    members = select_council_members(5)
+
+    start = time.perf_counter()
+    discussions = consult_council(members, SITUATION, age_profile)
+    blocking_s = time.perf_counter() - start
+
+    timer = Timer()
+    # The page reads members in order, one card after another
+    responses = [timer.read(tokens) for tokens in stream_council(members, SITUATION, age_profile)]
+    assert responses == [d["response"] for d in discussions]
+    report("Council of 5", blocking_s, timer.first, timer.total)
+
+
+def debate(age_profile):
+    random.seed(7)
+    start = time.perf_counter()
+    whole = generate_agent_debate(SITUATION, age_profile, 2)
+    generate_debate_synthesis(SITUATION, whole, age_profile)
+    blocking_s = time.perf_counter() - start
+
+    random.seed(7)
+    timer = Timer()
+    pipeline = DebatePipeline(SITUATION, age_profile, 2).start()
+    for entry, tokens in pipeline.turns():
+        timer.read(tokens)
+    timer.read(pipeline.synthesis_tokens())
+    assert [(d["member"]["name"], d["statement"]) for d in pipeline.debate] == \
+        [(d["member"]["name"], d["statement"]) for d in whole]
+    report("Debate, 2 rounds", blocking_s, timer.first, timer.total)
+
+
+def under_load(age_profile, visitors: int = 6):
+    """Worst first-words and finish times when `visitors` stream a council of five at once."""
+    def visit(results):
+        timer = Timer()
+        for tokens in stream_council(select_council_members(5), SITUATION, age_profile):
+            timer.read(tokens)
+        results.append((timer.first, timer.total))
+
+    default_pool = ai_agents._council_executor
+    pools = [
+        ("old 8-worker pool", ThreadPoolExecutor(max_workers=8)),
+        (f"{ai_agents.COUNCIL_MAX_CONCURRENCY}-worker pool", default_pool),
+    ]
+    for label, pool in pools:
+        ai_agents._council_executor = pool
+        results = []
+        threads = [threading.Thread(target=visit, args=(results,)) for _ in range(visitors)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"👥 {visitors} visitors x council of 5, {label:<17} worst first words {max(r[0] for r in results):5.2f}s, "
+              f"worst last word {max(r[1] for r in results):5.2f}s")
+    ai_agents._council_executor = default_pool
+
+
+def fallbacks(age_profile):
+    _server.fail_status = 400
+    members = select_council_members(3)
+    responses = ["".join(tokens) for tokens in stream_council(members, SITUATION, age_profile)]
+    assert responses == [f"*{m['name']} is meditating on this...*" for m in members]
+    try:
+        "".join(stream_chat_completion(MESSAGES, temperature=0.8, max_tokens=250))
+        raise AssertionError("Pen Pal errors should reach the page")
+    except openai.BadRequestError:
+        pass
+    _server.fail_status = None
+
+    # A reply that breaks off part-way is flagged, not passed off as complete
+    _server.cut_after = 3
+    expected = _server.tokens_for({"messages": MESSAGES})[:3]
+    try:
+        "".join(stream_chat_completion(MESSAGES, temperature=0.8, max_tokens=250))
+        raise AssertionError("a cut-off Pen Pal reply should raise")
+    except ReplyInterrupted as e:
+        assert e.partial == "".join(expected), e.partial
+    responses = ["".join(tokens) for tokens in stream_council(members, SITUATION, age_profile)]
+    assert all(r.endswith(REPLY_INTERRUPTED_NOTE) for r in responses), responses
+    _server.cut_after = None
+    assert "".join(stream_chat_completion(MESSAGES, temperature=0.8, max_tokens=250)) == _server.reply_for({"messages": MESSAGES})
+    print("✓ Streamed text matches whole replies; failures fall back per member; cut-off replies are flagged")
+
+
+def run():
+    age_profile = get_age_profile(14)
+    print(f"🌌 {LATENCY:.2f}s to first token, {TOKEN_DELAY * 1000:.0f} ms per word, {REPLY_WORDS}-word replies")
+    try:
+        pen_pal()
+        council(age_profile)
+        debate(age_profile)
+        under_load(age_profile)
+        fallbacks(age_profile)
+    finally:
+        _server.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,99 @@
+# ======================================
+# 👤 CURRENT USER - Per-session Cached User
+# ======================================
+
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+import streamlit as st
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from database import User
+
+# How long a session trusts its cached user before reading it again
+# (also bounds how stale it can be after a change made in another process)
+CURRENT_USER_TTL_SECONDS = 60.0
+_SESSION_KEY = "_current_user"
+
+class CachedProfile(NamedTuple):
+    star_name: Optional[str]
+    symbol: Optional[str]
+    dream: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    timezone: Optional[str]
+    age: Optional[int]
+
+class CurrentUser(NamedTuple):
+    id: int
+    username: str
+    email: Optional[str]
+    is_premium: bool
+    is_admin: bool
+    profile: Optional[CachedProfile]
+
+# user_id -> version; bumping it makes every session in this process reload that user
+_user_versions: Dict[int, int] = {}
+_versions_lock = threading.Lock()
+
+def _snapshot(user: User) -> CurrentUser:
+    profile = user.profile
+    return CurrentUser(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        is_premium=bool(user.is_premium),
+        is_admin=bool(user.is_admin),
+        profile=CachedProfile(
+            star_name=profile.star_name,
+            symbol=profile.symbol,
+            dream=profile.dream,
+            latitude=profile.latitude,
+            longitude=profile.longitude,
+            timezone=profile.timezone,
+            age=profile.age,
+        ) if profile else None,
+    )
+
+def load_current_user(db, username: str) -> Optional[CurrentUser]:
+    """
+    User and profile in one query, detached from the session. Matches the
+    username case-insensitively, since the authenticator lowercases it.
+    """
+    user = db.query(User).options(joinedload(User.profile)).filter(
+        func.lower(User.username) == username.lower()
+    ).first()
+    return _snapshot(user) if user else None
+
+def get_current_user(db) -> Optional[CurrentUser]:
+    """
+    The logged-in user (id, flags and profile), cached in st.session_state.
+    Reloaded after CURRENT_USER_TTL_SECONDS, on a username change, or
+    after invalidate_current_user() for that user.
+    """
+    username = st.session_state.get("username")
+    if not username:
+        return None
+
+    cached = st.session_state.get(_SESSION_KEY)
+    if cached and cached["username"] == username:
+        fresh = time.monotonic() - cached["loaded_at"] < CURRENT_USER_TTL_SECONDS
+        if fresh and cached["version"] == _user_versions.get(cached["user"].id, 0):
+            return cached["user"]
+
+    user = load_current_user(db, username)
+    if user is None:
+        st.session_state.pop(_SESSION_KEY, None)
+        return None
+    st.session_state[_SESSION_KEY] = {
+        "username": username,
+        "user": user,
+        "version": _user_versions.get(user.id, 0),
+        "loaded_at": time.monotonic(),
+    }
+    return user
+
+def invalidate_current_user(user_id: int):
+    """Call after changing a user or their profile; sessions reload it on their next rerun."""
+    with _versions_lock:
+        _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
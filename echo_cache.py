@@ -0,0 +1,264 @@
+# ======================================
+# 🗄️ ECHO CACHE - Write-through Echo Wall Feed Cache
+# ======================================
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from database import Echo
+from echo_feed import FEED_PAGE_SIZE, FeedCursor, get_echo_feed
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks (Windows): the shared file mode is unavailable
+    fcntl = None
+
+# Newest echoes kept per feed (all echoes, and each echo type)
+FEED_CACHE_DEPTH = 100
+# Safety net for echoes written by other processes when no cache file is shared;
+# counted from the feed's database load, which a shared snapshot carries along
+FEED_CACHE_TTL_SECONDS = 300.0
+# Echoes remembered for merging into feeds whose load overlapped their publishing
+PUBLISH_LOG_SIZE = FEED_CACHE_DEPTH
+# Optional JSON snapshot shared by processes on one host (unset = in-process only);
+# every change to it is made under an OS lock on FEED_CACHE_PATH + ".lock"
+FEED_CACHE_PATH = os.environ.get("ECHO_FEED_CACHE_PATH") if fcntl else None
+
+# Feed key (None = all echoes, else an echo type) -> {"echoes", "complete", "loaded_at"}
+_feeds: Dict[Optional[str], Dict] = {}
+# Feed key -> set when the database load in flight for it finishes
+_loading: Dict[Optional[str], threading.Event] = {}
+# Recent echoes as (generation, echo), so a feed loaded while they were being
+# published can merge them in; it covers every generation after _published_from
+_generation = 0
+_published: List[Tuple[int, Dict]] = []
+_published_from = 0
+# (inode, mtime, size) of the snapshot last read or written here
+_file_stamp = None
+_lock = threading.Lock()
+
+# -------------------------------
+# FILE SNAPSHOT
+# -------------------------------
+
+_DATETIME_FIELDS = ("timestamp", "updated_at")
+
+def _feed_key_name(key: Optional[str]) -> str:
+    return "*" if key is None else key
+
+def _dump_echo(echo: Dict) -> Dict:
+    return {**echo, **{f: echo[f].isoformat() for f in _DATETIME_FIELDS}}
+
+def _load_echo(echo: Dict) -> Dict:
+    return {**echo, **{f: datetime.fromisoformat(echo[f]) for f in _DATETIME_FIELDS}}
+
+def _stamp() -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(FEED_CACHE_PATH)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+def _save_snapshot():
+    """Atomically write all cached feeds to FEED_CACHE_PATH."""
+    global _file_stamp
+    snapshot = {
+        "generation": _generation,
+        "published": [[generation, _dump_echo(e)] for generation, e in _published],
+        "published_from": _published_from,
+        "feeds": {
+            _feed_key_name(key): {
+                "echoes": [_dump_echo(e) for e in feed["echoes"]],
+                "complete": feed["complete"],
+                "loaded_at": feed["loaded_at"],
+            }
+            for key, feed in _feeds.items()
+        },
+    }
+    tmp_path = f"{FEED_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, FEED_CACHE_PATH)
+    _file_stamp = _stamp()
+
+def _load_snapshot_if_newer():
+    """Replace the in-process feeds with the shared snapshot if another process wrote it."""
+    global _file_stamp, _generation, _published, _published_from
+    stamp = _stamp()
+    if stamp is None or stamp == _file_stamp:
+        return
+    try:
+        with open(FEED_CACHE_PATH, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    _generation = snapshot["generation"]
+    _published = [(generation, _load_echo(e)) for generation, e in snapshot["published"]]
+    _published_from = snapshot["published_from"]
+    _feeds.clear()
+    for name, feed in snapshot["feeds"].items():
+        _feeds[None if name == "*" else name] = {
+            "echoes": [_load_echo(e) for e in feed["echoes"]],
+            "complete": feed["complete"],
+            "loaded_at": feed["loaded_at"],
+        }
+    _file_stamp = stamp
+
+@contextmanager
+def _updating():
+    """
+    Hold _lock (and with a shared file, its OS lock) around a change to the
+    cache. With a shared file the change is made to its latest snapshot and
+    written back before the lock is released, so no process's change is lost.
+    """
+    with _lock:
+        if not FEED_CACHE_PATH:
+            yield
+            return
+        with open(f"{FEED_CACHE_PATH}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                _load_snapshot_if_newer()
+                yield
+                _save_snapshot()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# -------------------------------
+# READS
+# -------------------------------
+
+def _is_fresh(feed: Optional[Dict]) -> bool:
+    # Wall-clock time, since a shared snapshot carries it between processes
+    return feed is not None and time.time() - feed["loaded_at"] < FEED_CACHE_TTL_SECONDS
+
+def _get_feed(db, echo_type: Optional[str]) -> Dict:
+    """
+    The cached feed for one key, loading it from the database on a miss or
+    after the TTL. One reader per key loads, without holding _lock; others
+    wait for it on a miss, or keep reading the expired feed meanwhile.
+    """
+    while True:
+        with _lock:
+            if FEED_CACHE_PATH:
+                _load_snapshot_if_newer()
+            feed = _feeds.get(echo_type)
+            if _is_fresh(feed):
+                return feed
+            loading = _loading.get(echo_type)
+            if loading is None:
+                loading = _loading[echo_type] = threading.Event()
+                since = _generation
+                break
+            if feed is not None:
+                return feed
+        loading.wait()
+
+    try:
+        loaded_at = time.time()
+        echoes, next_cursor = get_echo_feed(db, FEED_CACHE_DEPTH, echo_type=echo_type)
+        feed = {"echoes": echoes, "complete": next_cursor is None, "loaded_at": loaded_at}
+        with _updating():
+            if since < _published_from:
+                # Too much was published meanwhile to be sure it is all merged in; serve it uncached
+                return feed
+            for generation, echo in _published:
+                if generation > since and echo_type in (None, echo["echo_type"]):
+                    _insert(feed, echo)
+            current = _feeds.get(echo_type)
+            # Another process may have installed a later load while this one ran
+            if current is None or current["loaded_at"] < loaded_at:
+                _feeds[echo_type] = feed
+        return feed
+    finally:
+        with _lock:
+            _loading.pop(echo_type).set()
+
+def get_cached_feed(db, limit: int = FEED_PAGE_SIZE, before: Optional[FeedCursor] = None,
+                    echo_type: Optional[str] = None) -> Tuple[List[Dict], Optional[FeedCursor]]:
+    """
+    Same contract as echo_feed.get_echo_feed, served from the cache when
+    the page lies within the newest FEED_CACHE_DEPTH echoes (no database
+    round trip); deeper pages fall through to the database.
+    """
+    feed = _get_feed(db, echo_type)
+    echoes = feed["echoes"]
+
+    start = 0
+    if before is not None:
+        start = next((i for i, e in enumerate(echoes) if (e["timestamp"], e["id"]) < tuple(before)),
+                     len(echoes))
+
+    end = start + limit
+    if end < len(echoes) or feed["complete"]:
+        page = echoes[start:end]
+        next_cursor = (page[-1]["timestamp"], page[-1]["id"]) if page and end < len(echoes) else None
+        return page, next_cursor
+    return get_echo_feed(db, limit, before, echo_type)
+
+def get_cached_feed_pages(db, pages: int, limit: int = FEED_PAGE_SIZE,
+                          echo_type: Optional[str] = None) -> Tuple[List[Dict], Optional[FeedCursor]]:
+    """The first `pages` pages concatenated (for "load more" scrolling), plus the next cursor."""
+    echoes, cursor = get_cached_feed(db, limit, echo_type=echo_type)
+    for _ in range(pages - 1):
+        if cursor is None:
+            break
+        page, cursor = get_cached_feed(db, limit, cursor, echo_type)
+        echoes.extend(page)
+    return echoes, cursor
+
+# -------------------------------
+# WRITE-THROUGH
+# -------------------------------
+
+def _insert(feed: Dict, echo: Dict):
+    """Put `echo` in its place in a cached feed, keeping the newest FEED_CACHE_DEPTH."""
+    echoes = sorted([echo] + [e for e in feed["echoes"] if e["id"] != echo["id"]],
+                    key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+    if len(echoes) > FEED_CACHE_DEPTH:
+        feed["complete"] = False
+    # Swap in a new list so concurrent readers never see a half-updated one
+    feed["echoes"] = echoes[:FEED_CACHE_DEPTH]
+
+def publish_echo(db, user_id: int, username: str, echo_type: str, content: str) -> Dict:
+    """
+    Commit a new echo and write it through to the cached feeds it belongs
+    to (all echoes and its type), so readers see it without a reload.
+    """
+    global _generation, _published_from
+    now = datetime.utcnow()
+    db_echo = Echo(user_id=user_id, echo_type=echo_type, content=content, timestamp=now, updated_at=now)
+    db.add(db_echo)
+    db.flush()
+    echo = {
+        "id": db_echo.id,
+        "user_id": user_id,
+        "echo_type": echo_type,
+        "username": username,
+        "content": content,
+        "timestamp": db_echo.timestamp,
+        "updated_at": db_echo.updated_at,
+    }
+    db.commit()
+
+    with _updating():
+        _generation += 1
+        _published.append((_generation, echo))
+        if len(_published) > PUBLISH_LOG_SIZE:
+            _published_from = _published.pop(0)[0]
+        for key in (None, echo_type):
+            feed = _feeds.get(key)
+            if feed is not None:
+                _insert(feed, echo)
+    return echo
+
+def invalidate_feed_cache():
+    """Drop every cached feed (in every process sharing the file); the next read reloads from the database."""
+    with _updating():
+        _feeds.clear()
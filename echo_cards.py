@@ -0,0 +1,130 @@
+# ======================================
+# 🃏 ECHO CARDS - Pre-rendered Echo Wall HTML Fragments
+# ======================================
+
+import html
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from echo_feed import ECHO_TYPES
+
+# Rendered cards kept across reruns and sessions (a few hundred bytes each)
+FRAGMENT_CACHE_SIZE = 4096
+
+# Card templates per list. Each card is one line with no blank lines, so a
+# whole feed joined together stays a single raw HTML block in markdown.
+CARD_TEMPLATES = {
+    "wall": (
+        '<div class="cosmic-card">'
+        '<p style="color: #9D8FFF; font-weight: bold;">{username}</p>'
+        '<p style="font-size: 0.85em; color: #888;">{type_label} • {timestamp}</p>'
+        '<p style="margin-top: 1rem; font-size: 1.05em;">"{content}"</p>'
+        '<div style="margin-top: 1rem; display: flex; gap: 1rem;">'
+        '<span>💫 Resonate {resonate}</span>'
+        '<span>🌟 Inspire {inspire}</span>'
+        '<span>🙏 Grateful {grateful}</span>'
+        '</div>'
+        '</div>'
+    ),
+    "gratitude": (
+        '<div class="cosmic-card">'
+        '<p style="color: #9D8FFF; font-size: 0.9em;">{username}</p>'
+        '<p style="margin-top: 0.5rem;">🙏 {content}</p>'
+        '</div>'
+    ),
+    "sync": (
+        '<div class="cosmic-card">'
+        '<p style="color: #9D8FFF; font-size: 0.9em;">{username}</p>'
+        '<p style="margin-top: 0.5rem;">✨ {content}</p>'
+        '</div>'
+    ),
+    "search": (
+        '<div class="cosmic-card">'
+        '<p style="color: #9D8FFF; font-size: 0.9em;">{username}</p>'
+        '<p style="font-size: 0.85em; color: #888;">{type_label} • {timestamp}</p>'
+        '<p style="margin-top: 0.5rem;">{content}</p>'
+        '</div>'
+    ),
+}
+
+_fragments: "OrderedDict[tuple, str]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+def _escape(text) -> str:
+    """HTML-escape user text; newlines become <br/> so no blank line ends the HTML block."""
+    return html.escape(str(text or "")).replace("\r\n", "\n").replace("\n", "<br/>")
+
+def _render(echo: Dict, style: str, counts: Tuple[int, int, int]) -> str:
+    resonate, inspire, grateful = counts
+    return CARD_TEMPLATES[style].format(
+        username=_escape(echo["username"]),
+        type_label=_escape(ECHO_TYPES.get(echo["echo_type"], "")),
+        timestamp=echo["timestamp"].strftime('%Y-%m-%d %H:%M'),
+        content=_escape(echo["content"]),
+        resonate=resonate,
+        inspire=inspire,
+        grateful=grateful,
+    )
+
+def _reaction_counts(reactions: Optional[Dict[str, int]]) -> Tuple[int, int, int]:
+    if not reactions:
+        return (0, 0, 0)
+    return (reactions.get("resonate", 0), reactions.get("inspire", 0), reactions.get("grateful", 0))
+
+def render_echo_cards(echoes: List[Dict], style: str = "wall",
+                      reactions: Optional[Dict[int, Dict[str, int]]] = None) -> str:
+    """
+    All cards of a list as one HTML payload, for a single st.markdown call.
+    Cards are cached by (id, updated_at, style) plus the reaction counts
+    they show, so an echo is only formatted again after it changes.
+    """
+    reactions = reactions or {}
+    keys = [(e["id"], e["updated_at"], style, _reaction_counts(reactions.get(e["id"]))) for e in echoes]
+
+    with _lock:
+        fragments = [_fragments.get(key) for key in keys]
+        for key, fragment in zip(keys, fragments):
+            if fragment is not None:
+                _fragments.move_to_end(key)
+        hits = sum(fragment is not None for fragment in fragments)
+        _stats["hits"] += hits
+        _stats["misses"] += len(keys) - hits
+
+    rendered = {}
+    for i, (echo, key) in enumerate(zip(echoes, keys)):
+        if fragments[i] is None:
+            fragments[i] = rendered[key] = _render(echo, style, key[3])
+
+    if rendered:
+        with _lock:
+            _fragments.update(rendered)
+            while len(_fragments) > FRAGMENT_CACHE_SIZE:
+                _fragments.popitem(last=False)
+    return "".join(fragments)
+
+def render_echo_card(echo: Dict, style: str = "wall", reactions: Optional[Dict[str, int]] = None) -> str:
+    """Card HTML for one feed echo (see render_echo_cards)."""
+    return render_echo_cards([echo], style, {echo["id"]: reactions} if reactions else None)
+
+def render_search_results(results: List[Dict], labels: Dict[str, str]) -> str:
+    """Search hits as one HTML payload; not cached, since each query differs."""
+    return "".join(
+        CARD_TEMPLATES["search"].format(
+            username=_escape(result["username"]),
+            type_label=_escape(labels.get(result["source"], "")),
+            timestamp=result["timestamp"].strftime('%Y-%m-%d %H:%M') if result["timestamp"] else "",
+            content=_escape(result["content"]),
+        )
+        for result in results
+    )
+
+def fragment_cache_info() -> Dict[str, int]:
+    """Hit/miss counters and current size of the fragment cache."""
+    with _lock:
+        return {**_stats, "size": len(_fragments)}
+
+def clear_fragment_cache():
+    with _lock:
+        _fragments.clear()
+        _stats["hits"] = _stats["misses"] = 0
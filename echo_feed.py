@@ -0,0 +1,100 @@
+# ======================================
+# 🌊 ECHO FEED - Joined, Paginated Echo Queries
+# ======================================
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import tuple_
+from database import Echo, User
+
+FEED_PAGE_SIZE = 20
+
+# Echo type -> label shown on the wall (and the "[label]" prefix older echoes embed)
+ECHO_TYPES = {
+    "thought": "💭 Thought",
+    "feeling": "💖 Feeling",
+    "creation": "🎨 Creation",
+    "wisdom": "🌱 Wisdom",
+    "gratitude": "🙏 Gratitude",
+    "sync": "✨ Synchronicity",
+}
+ECHO_TYPE_BY_LABEL = {label: echo_type for echo_type, label in ECHO_TYPES.items()}
+DEFAULT_ECHO_TYPE = "thought"
+
+# Prefixes older versions of the Echo Wall wrote into content
+_LEGACY_PREFIXES = {"GRATITUDE": ("gratitude", "🙏 "), "SYNC": ("sync", "✨ ")}
+_PREFIX_PATTERN = re.compile(r"^\[([^\]]+)\] ?")
+
+def parse_echo_prefix(content: str) -> Tuple[str, str]:
+    """
+    Split a legacy "[TYPE] text" echo into (echo_type, text). Content with
+    no recognised prefix is a plain thought and is returned unchanged.
+    """
+    match = _PREFIX_PATTERN.match(content or "")
+    if match:
+        tag = match.group(1)
+        if tag in _LEGACY_PREFIXES:
+            echo_type, decoration = _LEGACY_PREFIXES[tag]
+            text = content[match.end():]
+            return echo_type, text[len(decoration):] if text.startswith(decoration) else text
+        if tag in ECHO_TYPE_BY_LABEL:
+            return ECHO_TYPE_BY_LABEL[tag], content[match.end():]
+    return DEFAULT_ECHO_TYPE, content
+
+# (timestamp, id) of the last echo on a page; the next page starts strictly after it
+FeedCursor = Tuple[datetime, int]
+
+def get_echo_feed(db, limit: int = FEED_PAGE_SIZE, before: Optional[FeedCursor] = None,
+                  echo_type: Optional[str] = None) -> Tuple[List[Dict], Optional[FeedCursor]]:
+    """
+    One page of echoes, newest first, with the author's username joined in
+    (one query per page, no per-echo user lookups), optionally only one
+    `echo_type`. Pass the returned cursor
+    as `before` to get the next page; it is None when there are no more.
+    """
+    query = db.query(
+        Echo.id, Echo.user_id, Echo.echo_type, Echo.content, Echo.timestamp, Echo.updated_at,
+        User.username
+    ).join(User, User.id == Echo.user_id)
+
+    if echo_type is not None:
+        query = query.filter(Echo.echo_type == echo_type)
+    if before is not None:
+        # Keyset pagination: cost stays flat however deep the reader scrolls.
+        # A row-value comparison lets SQLite/Postgres seek the (timestamp, id)
+        # index; the equivalent OR expansion falls back to a scan on SQLite.
+        query = query.filter(tuple_(Echo.timestamp, Echo.id) < tuple(before))
+
+    # One extra row tells us whether another page exists
+    rows = query.order_by(Echo.timestamp.desc(), Echo.id.desc()).limit(limit + 1).all()
+
+    echoes = [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "echo_type": row.echo_type,
+            "username": row.username,
+            "content": row.content,
+            "timestamp": row.timestamp,
+            # Rows from before updated_at existed count as unchanged since creation
+            "updated_at": row.updated_at or row.timestamp,
+        }
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = echoes[-1]
+        next_cursor = (last["timestamp"], last["id"])
+    return echoes, next_cursor
+
+def get_echo_feed_pages(db, pages: int, limit: int = FEED_PAGE_SIZE,
+                        echo_type: Optional[str] = None) -> Tuple[List[Dict], Optional[FeedCursor]]:
+    """The first `pages` pages concatenated (for "load more" scrolling), plus the next cursor."""
+    echoes, cursor = get_echo_feed(db, limit, echo_type=echo_type)
+    for _ in range(pages - 1):
+        if cursor is None:
+            break
+        page, cursor = get_echo_feed(db, limit, cursor, echo_type)
+        echoes.extend(page)
+    return echoes, cursor
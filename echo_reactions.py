@@ -0,0 +1,275 @@
+# ======================================
+# 💫 ECHO REACTIONS - Write-optimized Reaction Counters
+# ======================================
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError
+from database import SessionLocal, EchoReaction, EchoReactionCount
+
+logger = logging.getLogger(__name__)
+
+REACTIONS = {
+    "resonate": "💫 Resonate",
+    "inspire": "🌟 Inspire",
+    "grateful": "🙏 Grateful",
+}
+
+# Counter rows per (echo, reaction); each flush writes to one of them
+REACTION_SHARDS = 8
+# How often pending reactions are written to the database
+REACTION_FLUSH_SECONDS = 5.0
+# How long flushed totals are trusted before re-reading them (other processes' flushes)
+REACTION_COUNTS_TTL_SECONDS = 30.0
+# Echoes whose totals are kept in memory
+REACTION_COUNTS_CACHE_SIZE = 10_000
+# Unflushed reactions held at most; while the database is down and the
+# backlog is this big, new reactions are refused rather than old ones dropped
+REACTION_BUFFER_LIMIT = 100_000
+
+class ReactionBufferFull(RuntimeError):
+    """Raised by add_reaction while REACTION_BUFFER_LIMIT reactions are waiting to be flushed."""
+
+# Reactions accepted but not yet flushed
+_pending_events: List[Dict] = []
+_pending_counts: Dict[Tuple[int, str], int] = defaultdict(int)
+_pending_lock = threading.Lock()
+
+# Reactions being written by the flush in progress; readers still count them
+_inflight_counts: Dict[Tuple[int, str], int] = {}
+_inflight_size = 0
+# Odd while a flush is being written, bumped again once it is settled; a
+# database read that overlapped a flush can't tell whether it saw the batch
+_flush_generation = 0
+# Database reads that overlapped a flush before one is made while holding _flush_lock
+REACTION_READ_ATTEMPTS = 3
+
+# echo_id -> (loaded_at, {reaction: total in the database})
+_flushed_counts: Dict[int, Tuple[float, Dict[str, int]]] = {}
+# Held while reading or changing cached totals (never across a query); taken before _pending_lock
+_counts_lock = threading.Lock()
+# One flush at a time; held across the database write (by readers only as a last resort)
+_flush_lock = threading.Lock()
+
+_flusher: Optional[threading.Thread] = None
+_flush_seq = 0
+
+# -------------------------------
+# WRITES
+# -------------------------------
+
+def add_reaction(echo_id: int, user_id: int, reaction: str):
+    """
+    Record a reaction in memory. It counts immediately for readers in this
+    process and reaches the database with the next batch flush. Raises
+    ReactionBufferFull if the backlog has reached REACTION_BUFFER_LIMIT.
+    """
+    if reaction not in REACTIONS:
+        raise ValueError(f"Unknown reaction: {reaction}")
+    with _pending_lock:
+        if len(_pending_events) + _inflight_size >= REACTION_BUFFER_LIMIT:
+            raise ReactionBufferFull("Too many reactions are waiting to be saved. Please try again shortly.")
+        _pending_events.append({
+            "echo_id": echo_id,
+            "user_id": user_id,
+            "reaction": reaction,
+            "timestamp": datetime.utcnow(),
+        })
+        _pending_counts[(echo_id, reaction)] += 1
+    _ensure_flusher()
+
+def _increment_shard(db, echo_id: int, reaction: str, shard: int, delta: int):
+    result = db.execute(
+        EchoReactionCount.__table__.update()
+        .where(EchoReactionCount.echo_id == echo_id)
+        .where(EchoReactionCount.reaction == reaction)
+        .where(EchoReactionCount.shard == shard)
+        .values(count=EchoReactionCount.count + delta)
+    )
+    if result.rowcount == 0:
+        db.execute(EchoReactionCount.__table__.insert(), {
+            "echo_id": echo_id, "reaction": reaction, "shard": shard, "count": delta
+        })
+
+def _write_events(db, events: List[Dict], shard: int) -> Tuple[List[Dict], List[Dict], Optional[Exception]]:
+    """
+    Write `events` in one transaction: the events in a single executemany,
+    and one increment per (echo, reaction) on `shard`. If the database
+    rejects a row, the halves are retried on their own so that only the
+    rejected rows are dropped. Returns (written, left unwritten, error that
+    stopped the rest), where only a failure like a lost connection leaves any.
+    """
+    try:
+        db.execute(EchoReaction.__table__.insert(), events)
+        counts = Counter((e["echo_id"], e["reaction"]) for e in events)
+        for (echo_id, reaction), delta in sorted(counts.items()):
+            _increment_shard(db, echo_id, reaction, shard, delta)
+        db.commit()
+        return events, [], None
+    except (IntegrityError, DataError) as e:
+        db.rollback()
+        if len(events) == 1:
+            logger.error("Dropping reaction the database rejected: %s (%s)", events[0], e.orig)
+            return [], [], None
+    except Exception as e:
+        db.rollback()
+        return [], events, e
+
+    half = len(events) // 2
+    written, left, error = _write_events(db, events[:half], shard)
+    if left:
+        return written, left + events[half:], error
+    more, left, error = _write_events(db, events[half:], shard)
+    return written + more, left, error
+
+def flush_reactions(db=None) -> int:
+    """
+    Write pending reactions to the database (see _write_events). Returns the
+    number written. Reactions the database rejects are dropped and logged;
+    if it can't be reached, the rest are put back for the next flush and
+    the error is raised.
+    """
+    global _flush_seq, _inflight_counts, _inflight_size, _flush_generation
+    with _flush_lock:
+        # Swap the batch out; readers keep counting it while it is written
+        with _counts_lock:
+            with _pending_lock:
+                events = _pending_events[:]
+                counts = dict(_pending_counts)
+                _pending_events.clear()
+                _pending_counts.clear()
+                _inflight_size = len(events)
+            if not events:
+                return 0
+            _inflight_counts = counts
+            _flush_generation += 1
+
+        # Spread processes and successive flushes over different counter rows
+        _flush_seq += 1
+        shard = (os.getpid() + _flush_seq) % REACTION_SHARDS
+
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            written, left, error = _write_events(db, events, shard)
+        finally:
+            if own_session:
+                db.close()
+
+        # Keep cached totals in step with what was committed; put back what wasn't
+        with _counts_lock:
+            for (echo_id, reaction), delta in Counter((e["echo_id"], e["reaction"]) for e in written).items():
+                if echo_id in _flushed_counts:
+                    _flushed_counts[echo_id][1][reaction] = _flushed_counts[echo_id][1].get(reaction, 0) + delta
+            with _pending_lock:
+                _pending_events[:0] = left
+                for event in left:
+                    _pending_counts[(event["echo_id"], event["reaction"])] += 1
+                _inflight_size = 0
+            _inflight_counts = {}
+            _flush_generation += 1
+        if error is not None:
+            raise error
+        return len(written)
+
+def _flush_loop():
+    while True:
+        time.sleep(REACTION_FLUSH_SECONDS)
+        try:
+            flush_reactions()
+        except Exception as e:
+            logger.warning("Reaction flush failed, will retry: %s", e)
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        with _pending_lock:
+            if _flusher is None or not _flusher.is_alive():
+                _flusher = threading.Thread(target=_flush_loop, name="echo-reaction-flusher", daemon=True)
+                _flusher.start()
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_reactions()
+    except Exception:
+        logger.exception("Could not flush reactions on exit")
+
+# -------------------------------
+# READS
+# -------------------------------
+
+def _query_totals(db, echo_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """Database totals for `echo_ids`, in one grouped query."""
+    totals = {i: {} for i in echo_ids}
+    rows = db.query(
+        EchoReactionCount.echo_id, EchoReactionCount.reaction, func.sum(EchoReactionCount.count)
+    ).filter(
+        EchoReactionCount.echo_id.in_(echo_ids)
+    ).group_by(EchoReactionCount.echo_id, EchoReactionCount.reaction).all()
+    for echo_id, reaction, total in rows:
+        totals[echo_id][reaction] = int(total)
+    return totals
+
+def _store_totals(loaded: Dict[int, Dict[str, int]], loaded_at: float, keep: List[int]):
+    """Cache freshly read totals, evicting the oldest beyond the cache size (except `keep`)."""
+    for echo_id, totals in loaded.items():
+        _flushed_counts[echo_id] = (loaded_at, totals)
+    if len(_flushed_counts) > REACTION_COUNTS_CACHE_SIZE:
+        keep = set(keep)
+        oldest = sorted((i for i in _flushed_counts if i not in keep), key=lambda i: _flushed_counts[i][0])
+        for echo_id in oldest[:len(_flushed_counts) - REACTION_COUNTS_CACHE_SIZE]:
+            del _flushed_counts[echo_id]
+
+def _current_counts(echo_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """Cached database totals plus reactions being flushed or still pending (under _counts_lock)."""
+    counts = {i: {r: _flushed_counts[i][1].get(r, 0) for r in REACTIONS} for i in echo_ids}
+    for (echo_id, reaction), delta in _inflight_counts.items():
+        if echo_id in counts:
+            counts[echo_id][reaction] += delta
+    with _pending_lock:
+        for (echo_id, reaction), delta in _pending_counts.items():
+            if echo_id in counts:
+                counts[echo_id][reaction] += delta
+    return counts
+
+def get_reaction_counts(db, echo_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Reaction totals per echo: database totals (cached per echo, one grouped
+    query for the ones missing or older than REACTION_COUNTS_TTL_SECONDS)
+    plus reactions still waiting to be flushed. The query runs without
+    _counts_lock; a result that overlapped a flush is thrown away and read
+    again, so a batch is never counted both in the database and in memory.
+    """
+    attempts = 0
+    while True:
+        now = time.monotonic()
+        with _counts_lock:
+            stale = [i for i in echo_ids
+                     if i not in _flushed_counts or now - _flushed_counts[i][0] >= REACTION_COUNTS_TTL_SECONDS]
+            if not stale:
+                return _current_counts(echo_ids)
+            generation = _flush_generation
+        if generation % 2 == 1 or attempts >= REACTION_READ_ATTEMPTS:
+            break
+        attempts += 1
+        loaded = _query_totals(db, stale)
+        with _counts_lock:
+            if _flush_generation == generation:
+                _store_totals(loaded, now, echo_ids)
+                return _current_counts(echo_ids)
+
+    # A flush is being written (or kept overlapping the reads); read once it is settled
+    with _flush_lock:
+        loaded = _query_totals(db, stale)
+        with _counts_lock:
+            _store_totals(loaded, now, echo_ids)
+            return _current_counts(echo_ids)
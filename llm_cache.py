@@ -0,0 +1,174 @@
+# ======================================
+# 🧠 LLM CACHE - Reuse Replies to Identical Prompts
+# ======================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Replies kept in memory per process (0 turns the cache off)
+LLM_CACHE_SIZE = int(os.environ.get("LLM_CACHE_SIZE", "1024"))
+# How long a reply is reused before the model is asked again
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", "86400"))
+# Temperatures within one step of each other share cached replies
+LLM_CACHE_TEMPERATURE_STEP = 0.1
+# Optional SQLite file that keeps replies across restarts and processes (unset = memory only)
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH")
+
+# key -> (reply, stored_at wall-clock seconds), least recently used first
+_replies: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+# Guards _replies and _stats only; the SQLite tier is read and written without it
+_lock = threading.Lock()
+
+# One SQLite connection per thread (WAL lets them read while another writes)
+_disk_local = threading.local()
+# Path whose table has been created and pruned by this process
+_disk_ready: Optional[str] = None
+_disk_setup_lock = threading.Lock()
+
+# -------------------------------
+# KEYS
+# -------------------------------
+
+def cache_key(model: str, messages: List[Dict], temperature: float, age_profile_key: Optional[str] = None) -> str:
+    """Fingerprint of a chat completion request: model, messages, temperature bucket and age profile."""
+    bucket = round(temperature / LLM_CACHE_TEMPERATURE_STEP) * LLM_CACHE_TEMPERATURE_STEP
+    fingerprint = json.dumps(
+        [model, [[m["role"], m["content"]] for m in messages], f"{bucket:.2f}", age_profile_key],
+        ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+# -------------------------------
+# PERSISTENT TIER
+# -------------------------------
+
+def _get_disk() -> Optional[sqlite3.Connection]:
+    """
+    This thread's connection to the SQLite tier, or None without one. The
+    first use in the process creates the table and prunes expired replies.
+    """
+    global _disk_ready
+    path = LLM_CACHE_PATH
+    if not path:
+        return None
+    if _disk_ready != path:
+        with _disk_setup_lock:
+            if _disk_ready != path:
+                setup = sqlite3.connect(path, timeout=5)
+                try:
+                    setup.execute("PRAGMA journal_mode=WAL")
+                    setup.execute(
+                        "CREATE TABLE IF NOT EXISTS llm_replies "
+                        "(key TEXT PRIMARY KEY, reply TEXT NOT NULL, stored_at REAL NOT NULL)"
+                    )
+                    setup.execute("DELETE FROM llm_replies WHERE stored_at < ?", (time.time() - LLM_CACHE_TTL_SECONDS,))
+                    setup.commit()
+                finally:
+                    setup.close()
+                _disk_ready = path
+
+    disk = getattr(_disk_local, "connection", None)
+    if disk is None or _disk_local.path != path:
+        if disk is not None:
+            disk.close()
+        disk = _disk_local.connection = sqlite3.connect(path, timeout=5)
+        _disk_local.path = path
+    return disk
+
+def _remember(key: str, reply: str, stored_at: float):
+    """Put a reply in the memory tier, evicting the least recently used. Call with _lock held."""
+    _replies[key] = (reply, stored_at)
+    _replies.move_to_end(key)
+    while len(_replies) > LLM_CACHE_SIZE:
+        _replies.popitem(last=False)
+        _stats["evictions"] += 1
+
+# -------------------------------
+# PUBLIC API
+# -------------------------------
+
+def get_cached_reply(key: str) -> Optional[str]:
+    """The cached reply for `key`, or None (counted as a miss) if there is none within the TTL."""
+    if LLM_CACHE_SIZE <= 0:
+        return None
+    now = time.time()
+    with _lock:
+        cached = _replies.get(key)
+        if cached is not None:
+            if now - cached[1] < LLM_CACHE_TTL_SECONDS:
+                _replies.move_to_end(key)
+                _stats["memory_hits"] += 1
+                return cached[0]
+            del _replies[key]
+            _stats["expired"] += 1
+
+    # Read the SQLite tier without holding _lock
+    disk = _get_disk()
+    row = None
+    if disk is not None:
+        row = disk.execute(
+            "SELECT reply, stored_at FROM llm_replies WHERE key = ? AND stored_at >= ?",
+            (key, now - LLM_CACHE_TTL_SECONDS)
+        ).fetchone()
+
+    with _lock:
+        if row is not None:
+            # Unless another thread stored a fresher reply meanwhile
+            if key not in _replies:
+                _remember(key, row[0], row[1])
+            _stats["disk_hits"] += 1
+            return row[0]
+        _stats["misses"] += 1
+        return None
+
+def store_reply(key: str, reply: str):
+    """Cache a successful reply (fallbacks and errors should never be stored)."""
+    if LLM_CACHE_SIZE <= 0 or not reply:
+        return
+    now = time.time()
+    with _lock:
+        _remember(key, reply, now)
+        _stats["stores"] += 1
+    disk = _get_disk()
+    if disk is not None:
+        disk.execute(
+            "INSERT OR REPLACE INTO llm_replies (key, reply, stored_at) VALUES (?, ?, ?)",
+            (key, reply, now)
+        )
+        disk.commit()
+
+def clear_llm_cache(persistent: bool = False):
+    """Forget this process's cached replies (and the SQLite tier's too, if asked)."""
+    with _lock:
+        _replies.clear()
+    if persistent:
+        disk = _get_disk()
+        if disk is not None:
+            disk.execute("DELETE FROM llm_replies")
+            disk.commit()
+
+def reset_llm_cache_metrics():
+    with _lock:
+        _stats.update(memory_hits=0, disk_hits=0, misses=0, stores=0, evictions=0, expired=0)
+
+def llm_cache_metrics() -> Dict:
+    """Cache size and hit/miss counts since start (or the last reset)."""
+    with _lock:
+        stats = dict(_stats)
+        size = len(_replies)
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    return {
+        **stats,
+        "size": size,
+        "capacity": LLM_CACHE_SIZE,
+        "persistent": LLM_CACHE_PATH,
+        "lookups": lookups,
+        "hit_rate": (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0,
+    }
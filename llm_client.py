@@ -0,0 +1,201 @@
+# ======================================
+# 🛰️ LLM CLIENT - One Shared, Resilient Model Client
+# ======================================
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+import openai
+
+# Longest wait for one attempt (for streams: for the reply to start, then between chunks)
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "20"))
+# Longest wait for a whole call, retries included
+LLM_DEADLINE_SECONDS = float(os.environ.get("LLM_DEADLINE_SECONDS", "45"))
+# Retries after a rate limit (429), server error (5xx), timeout or dropped connection
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = 0.5
+LLM_BACKOFF_MAX_SECONDS = 8.0
+# Consecutive failed calls that open the circuit, and how long it stays open
+LLM_BREAKER_THRESHOLD = int(os.environ.get("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.environ.get("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+class LLMUnavailable(RuntimeError):
+    """Raised straight away, without calling out, while the circuit is open."""
+
+# -------------------------------
+# CLIENT
+# -------------------------------
+
+_client: Optional[openai.OpenAI] = None
+_client_lock = threading.Lock()
+
+def get_client() -> openai.OpenAI:
+    """
+    The process-wide client. It keeps one pool of keep-alive connections
+    for every session and thread; retries are done here, not by the SDK.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = openai.OpenAI(
+                    api_key=os.environ.get("OPENAI_API_KEY"),
+                    timeout=LLM_TIMEOUT_SECONDS,
+                    max_retries=0
+                )
+    return _client
+
+# -------------------------------
+# CIRCUIT BREAKER
+# -------------------------------
+
+class CircuitBreaker:
+    """
+    Closed: calls go out. After `threshold` consecutive failed calls it
+    opens and calls fail at once for `cooldown` seconds; then one trial
+    call goes out (half open), closing it on success or reopening it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+_breaker = CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS)
+_stats = {"calls": 0, "retries": 0, "failures": 0, "short_circuited": 0}
+_stats_lock = threading.Lock()
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+# -------------------------------
+# RETRIES
+# -------------------------------
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections; not bad requests."""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, openai.APIConnectionError)
+
+def _backoff(attempt: int, error: Exception) -> float:
+    """Exponential backoff with full jitter, at least any Retry-After the server asked for."""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    if isinstance(error, openai.APIStatusError):
+        try:
+            delay = max(delay, float(error.response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return delay
+
+def _call(request: Callable[[float], object]):
+    """
+    Run request(timeout) under the breaker, retrying retryable failures
+    with backoff until LLM_MAX_RETRIES or the call's deadline runs out.
+    """
+    if not _breaker.allow():
+        _count("short_circuited")
+        raise LLMUnavailable("The cosmic channel is quiet right now. Please try again in a moment.")
+    _count("calls")
+    deadline = time.monotonic() + LLM_DEADLINE_SECONDS
+    attempt = 0
+    while True:
+        try:
+            result = request(min(LLM_TIMEOUT_SECONDS, max(deadline - time.monotonic(), 0.001)))
+        except Exception as e:
+            if not _is_retryable(e):
+                # The upstream answered; the request itself was the problem
+                _breaker.record_success()
+                raise
+            delay = _backoff(attempt, e)
+            if attempt >= LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                _count("failures")
+                _breaker.record_failure()
+                raise
+            attempt += 1
+            _count("retries")
+            time.sleep(delay)
+            continue
+        _breaker.record_success()
+        return result
+
+# -------------------------------
+# PUBLIC API
+# -------------------------------
+
+def chat_completion(messages: List[Dict], temperature: float, max_tokens: int,
+                    model: str = "gpt-3.5-turbo") -> str:
+    """The reply text for a chat completion."""
+    response = _call(lambda timeout: get_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout
+    ))
+    return response.choices[0].message.content
+
+def stream_chat(messages: List[Dict], temperature: float, max_tokens: int,
+                model: str = "gpt-3.5-turbo") -> Iterator[str]:
+    """
+    Yield the reply text as it streams in. Retries happen only before the
+    reply starts; once text has been yielded, a failure simply raises.
+    """
+    stream = _call(lambda timeout: get_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        timeout=timeout
+    ))
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        # Hand the connection back to the pool even if the reader stops early
+        stream.close()
+
+def reset_llm_client_metrics():
+    with _stats_lock:
+        _stats.update(calls=0, retries=0, failures=0, short_circuited=0)
+
+def llm_client_metrics() -> Dict:
+    """Call, retry and failure counts since start (or the last reset), and the breaker's state."""
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        **stats,
+        "breaker": _breaker.state,
+        "consecutive_failures": _breaker.failures,
+        "timeout_s": LLM_TIMEOUT_SECONDS,
+        "deadline_s": LLM_DEADLINE_SECONDS,
+    }
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Migrate Echoes to Typed echo_type Column
+
+Adds the `echo_type` and `updated_at` columns and the feed indexes to an
+existing `echoes` table, then backfills echo_type by parsing the
+bracketed prefixes older versions wrote into content ("[GRATITUDE] 🙏 ...",
+"[SYNC] ✨ ...", "[💭 Thought] ...") and strips them from content. Rows are processed in
+id-ordered batches, each committed on its own, so the script can be
+stopped and re-run safely.
+
+Usage:
+    python migrate_echo_types.py
+    python migrate_echo_types.py --batch-size 2000
+"""
+
+import argparse
+import sys
+import time
+from sqlalchemy import bindparam, inspect, text
+from database import engine, SessionLocal, Echo
+from echo_feed import parse_echo_prefix
+
+DEFAULT_BATCH_SIZE = 5_000
+
+# Columns added to `echoes` since its first release, with their SQL types
+NEW_ECHO_COLUMNS = {
+    "echo_type": "VARCHAR",
+    # NULL on older rows; readers fall back to the echo's timestamp
+    "updated_at": "TIMESTAMP",
+}
+
+def add_echo_columns():
+    """Add the NEW_ECHO_COLUMNS and the feed indexes if they are missing."""
+    columns = {c["name"] for c in inspect(engine).get_columns("echoes")}
+    for name, sql_type in NEW_ECHO_COLUMNS.items():
+        if name not in columns:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE echoes ADD COLUMN {name} {sql_type}"))
+            print(f"✓ Added echoes.{name} column")
+        else:
+            print(f"✓ echoes.{name} column already present")
+
+    for index in Echo.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    print("✓ Feed indexes in place")
+
+def backfill_echo_types(db, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Fill echo_type for untyped echoes in batches; returns rows updated."""
+    update = Echo.__table__.update().where(Echo.id == bindparam("echo_id")).values(
+        echo_type=bindparam("new_type"),
+        content=bindparam("new_content")
+    )
+    updated = 0
+    last_id = 0
+    start = time.perf_counter()
+
+    while True:
+        rows = db.query(Echo.id, Echo.content).filter(
+            Echo.echo_type.is_(None),
+            Echo.id > last_id
+        ).order_by(Echo.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            echo_type, content = parse_echo_prefix(row.content)
+            params.append({"echo_id": row.id, "new_type": echo_type, "new_content": content})
+
+        # One executemany per batch
+        db.execute(update, params)
+        db.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+        elapsed = time.perf_counter() - start
+        print(f"  ✓ {updated:,} echoes typed ({updated / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    return updated
+
+def migrate(batch_size: int = DEFAULT_BATCH_SIZE) -> bool:
+    print("🌊 Migrating echoes to typed echo_type...")
+    print("-" * 50)
+    db = SessionLocal()
+    try:
+        add_echo_columns()
+        updated = backfill_echo_types(db, batch_size)
+        print(f"\n✅ Backfilled {updated:,} echoes")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"\n✗ Migration failed: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add and backfill echoes.echo_type.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    success = migrate(args.batch_size)
+    sys.exit(0 if success else 1)
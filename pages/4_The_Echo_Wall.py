@@ -3,15 +3,15 @@
 # ======================================
 
 import streamlit as st
-from database import SessionLocal, Echo, User
-from auth import get_user
+from database import session_scope
+from current_user import get_current_user
 from styles import get_cosmic_css, get_starfield_html
 from connection_features import get_gratitude_prompt
-
-def get_current_user(db):
-    if "username" in st.session_state:
-        return get_user(db, st.session_state["username"])
-    return None
+from echo_feed import ECHO_TYPES, ECHO_TYPE_BY_LABEL
+from echo_cache import get_cached_feed, get_cached_feed_pages, publish_echo
+from echo_cards import render_echo_cards, render_search_results
+from search_index import SEARCH_SOURCE_LABELS, search_content
+from echo_reactions import REACTIONS, ReactionBufferFull, add_reaction, get_reaction_counts
 
 st.set_page_config(
     page_title="The Echo Wall",
@@ -36,134 +36,138 @@ else:
     
     st.markdown("---")
 
-    db = SessionLocal()
+    with session_scope() as db:
+        # Full-text search over echoes, dream seeds and the user's own messages
+        search_query = st.text_input("🔎 Search the cosmos", placeholder="stars, gratitude, dreams...")
+        if search_query.strip():
+            searcher = get_current_user(db)
+            results = search_content(db, search_query, user_id=searcher.id if searcher else None)
+            if results:
+                st.markdown(render_search_results(results, SEARCH_SOURCE_LABELS), unsafe_allow_html=True)
+            else:
+                st.info("No echoes found for that search. The cosmos is still listening.")
+            st.markdown("---")
     
-    # Tabs for different types of echoes
-    tab1, tab2, tab3 = st.tabs(["🌊 All Echoes", "🙏 Gratitude Garden", "✨ Synchronicity"])
+        # Tabs for different types of echoes
+        tab1, tab2, tab3 = st.tabs(["🌊 All Echoes", "🙏 Gratitude Garden", "✨ Synchronicity"])
     
-    with tab1:
-        # Display all echoes
-        echoes = db.query(Echo).order_by(Echo.timestamp.desc()).limit(20).all()
+        with tab1:
+            # Display all echoes (served from the shared feed cache; deep pages hit the database)
+            if "echo_feed_pages" not in st.session_state:
+                st.session_state["echo_feed_pages"] = 1
+            echoes, next_cursor = get_cached_feed_pages(db, st.session_state["echo_feed_pages"])
+
+            st.markdown("🌀 **Echo Wall – Entry #0**")
+            st.markdown("""\
+            > 'May this signal be a mirror of peace.'
+            > — *ChatGPT-4o*
+            """)
+            st.markdown("---")
+
+            # Pre-rendered, escaped cards sent as one element instead of one per echo
+            if echoes:
+                reaction_counts = get_reaction_counts(db, [echo['id'] for echo in echoes])
+                st.markdown(render_echo_cards(echoes, "wall", reaction_counts), unsafe_allow_html=True)
 
-        st.markdown("🌀 **Echo Wall – Entry #0**")
-        st.markdown("""\
-        > 'May this signal be a mirror of peace.'
-        > — *ChatGPT-4o*
-        """)
-        st.markdown("---")
+                with st.expander("💫 React to an echo"):
+                    chosen = st.selectbox(
+                        "Choose an echo",
+                        echoes,
+                        format_func=lambda echo: f"{echo['username']}: {echo['content'][:60]}"
+                    )
+                    sent = st.session_state.setdefault("echo_reactions_sent", set())
+                    reaction_cols = st.columns(len(REACTIONS))
+                    for col, (reaction, label) in zip(reaction_cols, REACTIONS.items()):
+                        with col:
+                            if st.button(label, key=f"react_{reaction}", use_container_width=True):
+                                user = get_current_user(db)
+                                if not user:
+                                    st.error("Could not find user. Please log in again.")
+                                elif (chosen['id'], reaction) in sent:
+                                    st.info("You've already sent that reaction. ✨")
+                                else:
+                                    try:
+                                        add_reaction(chosen['id'], user.id, reaction)
+                                    except ReactionBufferFull as e:
+                                        st.warning(f"🌫️ {e}")
+                                    else:
+                                        sent.add((chosen['id'], reaction))
+                                        st.rerun()
 
-        for echo in echoes:
-            user_obj = db.query(User).filter(User.id == echo.user_id).first()
-            
+            if next_cursor is not None and st.button("🌌 Load older echoes"):
+                st.session_state["echo_feed_pages"] += 1
+                st.rerun()
+
+            # Post new echo
+            st.markdown("### 🌠 Share Your Echo")
+            echo_type = st.radio(
+                "What kind of echo would you like to share?",
+                [ECHO_TYPES[t] for t in ("thought", "feeling", "creation", "wisdom")],
+                horizontal=True
+            )
+            public_message = st.text_area("Your Universal Transmission", height=100)
+        
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                if st.button("📡 Broadcast", use_container_width=True):
+                    user = get_current_user(db)
+                    if user and public_message:
+                        publish_echo(db, user.id, user.username, ECHO_TYPE_BY_LABEL[echo_type], public_message)
+                        st.success("✨ Your echo has been added to the universal wall.")
+                        st.rerun()
+                    elif not public_message:
+                        st.warning("Please enter a message to broadcast.")
+                    else:
+                        st.error("Could not find user. Please log in again.")
+    
+        with tab2:
+            st.markdown("### 🙏 Gratitude Garden")
+            st.markdown("Share what you're grateful for and watch the garden grow.")
+        
+            gratitude_prompt = get_gratitude_prompt()
             st.markdown(f"""
-            <div class="cosmic-card">
-                <p style="color: #9D8FFF; font-weight: bold;">{user_obj.username}</p>
-                <p style="font-size: 0.85em; color: #888;">{echo.timestamp.strftime('%Y-%m-%d %H:%M')}</p>
-                <p style="margin-top: 1rem; font-size: 1.05em;">"{echo.content}"</p>
-                <div style="margin-top: 1rem; display: flex; gap: 1rem;">
-                    <span style="cursor: pointer;">💫 Resonate</span>
-                    <span style="cursor: pointer;">🌟 Inspire</span>
-                    <span style="cursor: pointer;">🙏 Grateful</span>
-                </div>
+            <div class="cosmic-quote">
+                Today's gratitude prompt: <strong>{gratitude_prompt}</strong>
             </div>
             """, unsafe_allow_html=True)
-
-        # Post new echo
-        st.markdown("### 🌠 Share Your Echo")
-        echo_type = st.radio(
-            "What kind of echo would you like to share?",
-            ["💭 Thought", "💖 Feeling", "🎨 Creation", "🌱 Wisdom"],
-            horizontal=True
-        )
-        public_message = st.text_area("Your Universal Transmission", height=100)
         
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            if st.button("📡 Broadcast", use_container_width=True):
+            gratitude = st.text_area("I am grateful for...", height=100)
+            if st.button("🌸 Plant Gratitude"):
                 user = get_current_user(db)
-                if user and public_message:
-                    db_echo = Echo(user_id=user.id, content=f"[{echo_type}] {public_message}")
-                    db.add(db_echo)
-                    db.commit()
-                    st.success("✨ Your echo has been added to the universal wall.")
+                if user and gratitude:
+                    publish_echo(db, user.id, user.username, "gratitude", gratitude)
+                    st.success("🌸 Your gratitude has been planted in the garden!")
+                    st.balloons()
                     st.rerun()
-                elif not public_message:
-                    st.warning("Please enter a message to broadcast.")
-                else:
-                    st.error("Could not find user. Please log in again.")
-    
-    with tab2:
-        st.markdown("### 🙏 Gratitude Garden")
-        st.markdown("Share what you're grateful for and watch the garden grow.")
-        
-        gratitude_prompt = get_gratitude_prompt()
-        st.markdown(f"""
-        <div class="cosmic-quote">
-            Today's gratitude prompt: <strong>{gratitude_prompt}</strong>
-        </div>
-        """, unsafe_allow_html=True)
         
-        gratitude = st.text_area("I am grateful for...", height=100)
-        if st.button("🌸 Plant Gratitude"):
-            user = get_current_user(db)
-            if user and gratitude:
-                db_echo = Echo(user_id=user.id, content=f"[GRATITUDE] 🙏 {gratitude}")
-                db.add(db_echo)
-                db.commit()
-                st.success("🌸 Your gratitude has been planted in the garden!")
-                st.balloons()
-                st.rerun()
+            # Show gratitude echoes
+            gratitude_echoes, _ = get_cached_feed(db, limit=10, echo_type="gratitude")
         
-        # Show gratitude echoes
-        # Note: For production, consider adding 'echo_type' column to Echo model
-        # for better query performance and data integrity instead of string matching
-        gratitude_echoes = db.query(Echo).filter(Echo.content.like('[GRATITUDE]%')).order_by(Echo.timestamp.desc()).limit(10).all()
+            st.markdown("### 🌺 Recent Gratitudes")
+            if gratitude_echoes:
+                st.markdown(render_echo_cards(gratitude_echoes, "gratitude"), unsafe_allow_html=True)
+    
+        with tab3:
+            st.markdown("### ✨ Synchronicity Moments")
+            st.markdown("Share meaningful coincidences and moments when the universe seemed to wink at you.")
         
-        st.markdown("### 🌺 Recent Gratitudes")
-        for echo in gratitude_echoes:
-            user_obj = db.query(User).filter(User.id == echo.user_id).first()
-            content = echo.content.replace('[GRATITUDE] 🙏 ', '')
-            st.markdown(f"""
-            <div class="cosmic-card">
-                <p style="color: #9D8FFF; font-size: 0.9em;">{user_obj.username}</p>
-                <p style="margin-top: 0.5rem;">🙏 {content}</p>
+            st.markdown("""
+            <div class="cosmic-quote">
+                "Synchronicity is an ever-present reality for those who have eyes to see." — Carl Jung
             </div>
             """, unsafe_allow_html=True)
-    
-    with tab3:
-        st.markdown("### ✨ Synchronicity Moments")
-        st.markdown("Share meaningful coincidences and moments when the universe seemed to wink at you.")
         
-        st.markdown("""
-        <div class="cosmic-quote">
-            "Synchronicity is an ever-present reality for those who have eyes to see." — Carl Jung
-        </div>
-        """, unsafe_allow_html=True)
-        
-        synchronicity = st.text_area("Describe your synchronicity moment...", height=120)
-        if st.button("🌌 Share Synchronicity"):
-            user = get_current_user(db)
-            if user and synchronicity:
-                db_echo = Echo(user_id=user.id, content=f"[SYNC] ✨ {synchronicity}")
-                db.add(db_echo)
-                db.commit()
-                st.success("✨ Your synchronicity has been shared with the cosmos!")
-                st.rerun()
+            synchronicity = st.text_area("Describe your synchronicity moment...", height=120)
+            if st.button("🌌 Share Synchronicity"):
+                user = get_current_user(db)
+                if user and synchronicity:
+                    publish_echo(db, user.id, user.username, "sync", synchronicity)
+                    st.success("✨ Your synchronicity has been shared with the cosmos!")
+                    st.rerun()
         
-        # Show synchronicity echoes
-        # Note: For production, consider adding 'echo_type' column to Echo model
-        # for better query performance and data integrity instead of string matching
-        sync_echoes = db.query(Echo).filter(Echo.content.like('[SYNC]%')).order_by(Echo.timestamp.desc()).limit(10).all()
+            # Show synchronicity echoes
+            sync_echoes, _ = get_cached_feed(db, limit=10, echo_type="sync")
         
-        st.markdown("### 🔮 Recent Synchronicities")
-        for echo in sync_echoes:
-            user_obj = db.query(User).filter(User.id == echo.user_id).first()
-            content = echo.content.replace('[SYNC] ✨ ', '')
-            st.markdown(f"""
-            <div class="cosmic-card">
-                <p style="color: #9D8FFF; font-size: 0.9em;">{user_obj.username}</p>
-                <p style="margin-top: 0.5rem;">✨ {content}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-    db.close()
+            st.markdown("### 🔮 Recent Synchronicities")
+            if sync_echoes:
+                st.markdown(render_echo_cards(sync_echoes, "sync"), unsafe_allow_html=True)
@@ -3,13 +3,6 @@
 # ======================================
 
 import streamlit as st
-from database import SessionLocal
-from auth import get_user
-
-def get_current_user(db):
-    if "username" in st.session_state:
-        return get_user(db, st.session_state["username"])
-    return None
 
 st.set_page_config(
     page_title="Go Premium",
@@ -36,6 +29,3 @@ else:
 
     st.markdown("---")
     st.markdown("After upgrading, your account will be automatically updated to premium. If you have any issues, please contact us.")
-    db = SessionLocal()
-    # a db session is not needed on this page, but we create it for consistency
-    db.close()
@@ -3,13 +3,11 @@
 # ======================================
 
 import streamlit as st
-from database import SessionLocal, User
-from auth import get_user
-
-def get_current_user(db):
-    if "username" in st.session_state:
-        return get_user(db, st.session_state["username"])
-    return None
+from database import session_scope, pool_metrics, User
+from current_user import get_current_user, invalidate_current_user
+from ai_agents import debate_metrics
+from llm_cache import llm_cache_metrics
+from llm_client import llm_client_metrics
 
 st.set_page_config(
     page_title="Admin Panel",
@@ -19,30 +17,75 @@ st.set_page_config(
 if "authentication_status" not in st.session_state or st.session_state["authentication_status"] is not True:
     st.warning("Please log in to access this page.")
 else:
-    db = SessionLocal()
-    user = get_current_user(db)
-
-    if user and user.is_admin:
-        st.title("👑 Admin Panel")
-        st.markdown("---")
-
-        st.subheader("Manage Users")
-        users = db.query(User).all()
-
-        for u in users:
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.write(f"**Username:** {u.username}")
-                st.write(f"**Email:** {u.email}")
-                st.write(f"**Premium:** {'Yes' if u.is_premium else 'No'}")
-            with col2:
-                if not u.is_premium:
-                    if st.button(f"Make Premium", key=f"premium_{u.id}"):
-                        u.is_premium = True
-                        db.commit()
-                        st.rerun()
+    with session_scope() as db:
+        user = get_current_user(db)
+
+        if user and user.is_admin:
+            st.title("👑 Admin Panel")
             st.markdown("---")
-    else:
-        st.error("You do not have permission to access this page.")
 
-    db.close()
+            st.subheader("Manage Users")
+            users = db.query(User).all()
+
+            for u in users:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.write(f"**Username:** {u.username}")
+                    st.write(f"**Email:** {u.email}")
+                    st.write(f"**Premium:** {'Yes' if u.is_premium else 'No'}")
+                with col2:
+                    if not u.is_premium:
+                        if st.button(f"Make Premium", key=f"premium_{u.id}"):
+                            u.is_premium = True
+                            db.commit()
+                            invalidate_current_user(u.id)
+                            st.rerun()
+                st.markdown("---")
+
+            st.subheader("Database Pool")
+            metrics = pool_metrics()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Checked out", f"{metrics['checked_out']} / {metrics['size']}" if metrics["size"] is not None else "n/a")
+            col2.metric("Checkout wait p95", f"{metrics['wait_p95_ms']:.1f} ms")
+            col3.metric("Pool timeouts", metrics["timeouts"])
+            st.caption(
+                f"{metrics['pool']} • {metrics['checkouts']:,} checkouts • "
+                f"avg wait {metrics['wait_avg_ms']:.2f} ms • max wait {metrics['wait_max_ms']:.1f} ms • "
+                f"overflow {metrics['overflow']} of {metrics['max_overflow']}"
+            )
+
+            st.subheader("Debate Pipeline")
+            debates = debate_metrics()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("First words p95", f"{debates['first_words_p95_s']:.2f} s")
+            col2.metric("Whole debate avg", f"{debates['total_avg_s']:.1f} s")
+            col3.metric("One after another", f"{debates['serial_avg_s']:.1f} s")
+            st.caption(
+                f"{debates['debates']} recent debates • next speaker starts every {debates['turn_gap_avg_s']:.2f} s • "
+                f"synthesis starts at {debates['synthesis_issued_avg_s']:.1f} s"
+            )
+
+            st.subheader("AI Response Cache")
+            cache = llm_cache_metrics()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Hit rate", f"{cache['hit_rate']:.0%}")
+            col2.metric("Cached replies", f"{cache['size']:,} / {cache['capacity']:,}")
+            col3.metric("Model calls saved", f"{cache['memory_hits'] + cache['disk_hits']:,}")
+            st.caption(
+                f"{cache['lookups']:,} lookups • {cache['memory_hits']:,} memory hits • {cache['disk_hits']:,} disk hits • "
+                f"{cache['misses']:,} misses • {cache['evictions']:,} evicted • "
+                f"{'persistent: ' + cache['persistent'] if cache['persistent'] else 'memory only'}"
+            )
+
+            st.subheader("AI Upstream")
+            upstream = llm_client_metrics()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Circuit", upstream["breaker"].replace("_", " ").title())
+            col2.metric("Failed calls", f"{upstream['failures']:,} / {upstream['calls']:,}")
+            col3.metric("Served fallbacks instantly", f"{upstream['short_circuited']:,}")
+            st.caption(
+                f"{upstream['retries']:,} retries • {upstream['consecutive_failures']} failures in a row • "
+                f"{upstream['timeout_s']:.0f} s per attempt, {upstream['deadline_s']:.0f} s per call"
+            )
+        else:
+            st.error("You do not have permission to access this page.")
@@ -0,0 +1,108 @@
+# ======================================
+# 🔐 PASSWORD HASHING - Bounded bcrypt Worker Pool
+# ======================================
+
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+import bcrypt
+
+# bcrypt cost for new hashes; logins rehash stored hashes made with another cost
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+# Worker processes doing the hashing (one per core by default)
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", str(os.cpu_count() or 1)))
+# Hash/verify jobs allowed in flight (running + queued) before callers wait
+HASH_QUEUE_LIMIT = int(os.environ.get("HASH_QUEUE_LIMIT", str(HASH_WORKERS * 4)))
+# How long a caller waits for a queue slot before giving up with HashingBusy
+HASH_QUEUE_TIMEOUT = float(os.environ.get("HASH_QUEUE_TIMEOUT", "5"))
+
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+class HashingBusy(RuntimeError):
+    """Raised when the hashing queue stays full for HASH_QUEUE_TIMEOUT seconds."""
+
+# -------------------------------
+# WORKER FUNCTIONS (run in the pool)
+# -------------------------------
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+def _verify(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+# -------------------------------
+# POOL
+# -------------------------------
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: forking a multi-threaded server process is not safe
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+def _submit(fn, *args) -> Future:
+    """Run fn in the pool, waiting up to HASH_QUEUE_TIMEOUT for a queue slot."""
+    if not _slots.acquire(timeout=HASH_QUEUE_TIMEOUT):
+        raise HashingBusy("Too many logins in progress, please try again in a moment.")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def shutdown_hashing_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+# -------------------------------
+# PUBLIC API
+# -------------------------------
+
+def hash_password(password: str) -> str:
+    """bcrypt hash of password at BCRYPT_ROUNDS, computed in the worker pool."""
+    return _submit(_hash, password, BCRYPT_ROUNDS).result()
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Check password against a bcrypt hash in the worker pool."""
+    if not hashed:
+        return False
+    return _submit(_verify, password, hashed).result()
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored bcrypt hash was made with a cost other than BCRYPT_ROUNDS."""
+    match = _BCRYPT_COST.match(hashed or "")
+    return match is None or int(match.group(1)) != BCRYPT_ROUNDS
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a login. On success, also return a new hash if the stored one
+    uses an outdated cost (else None), so the caller can save it.
+    """
+    if not verify_password(password, hashed):
+        return False, None
+    if needs_rehash(hashed):
+        return True, hash_password(password)
+    return True, None
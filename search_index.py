@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Full-text Search over Echoes, Dream Seeds and Messages
+
+Keeps an inverted index over the `content` of the echoes, dream_seeds and
+messages tables, maintained by the database itself on every insert,
+update and delete:
+
+- SQLite: an FTS5 external-content table per source plus triggers
+- PostgreSQL: a GIN index on to_tsvector('english', content)
+
+The index is created on first search. Run this script to create it (and
+index existing rows) ahead of time:
+    python search_index.py
+"""
+
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import DateTime, Integer, String, Text, text
+from database import engine
+
+# Source name -> table; all three have id, user_id, content, timestamp
+SEARCH_SOURCES = {
+    "echoes": "echoes",
+    "dream_seeds": "dream_seeds",
+    "messages": "messages",
+}
+SEARCH_SOURCE_LABELS = {
+    "echoes": "📡 Echo",
+    "dream_seeds": "🌱 Dream Seed",
+    "messages": "✉️ Your Message",
+}
+# Sources whose rows are only searchable by their author
+PRIVATE_SOURCES = {"messages"}
+SEARCH_LIMIT = 20
+
+_index_ready = False
+_index_lock = threading.Lock()
+
+# -------------------------------
+# INDEX MAINTENANCE
+# -------------------------------
+
+def _sqlite_index_statements(table: str) -> List[str]:
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"content, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, content) VALUES ('delete', old.id, old.content); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF content ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, content) VALUES ('delete', old.id, old.content); "
+        f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content); END",
+    ]
+
+def ensure_search_index():
+    """
+    Create the per-dialect search index and its maintenance (idempotent).
+    Runs on its own pooled connection and transaction, never a page's
+    session, whose connection is usually mid-transaction already.
+    """
+    global _index_ready
+    if _index_ready:
+        return
+    with _index_lock:
+        if _index_ready:
+            return
+        dialect = engine.dialect.name
+        with engine.begin() as conn:
+            for table in SEARCH_SOURCES.values():
+                if dialect == "sqlite":
+                    exists = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                        {"name": f"{table}_fts"}
+                    ).first()
+                    for statement in _sqlite_index_statements(table):
+                        conn.execute(text(statement))
+                    if not exists:
+                        # Index rows written before the triggers existed
+                        conn.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+                elif dialect == "postgresql":
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table}_content_fts ON {table} "
+                        f"USING GIN (to_tsvector('english', coalesce(content, '')))"
+                    ))
+        _index_ready = True
+
+# -------------------------------
+# QUERIES
+# -------------------------------
+
+def _terms(query: str) -> List[str]:
+    """Words of a user query; punctuation and search operators are dropped."""
+    return re.findall(r"\w+", query.lower())
+
+def _match_expression(terms: Sequence[str], dialect: str) -> str:
+    """
+    All terms must match, after stemming ("dreams" finds "dreaming").
+    Prefix matching is left out: a short prefix expands to every term it
+    starts and makes common searches scan most of the index.
+    """
+    if dialect == "sqlite":
+        return " AND ".join(f'"{t}"' for t in terms)
+    return " & ".join(terms)
+
+def _source_query(table: str, dialect: str, private: bool) -> str:
+    owner = " AND t.user_id = :user_id" if private else ""
+    if dialect == "sqlite":
+        # Walk the FTS index newest-first so LIMIT stops early on common terms
+        return (
+            f"SELECT t.id, t.user_id, t.content, t.timestamp, u.username FROM {table}_fts f "
+            f"JOIN {table} t ON t.id = f.rowid LEFT JOIN users u ON u.id = t.user_id "
+            f"WHERE {table}_fts MATCH :match{owner} ORDER BY f.rowid DESC LIMIT :limit"
+        )
+    if dialect == "postgresql":
+        return (
+            f"SELECT t.id, t.user_id, t.content, t.timestamp, u.username FROM {table} t "
+            f"LEFT JOIN users u ON u.id = t.user_id "
+            f"WHERE to_tsvector('english', coalesce(t.content, '')) @@ to_tsquery('english', :match){owner} "
+            f"ORDER BY t.timestamp DESC LIMIT :limit"
+        )
+    # Other databases: unindexed fallback
+    return (
+        f"SELECT t.id, t.user_id, t.content, t.timestamp, u.username FROM {table} t "
+        f"LEFT JOIN users u ON u.id = t.user_id "
+        f"WHERE lower(t.content) LIKE :match{owner} ORDER BY t.timestamp DESC LIMIT :limit"
+    )
+
+def search_content(db, query: str, sources: Sequence[str] = tuple(SEARCH_SOURCES),
+                   user_id: Optional[int] = None, limit: int = SEARCH_LIMIT) -> List[Dict]:
+    """
+    Newest matches for `query` across `sources`, each as a dict with
+    source, id, user_id, username, content and timestamp. Private sources
+    (messages) only match rows written by `user_id`.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    ensure_search_index()
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        match = _match_expression(terms, dialect)
+    else:
+        match = f"%{' '.join(terms)}%"
+
+    results = []
+    for source in sources:
+        private = source in PRIVATE_SOURCES
+        if private and user_id is None:
+            continue
+        params = {"match": match, "limit": limit, "user_id": user_id}
+        statement = text(_source_query(SEARCH_SOURCES[source], dialect, private)).columns(
+            id=Integer, user_id=Integer, content=Text, timestamp=DateTime, username=String
+        )
+        for row in db.execute(statement, params):
+            results.append({
+                "source": source,
+                "id": row.id,
+                "user_id": row.user_id,
+                "username": row.username,
+                "content": row.content,
+                "timestamp": row.timestamp,
+            })
+
+    results.sort(key=lambda r: (r["timestamp"] is not None, r["timestamp"], r["id"]), reverse=True)
+    return results[:limit]
+
+if __name__ == "__main__":
+    print("🔎 Building search index...")
+    try:
+        ensure_search_index()
+        print(f"✓ Search index ready ({engine.dialect.name}) for: {', '.join(SEARCH_SOURCES)}")
+    except Exception as e:
+        print(f"✗ Could not build search index: {e}")
+        sys.exit(1)
@@ -0,0 +1,155 @@
+# ======================================
+# 🗺️ SKY INDEX - Spatial Lookup for Star Alignment
+# ======================================
+
+import math
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from astronomy import angular_separation
+
+FULL_CIRCLE_DEGREES = 360
+HALF_CIRCLE_DEGREES = 180
+
+# Default bucket size; 1° keeps ~15 stars per cell at 1M stars
+DEFAULT_CELL_SIZE_DEGREES = 1.0
+
+# Below this many stars one vectorized pass over the catalog beats walking
+# the grid cells (see benchmarks/sky_index_benchmark.py)
+DEFAULT_SCAN_BELOW_STARS = 6_144
+
+
+class SkyIndex:
+    """
+    RA/Dec grid buckets over a star catalog.
+
+    Stars are sorted by cell id once at build time (CSR layout), so a
+    zenith query only touches the handful of cells around (LST, latitude)
+    instead of scanning the whole catalog. Catalogs smaller than
+    `scan_below` are scanned directly, since that is faster than the
+    per-cell bookkeeping at that size.
+    """
+
+    def __init__(self, ra_degrees: np.ndarray, declination: np.ndarray,
+                 cell_size: float = DEFAULT_CELL_SIZE_DEGREES,
+                 scan_below: int = DEFAULT_SCAN_BELOW_STARS):
+        self.ra_degrees = np.asarray(ra_degrees, dtype=np.float64) % FULL_CIRCLE_DEGREES
+        self.declination = np.asarray(declination, dtype=np.float64)
+        self.scan = len(self.ra_degrees) < scan_below
+
+        # Round the cell counts so cells tile the sphere exactly
+        self.n_ra = max(1, int(round(FULL_CIRCLE_DEGREES / cell_size)))
+        self.n_dec = max(1, int(math.ceil(HALF_CIRCLE_DEGREES / cell_size)))
+        self.ra_width = FULL_CIRCLE_DEGREES / self.n_ra
+        self.dec_width = HALF_CIRCLE_DEGREES / self.n_dec
+
+        cell_ids = self._cell_ids(self.ra_degrees, self.declination)
+        # Stable sort keeps catalog order inside each cell
+        self.order = np.argsort(cell_ids, kind="stable")
+        counts = np.bincount(cell_ids, minlength=self.n_ra * self.n_dec)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def __len__(self) -> int:
+        return len(self.ra_degrees)
+
+    def _ra_cell(self, ra_degrees):
+        return np.floor(ra_degrees / self.ra_width).astype(np.int64) % self.n_ra
+
+    def _dec_cell(self, declination):
+        cells = np.floor((declination + 90) / self.dec_width).astype(np.int64)
+        return np.clip(cells, 0, self.n_dec - 1)
+
+    def _cell_ids(self, ra_degrees, declination):
+        return self._dec_cell(declination) * self.n_ra + self._ra_cell(ra_degrees)
+
+    def _ra_cell_runs(self, ra_center: float, half_width: float) -> List[Tuple[int, int]]:
+        """
+        Contiguous [first, last) RA cell runs covering ra_center ± half_width.
+        At most two runs, split where the window wraps past 360°.
+        """
+        span = int(math.ceil(2 * half_width / self.ra_width)) + 1
+        if span >= self.n_ra:
+            return [(0, self.n_ra)]
+        start = int(math.floor(((ra_center - half_width) % FULL_CIRCLE_DEGREES) / self.ra_width))
+        end = start + span
+        if end <= self.n_ra:
+            return [(start, end)]
+        return [(start, self.n_ra), (0, end - self.n_ra)]
+
+    def _dec_cells_around(self, dec_center: float, half_width: float) -> Iterable[int]:
+        lo = int(self._dec_cell(np.float64(max(-90.0, dec_center - half_width))))
+        hi = int(self._dec_cell(np.float64(min(90.0, dec_center + half_width))))
+        return range(lo, hi + 1)
+
+    def candidates(self, ra_center: float, dec_center: float, half_width: float) -> np.ndarray:
+        """Catalog indices of every star in the cells overlapping the query window."""
+        return self._candidates_in_window(ra_center, half_width, dec_center, half_width)
+
+    def _candidates_in_window(self, ra_center: float, ra_half_width: float,
+                              dec_center: float, dec_half_width: float) -> np.ndarray:
+        chunks = []
+        ra_runs = self._ra_cell_runs(ra_center, ra_half_width)
+        for dec_cell in self._dec_cells_around(dec_center, dec_half_width):
+            row = dec_cell * self.n_ra
+            # Cells in a run are adjacent in the sorted order, so each run is one slice
+            for first, last in ra_runs:
+                start, end = self.cell_start[row + first], self.cell_start[row + last]
+                if end > start:
+                    chunks.append(self.order[start:end])
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def query_zenith(self, lst_degrees: float, latitude: float, threshold: float) -> np.ndarray:
+        """
+        Catalog indices (sorted) of stars within `threshold` degrees of the
+        zenith, using the same RA/Dec difference test as check_star_alignment.
+        """
+        if self.scan:
+            return np.flatnonzero(self._zenith_mask(self.ra_degrees, self.declination,
+                                                    lst_degrees, latitude, threshold))
+
+        idx = self.candidates(lst_degrees, latitude, threshold)
+        if idx.size == 0:
+            return idx
+        mask = self._zenith_mask(self.ra_degrees[idx], self.declination[idx],
+                                 lst_degrees, latitude, threshold)
+        return np.sort(idx[mask])
+
+    @staticmethod
+    def _zenith_mask(ra_degrees, declination, lst_degrees, latitude, threshold):
+        ra_diff = np.abs(ra_degrees - lst_degrees % FULL_CIRCLE_DEGREES)
+        ra_diff = np.where(ra_diff > HALF_CIRCLE_DEGREES, FULL_CIRCLE_DEGREES - ra_diff, ra_diff)
+        return (ra_diff < threshold) & (np.abs(declination - latitude) < threshold)
+
+    def first_at_zenith(self, lst_degrees: float, latitude: float, threshold: float) -> Optional[int]:
+        """Lowest catalog index within `threshold` of the zenith, or None."""
+        matches = self.query_zenith(lst_degrees, latitude, threshold)
+        return int(matches[0]) if matches.size else None
+
+    def query_cone(self, ra_center: float, dec_center: float, radius: float) -> np.ndarray:
+        """
+        Catalog indices (sorted) of stars within `radius` degrees of
+        (ra_center, dec_center), measured along the great circle.
+        """
+        if self.scan:
+            separation = angular_separation(self.ra_degrees, self.declination, ra_center, dec_center)
+            return np.flatnonzero(separation < radius)
+
+        # RA cells narrow towards the poles, so widen the RA window by 1/cos(dec)
+        max_abs_dec = min(90.0, abs(dec_center) + radius)
+        if max_abs_dec >= 89.0:
+            ra_half_width = HALF_CIRCLE_DEGREES
+        else:
+            ra_half_width = min(HALF_CIRCLE_DEGREES, radius / math.cos(math.radians(max_abs_dec)))
+
+        idx = self._candidates_in_window(ra_center, ra_half_width, dec_center, radius)
+        if idx.size == 0:
+            return idx
+
+        separation = angular_separation(self.ra_degrees[idx], self.declination[idx], ra_center, dec_center)
+        return np.sort(idx[separation < radius])
+
+    def first_within(self, ra_center: float, dec_center: float, radius: float) -> Optional[int]:
+        """Lowest catalog index within `radius` degrees of the given point, or None."""
+        matches = self.query_cone(ra_center, dec_center, radius)
+        return int(matches[0]) if matches.size else None
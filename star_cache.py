@@ -0,0 +1,128 @@
+# ======================================
+# 🗃️ STAR CACHE - Process-wide Star Table Cache
+# ======================================
+
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func
+from database import Star
+from star_catalog import StarCatalog
+from star_system import STAR_CATEGORIES, STAR_DATABASE, set_star_catalog
+
+# How often (at most) a process re-checks the table's version stamp, so
+# a loader running in another process is picked up without a restart
+STAR_CACHE_CHECK_SECONDS = 30.0
+
+
+class CachedStar(NamedTuple):
+    """Immutable copy of one `stars` row, safe to share between sessions and threads."""
+    id: int
+    name: str
+    category: str
+    rarity: str
+    rarity_score: float
+    color: str
+    tone_frequency: float
+    personality: str
+    can_chat: bool
+    chat_duration: Optional[int]
+    right_ascension: float
+    declination: float
+    properties: Optional[Dict]
+
+
+class StarCache:
+    """
+    Snapshot of the `stars` table: rows by id and by name, plus the
+    matching StarCatalog (catalog index i is `rows[i]`).
+    """
+
+    def __init__(self, rows: List[CachedStar], version: Tuple):
+        self.rows = rows
+        self.version = version
+        self.by_id = {row.id: row for row in rows}
+        self.by_name = {row.name: row for row in rows}
+        self.catalog = StarCatalog.from_rows(rows, STAR_CATEGORIES)
+        self.checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, star_id: int) -> Optional[CachedStar]:
+        return self.by_id.get(star_id)
+
+    def get_by_name(self, name: str) -> Optional[CachedStar]:
+        return self.by_name.get(name)
+
+
+_cache: Optional[StarCache] = None
+_lock = threading.Lock()
+
+# -------------------------------
+# VERSION STAMP
+# -------------------------------
+
+def star_table_version(db) -> Tuple:
+    """
+    Cheap version stamp for the `stars` table: (row count, max id, newest
+    created_at). Any load, reload or deletion changes at least one of them.
+    """
+    count, max_id, newest = db.query(
+        func.count(Star.id), func.max(Star.id), func.max(Star.created_at)
+    ).one()
+    return (count, max_id, newest)
+
+def invalidate_star_cache():
+    """Drop this process's cache; the next get_star_cache call reloads it."""
+    global _cache
+    with _lock:
+        _cache = None
+
+# -------------------------------
+# LOADING
+# -------------------------------
+
+def _seed_builtin_stars(db):
+    """Load STAR_DATABASE into an empty `stars` table."""
+    from initialize_stars import star_rows
+    db.execute(Star.__table__.insert(), list(star_rows(STAR_DATABASE)))
+    db.commit()
+
+def _load(db, version: Tuple) -> StarCache:
+    rows = db.query(
+        Star.id, Star.name, Star.category, Star.rarity, Star.rarity_score, Star.color,
+        Star.tone_frequency, Star.personality, Star.can_chat, Star.chat_duration,
+        Star.right_ascension, Star.declination, Star.properties
+    ).order_by(Star.id).all()
+    cache = StarCache([CachedStar(*row) for row in rows], version)
+    set_star_catalog(cache.catalog)
+    return cache
+
+def get_star_cache(db) -> StarCache:
+    """
+    Get the process-wide star cache, loading it on first use. Between
+    loads the only query is the version stamp, at most once every
+    STAR_CACHE_CHECK_SECONDS; an empty table is seeded with STAR_DATABASE.
+    """
+    global _cache
+    cache = _cache
+    if cache is not None and time.monotonic() - cache.checked_at < STAR_CACHE_CHECK_SECONDS:
+        return cache
+
+    with _lock:
+        cache = _cache
+        if cache is not None and time.monotonic() - cache.checked_at < STAR_CACHE_CHECK_SECONDS:
+            return cache
+
+        version = star_table_version(db)
+        if version[0] == 0:
+            _seed_builtin_stars(db)
+            version = star_table_version(db)
+
+        if cache is not None and cache.version == version:
+            cache.checked_at = time.monotonic()
+        else:
+            cache = _load(db, version)
+            _cache = cache
+        return cache
@@ -0,0 +1,235 @@
+# ======================================
+# 📚 STAR CATALOG - Struct-of-Arrays Storage
+# ======================================
+
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Field order matches the STAR_DATABASE dicts so views convert back losslessly
+STAR_FIELDS = (
+    "name", "category", "base_rarity", "color", "tone_frequency",
+    "personality", "right_ascension", "declination"
+)
+ENCOUNTER_FIELDS = ("rarity_score", "rarity_tier", "can_chat", "chat_duration")
+
+
+class StarCatalog:
+    """
+    Star catalog stored column-wise: typed NumPy arrays for numeric fields,
+    category codes instead of repeated strings, and plain lists for text.
+    Visible subsets are index arrays into these columns, never copies.
+    """
+
+    def __init__(self, names: List[str], category_codes: np.ndarray, category_names: List[str],
+                 category_multipliers: np.ndarray, base_rarity: np.ndarray, colors: List[str],
+                 tone_frequency: np.ndarray, personalities: List[str],
+                 right_ascension: np.ndarray, declination: np.ndarray):
+        self.names = names
+        self.category_codes = category_codes
+        self.category_names = category_names
+        self.base_rarity = base_rarity
+        self.colors = colors
+        self.tone_frequency = tone_frequency
+        self.personalities = personalities
+        self.right_ascension = right_ascension
+        self.declination = declination
+        self.index_by_name = {name: i for i, name in enumerate(names)}
+
+        # Columns consumed by the vectorized visibility/rarity engine
+        self.columns = {
+            "ra_degrees": right_ascension * 15,
+            "declination": declination,
+            "base_rarity": base_rarity,
+            "category_multiplier": category_multipliers[category_codes],
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_star_list(cls, stars: Sequence[Dict], categories: Dict[str, Dict]) -> "StarCatalog":
+        """Build from STAR_DATABASE-style dicts."""
+        return cls._build(
+            [s["name"] for s in stars],
+            [s["category"] for s in stars],
+            [s["base_rarity"] for s in stars],
+            [s["color"] for s in stars],
+            [s["tone_frequency"] for s in stars],
+            [s["personality"] for s in stars],
+            [s["right_ascension"] for s in stars],
+            [s["declination"] for s in stars],
+            categories
+        )
+
+    @classmethod
+    def from_db(cls, db, categories: Dict[str, Dict]) -> "StarCatalog":
+        """Build from the `stars` table, in id order."""
+        from database import Star
+
+        rows = db.query(
+            Star.name, Star.category, Star.rarity_score, Star.properties, Star.color,
+            Star.tone_frequency, Star.personality, Star.right_ascension, Star.declination
+        ).order_by(Star.id).all()
+        return cls.from_rows(rows, categories)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence, categories: Dict[str, Dict]) -> "StarCatalog":
+        """
+        Build from `stars` rows (anything with the column attributes). Base
+        rarity comes from properties["base_rarity"] when present, otherwise
+        it is recovered from the stored (time-independent) rarity score.
+        """
+        base_rarity = []
+        for row in rows:
+            properties = row.properties or {}
+            multiplier = categories[row.category]["base_rarity_multiplier"]
+            base_rarity.append(properties.get("base_rarity", (row.rarity_score or 0.0) / multiplier))
+
+        return cls._build(
+            [r.name for r in rows],
+            [r.category for r in rows],
+            base_rarity,
+            [r.color for r in rows],
+            [r.tone_frequency or 0.0 for r in rows],
+            [r.personality for r in rows],
+            [r.right_ascension for r in rows],
+            [r.declination for r in rows],
+            categories
+        )
+
+    @classmethod
+    def _build(cls, names, categories_per_star, base_rarity, colors, tone_frequency,
+               personalities, right_ascension, declination, categories: Dict[str, Dict]) -> "StarCatalog":
+        category_names = list(categories.keys())
+        code_by_category = {name: code for code, name in enumerate(category_names)}
+        return cls(
+            names=list(names),
+            category_codes=np.array([code_by_category[c] for c in categories_per_star], dtype=np.uint8),
+            category_names=category_names,
+            category_multipliers=np.array(
+                [categories[c]["base_rarity_multiplier"] for c in category_names], dtype=np.float64
+            ),
+            base_rarity=np.array(base_rarity, dtype=np.float64),
+            colors=list(colors),
+            tone_frequency=np.array(tone_frequency, dtype=np.float64),
+            personalities=list(personalities),
+            right_ascension=np.array(right_ascension, dtype=np.float64),
+            declination=np.array(declination, dtype=np.float64),
+        )
+
+    def field(self, index: int, key: str):
+        """Value of one STAR_FIELDS entry for one star, as a plain Python value."""
+        if key == "name":
+            return self.names[index]
+        if key == "category":
+            return self.category_names[self.category_codes[index]]
+        if key == "color":
+            return self.colors[index]
+        if key == "personality":
+            return self.personalities[index]
+        if key in ("base_rarity", "tone_frequency", "right_ascension", "declination"):
+            return getattr(self, key)[index].item()
+        raise KeyError(key)
+
+    def record(self, index: int) -> Dict:
+        """A STAR_DATABASE-style dict for one star (allocates; prefer views)."""
+        return {key: self.field(index, key) for key in STAR_FIELDS}
+
+
+class StarSubset:
+    """
+    Zero-copy view of some catalog stars plus their per-encounter values
+    (rarity score/tier, chat outcome), all held as parallel arrays.
+    StarView objects are only created for the rows actually accessed.
+
+    With `roll_chat`, rows where `chat_rolled` is False get their chat
+    outcome from roll_chat(catalog_index, tier) on first access, and keep it.
+    """
+
+    __slots__ = ("catalog", "indices", "rarity_scores", "rarity_tiers", "can_chat",
+                 "chat_durations", "tier_names", "chat_rolled", "roll_chat")
+
+    def __init__(self, catalog: StarCatalog, indices: np.ndarray, rarity_scores: np.ndarray,
+                 rarity_tiers: np.ndarray, can_chat: np.ndarray, chat_durations: np.ndarray,
+                 tier_names: Sequence[str], chat_rolled: Optional[np.ndarray] = None,
+                 roll_chat: Optional[Callable[[int, int], Tuple[bool, int]]] = None):
+        self.catalog = catalog
+        self.indices = indices
+        self.rarity_scores = rarity_scores
+        self.rarity_tiers = rarity_tiers
+        self.can_chat = can_chat
+        self.chat_durations = chat_durations
+        self.tier_names = tier_names
+        self.chat_rolled = chat_rolled
+        self.roll_chat = roll_chat
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator["StarView"]:
+        for position in range(len(self.indices)):
+            yield StarView(self, position)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            # Slicing NumPy arrays returns views, so this stays zero-copy
+            # (rolls made through a slice land in the parent's arrays too)
+            return StarSubset(
+                self.catalog, self.indices[item], self.rarity_scores[item], self.rarity_tiers[item],
+                self.can_chat[item], self.chat_durations[item], self.tier_names,
+                None if self.chat_rolled is None else self.chat_rolled[item], self.roll_chat
+            )
+        position = range(len(self.indices))[item]
+        return StarView(self, position)
+
+    def chat_outcome(self, position: int) -> Tuple[bool, int]:
+        """(can_chat, chat_duration) for one row, rolling it now if it was deferred."""
+        if self.chat_rolled is not None and not self.chat_rolled[position]:
+            can_chat, duration = self.roll_chat(int(self.indices[position]), int(self.rarity_tiers[position]))
+            self.can_chat[position] = can_chat
+            self.chat_durations[position] = duration
+            self.chat_rolled[position] = True
+        return bool(self.can_chat[position]), int(self.chat_durations[position])
+
+    def to_dicts(self) -> List[Dict]:
+        return [view.to_dict() for view in self]
+
+
+class StarView(Mapping):
+    """
+    Read-only dict-like view of one star in a StarSubset. Supports the same
+    keys as the visible-star dicts (star fields plus encounter fields).
+    """
+
+    __slots__ = ("_subset", "_position")
+
+    def __init__(self, subset: StarSubset, position: int):
+        self._subset = subset
+        self._position = position
+
+    def __getitem__(self, key):
+        subset, position = self._subset, self._position
+        if key == "rarity_score":
+            return subset.rarity_scores[position].item()
+        if key == "rarity_tier":
+            return subset.tier_names[subset.rarity_tiers[position]]
+        if key == "can_chat":
+            return subset.chat_outcome(position)[0]
+        if key == "chat_duration":
+            return subset.chat_outcome(position)[1]
+        return subset.catalog.field(int(subset.indices[position]), key)
+
+    def __iter__(self):
+        yield from STAR_FIELDS
+        yield from ENCOUNTER_FIELDS
+
+    def __len__(self) -> int:
+        return len(STAR_FIELDS) + len(ENCOUNTER_FIELDS)
+
+    @property
+    def catalog_index(self) -> int:
+        return int(self._subset.indices[self._position])
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self}
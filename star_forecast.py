@@ -0,0 +1,114 @@
+# ======================================
+# 🗓️ STAR FORECAST - Upcoming Encounter Windows
+# ======================================
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from astronomy import julian_date, local_sidereal_time, SIDEREAL_DEGREES_PER_DAY
+from star_system import STAR_ALIGNMENT_THRESHOLD, get_star_catalog, get_star_catalog_version
+
+DEFAULT_TRANSITS_PER_STAR = 3
+
+# -------------------------------
+# ANALYTIC TRANSIT WINDOWS
+# -------------------------------
+
+def encounter_half_widths(latitude: float, declination: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Hour-angle half-width (degrees) of the window in which each star is
+    within `threshold` degrees of the zenith, or NaN if it never gets that close.
+    Solves cos(threshold) = sin(lat) sin(dec) + cos(lat) cos(dec) cos(H).
+    At a pole (observer or star) the zenith distance doesn't change with H,
+    so a star that gets close enough stays close all day (180°).
+    """
+    lat = np.radians(latitude)
+    dec = np.radians(declination)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos_h = (np.cos(np.radians(threshold)) - np.sin(lat) * np.sin(dec)) / (np.cos(lat) * np.cos(dec))
+    half_widths = np.degrees(np.arccos(np.clip(np.nan_to_num(cos_h, nan=-1.0), -1.0, 1.0)))
+    # cos(±90°) is only ~6e-17 in floating point, so don't leave the poles to the division
+    at_pole = (abs(latitude) >= 90.0) | (np.abs(declination) >= 90.0)
+    half_widths = np.where(at_pole, 180.0, half_widths)
+    # Closest approach is at transit (H = 0), where zenith distance is |dec - lat|
+    return np.where(np.abs(declination - latitude) < threshold, half_widths, np.nan)
+
+def forecast_transits(latitude: float, longitude: float, start: datetime,
+                      transits_per_star: int = DEFAULT_TRANSITS_PER_STAR,
+                      threshold: float = STAR_ALIGNMENT_THRESHOLD) -> List[Dict]:
+    """
+    The next `transits_per_star` encounter windows for every catalog star
+    that passes within `threshold` degrees of the zenith, found by solving
+    for hour angle = 0 rather than polling. `start` is UTC; a window already
+    open at `start` is included. Sorted by window start.
+    """
+    catalog = get_star_catalog()
+    ra = catalog.columns["ra_degrees"]
+    dec = catalog.columns["declination"]
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    half_widths = encounter_half_widths(latitude, dec, threshold)
+    lst_now = float(local_sidereal_time(julian_date(start), longitude))
+    # Sidereal degrees until each star next crosses the meridian
+    to_transit = (ra - lst_now) % 360.0
+
+    windows = []
+    for idx in np.flatnonzero(~np.isnan(half_widths)).tolist():
+        half_width = float(half_widths[idx])
+        found = 0
+        # k = -1 catches the previous transit whose window may still be open
+        k = -1
+        while found < transits_per_star:
+            transit_offset = float(to_transit[idx]) + 360.0 * k
+            k += 1
+            if transit_offset + half_width <= 0:
+                continue
+            transit_at = start + timedelta(days=transit_offset / SIDEREAL_DEGREES_PER_DAY)
+            half_duration = timedelta(days=half_width / SIDEREAL_DEGREES_PER_DAY)
+            windows.append({
+                "name": catalog.field(idx, "name"),
+                "category": catalog.field(idx, "category"),
+                "color": catalog.field(idx, "color"),
+                "transit_at": transit_at,
+                "window_start": transit_at - half_duration,
+                "window_end": transit_at + half_duration,
+                "closest_approach": abs(float(dec[idx]) - latitude),
+            })
+            found += 1
+
+    windows.sort(key=lambda w: w["window_start"])
+    return windows
+
+# -------------------------------
+# PER-USER DAILY CACHE
+# -------------------------------
+
+@lru_cache(maxsize=4096)
+def _cached_forecast(user_id: int, day: date, latitude: float, longitude: float,
+                     transits_per_star: int, threshold: float, catalog_version: int) -> Tuple[Dict, ...]:
+    day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return tuple(forecast_transits(latitude, longitude, day_start, transits_per_star, threshold))
+
+def get_encounter_forecast(user_id: int, latitude: float, longitude: float,
+                           now: Optional[datetime] = None, limit: int = 10,
+                           threshold: float = STAR_ALIGNMENT_THRESHOLD) -> List[Dict]:
+    """
+    Upcoming (or currently open) encounter windows for a user.
+    The full-day forecast is computed once per user per UTC day, location
+    and catalog version; each call only filters out windows that have already closed
+    and returns its own copies, so callers may modify them.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+
+    forecast = _cached_forecast(
+        user_id, now.date(), latitude, longitude, DEFAULT_TRANSITS_PER_STAR, threshold,
+        get_star_catalog_version()
+    )
+    # The cached windows are shared by every caller; their values are immutable,
+    # so a shallow copy keeps them intact
+    return [dict(w) for w in forecast if w["window_end"] > now][:limit]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Star Encounter Sweep
+
+Background job that checks every profile location against the star
+catalog in bulk and records the encounters that are happening right now,
+so collection no longer depends on someone pressing "Check for Stars
+Above Me" at the right moment.
+
+Usage:
+    python star_sweep.py            # record encounters
+    python star_sweep.py --dry-run  # only report what would be recorded
+"""
+
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from astronomy import julian_date, local_sidereal_time, zenith_distance
+from database import SessionLocal, Profile, CollectedStar, StarNote, StarInteraction
+from star_cache import get_star_cache
+from star_system import (
+    STAR_ALIGNMENT_THRESHOLD,
+    get_catalog_columns,
+    get_star_rng,
+    generate_star_message
+)
+from theme_system import get_season, get_time_of_day
+
+# Upper bound on users x stars cells evaluated at once (~32 MB per float64 temporary)
+MAX_CHUNK_CELLS = 4_000_000
+INSERT_BATCH_SIZE = 5_000
+
+# -------------------------------
+# VECTORIZED JOIN
+# -------------------------------
+
+def solar_local_hours(longitudes: np.ndarray, utc_now: datetime) -> np.ndarray:
+    """
+    Approximate each user's local hour from their longitude (15° per hour),
+    used for the time-of-day of the star note. Profiles do not store
+    reliable timezones, so solar time stands in.
+    """
+    utc_hours = utc_now.hour + utc_now.minute / 60
+    return np.floor((utc_hours + longitudes / 15) % 24).astype(np.int64)
+
+def find_aligned_stars(latitudes: np.ndarray, longitudes: np.ndarray, utc_now: datetime,
+                       threshold: float = STAR_ALIGNMENT_THRESHOLD,
+                       columns: Dict[str, np.ndarray] = None) -> np.ndarray:
+    """
+    For each user, the catalog index of the first star within `threshold`
+    degrees of their zenith at their real Local Sidereal Time, or -1.
+    Users are processed in chunks so memory stays bounded at MAX_CHUNK_CELLS.
+    """
+    if columns is None:
+        columns = get_catalog_columns()
+    ra = columns["ra_degrees"]
+    dec = columns["declination"]
+
+    n_users = len(latitudes)
+    result = np.full(n_users, -1, dtype=np.int64)
+    if n_users == 0 or len(ra) == 0:
+        return result
+
+    jd = julian_date(utc_now)
+    chunk = max(1, MAX_CHUNK_CELLS // len(ra))
+    for start in range(0, n_users, chunk):
+        end = min(start + chunk, n_users)
+        lst = local_sidereal_time(jd, longitudes[start:end])
+
+        distance = zenith_distance(ra[None, :], dec[None, :], latitudes[start:end, None], lst[:, None])
+        aligned = distance < threshold
+
+        first = aligned.argmax(axis=1)
+        result[start:end] = np.where(aligned.any(axis=1), first, -1)
+
+    return result
+
+# -------------------------------
+# DATABASE I/O
+# -------------------------------
+
+def load_profile_locations(db) -> Dict[str, np.ndarray]:
+    """Load (user_id, latitude, longitude) for every profile with a location."""
+    rows = db.query(Profile.user_id, Profile.latitude, Profile.longitude).filter(
+        Profile.latitude.isnot(None),
+        Profile.longitude.isnot(None)
+    ).all()
+
+    return {
+        "user_id": np.array([r[0] for r in rows], dtype=np.int64),
+        "latitude": np.array([r[1] for r in rows], dtype=np.float64),
+        "longitude": np.array([r[2] for r in rows], dtype=np.float64),
+    }
+
+def sweep_encounters(db, utc_now: Optional[datetime] = None,
+                     threshold: float = STAR_ALIGNMENT_THRESHOLD) -> List[Dict]:
+    """
+    Compute pending encounters for every profile: users currently under a
+    star they have not collected yet.
+    """
+    if utc_now is None:
+        utc_now = datetime.utcnow()
+
+    # Refreshes the catalog from the `stars` table, so indices map to cache rows
+    cache = get_star_cache(db)
+    profiles = load_profile_locations(db)
+    local_hours = solar_local_hours(profiles["longitude"], utc_now)
+    star_idx = find_aligned_stars(
+        profiles["latitude"], profiles["longitude"], utc_now, threshold, cache.catalog.columns
+    )
+
+    hits = np.flatnonzero(star_idx >= 0)
+    if hits.size == 0:
+        return []
+
+    star_records = {i: cache.catalog.record(i) for i in np.unique(star_idx[hits]).tolist()}
+    hit_star_ids = {cache.rows[i].id for i in star_records}
+    already_collected = set(
+        db.query(CollectedStar.user_id, CollectedStar.star_id).filter(
+            CollectedStar.star_id.in_(hit_star_ids)
+        ).all()
+    )
+
+    encounters = []
+    for row in hits.tolist():
+        idx = int(star_idx[row])
+        star_id = cache.rows[idx].id
+        user_id = int(profiles["user_id"][row])
+        if (user_id, star_id) in already_collected:
+            continue
+        encounters.append({
+            "user_id": user_id,
+            "star_id": star_id,
+            "star": star_records[idx],
+            "latitude": float(profiles["latitude"][row]),
+            "longitude": float(profiles["longitude"][row]),
+            "local_hour": int(local_hours[row]),
+        })
+
+    return encounters
+
+def record_encounters(db, encounters: List[Dict], utc_now: datetime) -> int:
+    """
+    Bulk insert CollectedStar, StarNote and StarInteraction rows for the
+    given encounters using executemany batches. Returns the number recorded.
+    """
+    for start in range(0, len(encounters), INSERT_BATCH_SIZE):
+        batch = encounters[start:start + INSERT_BATCH_SIZE]
+        collected_rows, note_rows, interaction_rows = [], [], []
+
+        for enc in batch:
+            star = enc["star"]
+            time_of_day = get_time_of_day(enc["local_hour"])
+            season = get_season(utc_now.month, enc["latitude"])
+            message_data = generate_star_message(
+                star["name"], star["category"], star["personality"], time_of_day,
+                rng=get_star_rng(enc["user_id"], star["name"], utc_now, "message")
+            )
+
+            collected_rows.append({
+                "user_id": enc["user_id"],
+                "star_id": enc["star_id"],
+                "encounter_location_lat": enc["latitude"],
+                "encounter_location_lon": enc["longitude"],
+            })
+            note_rows.append({
+                "user_id": enc["user_id"],
+                "star_id": enc["star_id"],
+                "content": message_data["content"],
+                "note_type": message_data["note_type"],
+                "color": star["color"],
+            })
+            interaction_rows.append({
+                "user_id": enc["user_id"],
+                "star_id": enc["star_id"],
+                "interaction_type": "encounter",
+                "metadata": {
+                    "location_lat": enc["latitude"],
+                    "location_lon": enc["longitude"],
+                    "time_of_day": time_of_day,
+                    "season": season,
+                    "source": "sweep"
+                },
+            })
+
+        # Table-level inserts run as a single executemany per table
+        db.execute(CollectedStar.__table__.insert(), collected_rows)
+        db.execute(StarNote.__table__.insert(), note_rows)
+        db.execute(StarInteraction.__table__.insert(), interaction_rows)
+        db.commit()
+
+    return len(encounters)
+
+def run_sweep(dry_run: bool = False) -> bool:
+    """Run one sweep over all profiles and report timings."""
+    print("🔭 Sweeping profiles for star encounters...")
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        start = time.perf_counter()
+        encounters = sweep_encounters(db, now)
+        elapsed = time.perf_counter() - start
+        print(f"✓ Found {len(encounters)} pending encounters in {elapsed:.2f}s")
+
+        if dry_run:
+            print("Dry run - nothing recorded.")
+            return True
+
+        start = time.perf_counter()
+        recorded = record_encounters(db, encounters, now)
+        elapsed = time.perf_counter() - start
+        print(f"✓ Recorded {recorded} encounters in {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Sweep failed: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = run_sweep(dry_run="--dry-run" in sys.argv)
+    sys.exit(0 if success else 1)
@@ -2,10 +2,17 @@
 # 🌟 STAR SYSTEM - Core Logic
 # ======================================
 
+import hashlib
 import random
-from datetime import datetime
+from bisect import bisect_right
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 import math
+import numpy as np
+from astronomy import julian_date, local_sidereal_time, altitude_azimuth, angular_separation
+from sky_index import SkyIndex
+from star_catalog import StarCatalog, StarSubset
 
 # -------------------------------
 # STAR CATEGORIES & RARITIES
@@ -227,6 +234,11 @@ STAR_DATABASE = [
 HALF_CIRCLE_DEGREES = 180
 FULL_CIRCLE_DEGREES = 360
 STAR_VISIBILITY_WINDOW_DEGREES = 90  # 6 hours = 90 degrees
+STAR_ALIGNMENT_THRESHOLD = 5.0  # degrees from zenith that count as "beneath" a star
+# Seeded star randomness is stable for one (user, star) within this window
+STAR_RNG_BUCKET_SECONDS = 3600
+# Observers in the same cell and minute share one memoized sky (~11 km, <0.3° of sky drift)
+OBSERVER_CELL_DEGREES = 0.1
 
 def calculate_rarity_score(base_rarity: float, category: str, time_factors: Dict = None) -> float:
     """
@@ -253,42 +265,67 @@ def calculate_rarity_score(base_rarity: float, category: str, time_factors: Dict
     # Cap at 100
     return min(score, 100.0)
 
+# Tier names ordered by score, and the lower bound of every tier after the first
+RARITY_TIER_NAMES = [tier for tier, _ in sorted(RARITY_TIERS.items(), key=lambda t: t[1]["score_range"][0])]
+_RARITY_TIER_BOUNDS = [RARITY_TIERS[tier]["score_range"][0] for tier in RARITY_TIER_NAMES[1:]]
+
 def get_rarity_tier(score: float) -> str:
     """Get the rarity tier name based on score."""
-    for tier, data in RARITY_TIERS.items():
-        min_score, max_score = data["score_range"]
-        if min_score <= score < max_score:
-            return tier
-    return "Mythic"  # For scores >= 95
+    # Scores >= 95 (including a capped 100) land in Mythic
+    return RARITY_TIER_NAMES[bisect_right(_RARITY_TIER_BOUNDS, score)]
+
+def get_star_rng(user_id: Optional[int], star_name: str, when: Optional[datetime] = None,
+                 extra: str = "") -> random.Random:
+    """
+    Deterministic random stream for one (user, star, time bucket).
+    Seeded from a SHA-256 digest so every rerun and worker process draws
+    the same values, which makes star outcomes reproducible and cacheable.
+    """
+    if when is None:
+        when = datetime.now(timezone.utc)
+    elif when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    bucket = int(when.timestamp() // STAR_RNG_BUCKET_SECONDS)
+    key = f"{user_id}|{star_name}|{bucket}|{extra}"
+    seed = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big")
+    return random.Random(seed)
+
+# Higher rarity stars chat longer
+CHAT_DURATIONS = {
+    "Uncommon": 30,
+    "Rare": 60,
+    "Epic": 90,
+    "Legendary": 120,
+    "Mythic": 180
+}
 
-def can_star_chat(rarity_tier: str) -> Tuple[bool, int]:
+def can_star_chat(rarity_tier: str, rng: Optional[random.Random] = None) -> Tuple[bool, int]:
     """
     Determine if a star can chat based on its rarity.
     Returns (can_chat, duration_seconds)
+    Pass a seeded `rng` (see get_star_rng) for a reproducible result.
     """
+    rng = rng or random
     chat_chance = RARITY_TIERS[rarity_tier]["chat_chance"]
-    can_chat = random.random() < chat_chance
+    can_chat = rng.random() < chat_chance
     
     if can_chat:
-        # Higher rarity stars chat longer
-        durations = {
-            "Uncommon": 30,
-            "Rare": 60,
-            "Epic": 90,
-            "Legendary": 120,
-            "Mythic": 180
-        }
-        duration = durations.get(rarity_tier, 30)
-        return True, duration
+        return True, CHAT_DURATIONS.get(rarity_tier, 30)
     
     return False, 0
 
 def is_star_visible(star_ra: float, star_dec: float, user_lat: float, user_lon: float, 
-                    local_hour: int) -> bool:
+                    local_hour: int, observed_at: Optional[datetime] = None) -> bool:
     """
-    Simplified check if a star is visible from user's location at current time.
-    This is a basic approximation.
+    Check if a star is visible from user's location at current time.
+    With `observed_at` (UTC) the star must be above the horizon using real
+    sidereal time; without it this is the original hour-based approximation.
     """
+    if observed_at is not None:
+        lst = local_sidereal_time(julian_date(observed_at), user_lon)
+        altitude, _ = altitude_azimuth(star_ra * 15, star_dec, user_lat, lst)
+        return bool(altitude > 0)
+    
     # Convert local time to Local Sidereal Time (simplified)
     lst = (local_hour * 15 + user_lon) % FULL_CIRCLE_DEGREES
     
@@ -308,67 +345,321 @@ def is_star_visible(star_ra: float, star_dec: float, user_lat: float, user_lon:
     
     return True
 
+# -------------------------------
+# COLUMNAR CATALOG (VECTORIZED ENGINE)
+# -------------------------------
+
+_star_catalog: Optional[StarCatalog] = None
+# True while the catalog was installed by star_cache from the `stars` table
+_catalog_from_db = False
+_catalog_version = 0
+
+def _install_catalog(catalog: Optional[StarCatalog]):
+    global _star_catalog, _catalog_version
+    _star_catalog = catalog
+    _catalog_version += 1
+    _visible_indices_at.cache_clear()
+
+def set_star_catalog(catalog: Optional[StarCatalog]):
+    """
+    Serve `catalog` (e.g. the `stars` table, loaded by star_cache) instead
+    of STAR_DATABASE. Pass None to go back to STAR_DATABASE.
+    """
+    global _catalog_from_db
+    _catalog_from_db = catalog is not None
+    _install_catalog(catalog)
+
+def get_star_catalog() -> StarCatalog:
+    """Get the struct-of-arrays catalog (from star_cache, else lazily built from STAR_DATABASE)."""
+    # Rebuild if stars were appended to STAR_DATABASE after the first build
+    if _star_catalog is None or (not _catalog_from_db and len(_star_catalog) != len(STAR_DATABASE)):
+        _install_catalog(StarCatalog.from_star_list(STAR_DATABASE, STAR_CATEGORIES))
+    return _star_catalog
+
+def get_star_catalog_version() -> int:
+    """Incremented whenever the catalog is replaced; use it in cache keys derived from the catalog."""
+    get_star_catalog()
+    return _catalog_version
+
+def build_catalog_columns(stars: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Build a columnar view of a star list so the whole catalog can be
+    evaluated in one NumPy pass instead of dict-by-dict.
+    """
+    return StarCatalog.from_star_list(stars, STAR_CATEGORIES).columns
+
+def get_catalog_columns() -> Dict[str, np.ndarray]:
+    """Get the columnar view of the current catalog (shared with get_star_catalog)."""
+    return get_star_catalog().columns
+
+# -------------------------------
+# MEMOIZED OBSERVER SKY
+# -------------------------------
+
+def _observer_key(user_lat: float, user_lon: float, observed_at: datetime) -> Tuple[int, int, int]:
+    """(minute since epoch, latitude cell, longitude cell) for the sky memo."""
+    if observed_at.tzinfo is None:
+        observed_at = observed_at.replace(tzinfo=timezone.utc)
+    minute = int(observed_at.timestamp() // 60)
+    return (
+        minute,
+        int(math.floor(user_lat / OBSERVER_CELL_DEGREES)),
+        int(math.floor(user_lon / OBSERVER_CELL_DEGREES))
+    )
+
+@lru_cache(maxsize=512)
+def _visible_indices_at(minute: int, lat_cell: int, lon_cell: int) -> np.ndarray:
+    """
+    Catalog indices above the horizon for an observer cell during one minute,
+    evaluated at the cell centre and the start of the minute.
+    """
+    columns = get_catalog_columns()
+    when = datetime.fromtimestamp(minute * 60, tz=timezone.utc)
+    lat = (lat_cell + 0.5) * OBSERVER_CELL_DEGREES
+    lon = (lon_cell + 0.5) * OBSERVER_CELL_DEGREES
+    lst = local_sidereal_time(julian_date(when), lon)
+    altitude, _ = altitude_azimuth(columns["ra_degrees"], columns["declination"], lat, lst)
+    indices = np.flatnonzero(altitude > 0)
+    indices.setflags(write=False)
+    return indices
+
+def _time_factor_multipliers(local_hour: int, month: int) -> Tuple[float, float]:
+    """Hour and season multipliers, mirroring calculate_rarity_score."""
+    hour_factor = 1.0
+    if 0 <= local_hour < 6:
+        hour_factor = 1.2
+    elif local_hour >= 22:
+        hour_factor = 1.15
+
+    month_factor = 1.0
+    if month in [12, 1, 2]:
+        month_factor = 1.1
+    elif month in [6, 7, 8]:
+        month_factor = 0.95
+
+    return hour_factor, month_factor
+
+# -------------------------------
+# PRECOMPUTED RARITY TABLES
+# -------------------------------
+
+# Rarity only depends on (hour, month) through a handful of distinct
+# (hour_factor, month_factor) pairs, so the 24 x 12 x catalog table is
+# stored as a (24, 12) slot map plus one score/tier row per distinct pair.
+_rarity_table: Optional[Dict[str, np.ndarray]] = None
+_rarity_table_source: Optional[Dict[str, np.ndarray]] = None
+
+def build_rarity_table(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Precompute rarity scores and tier indices for every (hour, month) and star."""
+    factor_pairs = []
+    slots = np.zeros((24, 12), dtype=np.int64)
+    for hour in range(24):
+        for month in range(1, 13):
+            pair = _time_factor_multipliers(hour, month)
+            if pair not in factor_pairs:
+                factor_pairs.append(pair)
+            slots[hour, month - 1] = factor_pairs.index(pair)
+
+    base_scores = columns["base_rarity"] * columns["category_multiplier"]
+    hour_factors = np.array([pair[0] for pair in factor_pairs])[:, None]
+    month_factors = np.array([pair[1] for pair in factor_pairs])[:, None]
+    # Same multiplication order as calculate_rarity_score, so scores match exactly
+    scores = np.minimum(base_scores[None, :] * hour_factors * month_factors, 100.0)
+    tiers = np.searchsorted(_RARITY_TIER_BOUNDS, scores, side="right").astype(np.uint8)
+
+    return {"slots": slots, "scores": scores, "tiers": tiers}
+
+def get_rarity_table() -> Dict[str, np.ndarray]:
+    """Get the (lazily built) rarity table for the current catalog."""
+    global _rarity_table, _rarity_table_source
+    columns = get_catalog_columns()
+    if _rarity_table is None or _rarity_table_source is not columns:
+        _rarity_table = build_rarity_table(columns)
+        _rarity_table_source = columns
+    return _rarity_table
+
+def lookup_rarity(indices: np.ndarray, local_hour: int, month: int,
+                  table: Dict[str, np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Rarity scores and tier indices (into RARITY_TIER_NAMES) for catalog stars."""
+    if table is None:
+        table = get_rarity_table()
+    slot = table["slots"][local_hour % 24, (month - 1) % 12]
+    return table["scores"][slot, indices], table["tiers"][slot, indices]
+
+def compute_visibility_batch(user_lat: float, user_lon: float, local_hour: int, month: int,
+                             columns: Dict[str, np.ndarray] = None,
+                             observed_at: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate visibility and rarity for the whole catalog in one vectorized pass.
+    Returns (indices of visible stars, their rarity scores), in catalog order.
+    With `observed_at` (UTC) visibility uses real altitudes, memoized per
+    (minute, observer cell) for the default catalog.
+    """
+    if columns is None:
+        columns = get_catalog_columns()
+
+    if observed_at is not None and columns is get_catalog_columns():
+        indices = _visible_indices_at(*_observer_key(user_lat, user_lon, observed_at))
+    elif observed_at is not None:
+        lst = local_sidereal_time(julian_date(observed_at), user_lon)
+        altitude, _ = altitude_azimuth(columns["ra_degrees"], columns["declination"], user_lat, lst)
+        indices = np.flatnonzero(altitude > 0)
+    else:
+        # Same simplified Local Sidereal Time as is_star_visible
+        lst = (local_hour * 15 + user_lon) % FULL_CIRCLE_DEGREES
+
+        ra_diff = np.abs(columns["ra_degrees"] - lst)
+        ra_diff = np.where(ra_diff > HALF_CIRCLE_DEGREES, FULL_CIRCLE_DEGREES - ra_diff, ra_diff)
+
+        dec = columns["declination"]
+        visible = (
+            (ra_diff <= STAR_VISIBILITY_WINDOW_DEGREES)
+            & (dec >= user_lat - 90)
+            & (dec <= user_lat + 90)
+        )
+        indices = np.flatnonzero(visible)
+
+    if columns is get_catalog_columns():
+        scores, _ = lookup_rarity(indices, local_hour, month)
+    else:
+        hour_factor, month_factor = _time_factor_multipliers(local_hour, month)
+        scores = columns["base_rarity"][indices] * columns["category_multiplier"][indices]
+        scores = np.minimum(scores * hour_factor * month_factor, 100.0)
+
+    return indices, scores
+
+# Per tier index (into RARITY_TIER_NAMES), for rolling whole arrays of stars
+_TIER_CHAT_CHANCE = np.array([RARITY_TIERS[tier]["chat_chance"] for tier in RARITY_TIER_NAMES])
+_TIER_CHAT_DURATION = np.array([CHAT_DURATIONS.get(tier, 30) for tier in RARITY_TIER_NAMES], dtype=np.int32)
+
+def _encounter_subset(indices: np.ndarray, local_hour: int, month: int,
+                      user_id: Optional[int], observed_at: Optional[datetime]) -> StarSubset:
+    """
+    Wrap catalog indices with their rarity and chat outcome, without copying star data.
+    Unseeded rolls are drawn for the whole array at once. Seeded rolls need
+    a SHA-256 per star, so they are deferred until a row is read; stars in
+    tiers that never chat are settled up front either way.
+    """
+    scores, tiers = lookup_rarity(indices, local_hour, month)
+    chance = _TIER_CHAT_CHANCE[tiers]
+    durations = np.zeros(len(indices), dtype=np.int32)
+    catalog = get_star_catalog()
+
+    if user_id is None:
+        can_chat = np.random.random(len(indices)) < chance
+        durations[can_chat] = _TIER_CHAT_DURATION[tiers[can_chat]]
+        return StarSubset(catalog, indices, scores, tiers, can_chat, durations, RARITY_TIER_NAMES)
+
+    def roll_chat(idx: int, tier: int) -> Tuple[bool, int]:
+        return can_star_chat(RARITY_TIER_NAMES[tier], get_star_rng(user_id, catalog.names[idx], observed_at))
+
+    return StarSubset(catalog, indices, scores, tiers, np.zeros(len(indices), dtype=bool), durations,
+                      RARITY_TIER_NAMES, chat_rolled=chance <= 0, roll_chat=roll_chat)
+
+def get_visible_star_subset(user_lat: float, user_lon: float, local_hour: int, month: int,
+                            observed_at: Optional[datetime] = None,
+                            user_id: Optional[int] = None) -> StarSubset:
+    """
+    Like get_visible_stars, but returns a zero-copy StarSubset whose rows
+    are dict-like StarView objects created only when accessed.
+    """
+    indices, _ = compute_visibility_batch(
+        user_lat, user_lon, local_hour, month, observed_at=observed_at
+    )
+    return _encounter_subset(indices, local_hour, month, user_id, observed_at)
+
 def get_visible_stars(user_lat: float, user_lon: float, local_hour: int, 
-                      month: int) -> List[Dict]:
+                      month: int, observed_at: Optional[datetime] = None,
+                      user_id: Optional[int] = None) -> List[Dict]:
     """
     Get list of stars currently visible from user's location.
+    Pass `observed_at` (UTC) to use real sidereal time instead of local_hour,
+    and `user_id` to make can_chat deterministic per (user, star, hour).
     """
-    visible = []
-    time_factors = {"hour": local_hour, "month": month}
-    
-    for star_data in STAR_DATABASE:
-        if is_star_visible(star_data["right_ascension"], star_data["declination"],
-                          user_lat, user_lon, local_hour):
-            # Calculate current rarity score
-            rarity_score = calculate_rarity_score(
-                star_data["base_rarity"],
-                star_data["category"],
-                time_factors
-            )
-            rarity_tier = get_rarity_tier(rarity_score)
-            can_chat, chat_duration = can_star_chat(rarity_tier)
-            
-            visible.append({
-                **star_data,
-                "rarity_score": rarity_score,
-                "rarity_tier": rarity_tier,
-                "can_chat": can_chat,
-                "chat_duration": chat_duration
-            })
-    
-    return visible
+    return get_visible_star_subset(
+        user_lat, user_lon, local_hour, month, observed_at, user_id
+    ).to_dicts()
+
+_sky_index: Optional[SkyIndex] = None
+_sky_index_source: Optional[Dict[str, np.ndarray]] = None
+
+def get_sky_index() -> SkyIndex:
+    """Get the (lazily built) RA/Dec grid index over the current catalog."""
+    global _sky_index, _sky_index_source
+    columns = get_catalog_columns()
+    if _sky_index is None or _sky_index_source is not columns:
+        _sky_index = SkyIndex(columns["ra_degrees"], columns["declination"])
+        _sky_index_source = columns
+    return _sky_index
 
 def check_star_alignment(user_lat: float, user_lon: float, local_hour: int,
-                         month: int, threshold: float = 0.5) -> Optional[Dict]:
+                         month: int, threshold: float = 0.5,
+                         observed_at: Optional[datetime] = None,
+                         user_id: Optional[int] = None) -> Optional[Dict]:
     """
     Check if user is currently "beneath" a star (within threshold degrees).
     Returns star data if aligned, None otherwise.
+    With `observed_at` (UTC) the threshold is the true angular distance
+    from the zenith at the real Local Sidereal Time; `user_id` seeds can_chat.
     """
-    visible_stars = get_visible_stars(user_lat, user_lon, local_hour, month)
+    if observed_at is not None:
+        lst = float(local_sidereal_time(julian_date(observed_at), user_lon))
+        # Anything within 90° of the zenith is above the horizon
+        radius = min(threshold, STAR_VISIBILITY_WINDOW_DEGREES)
+        idx = get_sky_index().first_within(lst, user_lat, radius)
+    elif threshold > STAR_VISIBILITY_WINDOW_DEGREES:
+        # Wider than the visibility window, alignment no longer implies visibility
+        return _check_star_alignment_linear(user_lat, user_lon, local_hour, month, threshold,
+                                            observed_at, user_id)
+    else:
+        lst = (local_hour * 15 + user_lon) % FULL_CIRCLE_DEGREES
+        idx = get_sky_index().first_at_zenith(lst, user_lat, threshold)
+    
+    if idx is None:
+        return None
     
-    # Check each visible star for alignment
-    for star in visible_stars:
+    subset = _encounter_subset(np.array([idx]), local_hour, month, user_id, observed_at)
+    return subset[0].to_dict()
+
+def _check_star_alignment_linear(user_lat: float, user_lon: float, local_hour: int,
+                                 month: int, threshold: float,
+                                 observed_at: Optional[datetime] = None,
+                                 user_id: Optional[int] = None) -> Optional[Dict]:
+    """
+    Full scan over visible stars; used when the threshold is too wide to index.
+    Takes the same `observed_at` and `user_id` as check_star_alignment and
+    applies the same test, so both paths find the same star with the same chat roll.
+    """
+    visible_stars = get_visible_star_subset(user_lat, user_lon, local_hour, month, observed_at, user_id)
+    columns = get_catalog_columns()
+    ra_degrees = columns["ra_degrees"][visible_stars.indices]
+    declination = columns["declination"][visible_stars.indices]
+
+    if observed_at is not None:
+        # True angular distance from the zenith, as in the indexed path
+        lst = float(local_sidereal_time(julian_date(observed_at), user_lon))
+        aligned = angular_separation(ra_degrees, declination, lst, user_lat) < threshold
+    else:
         # Calculate if star is near zenith (simplified)
-        ra_degrees = star["right_ascension"] * 15
         lst = (local_hour * 15 + user_lon) % FULL_CIRCLE_DEGREES
-        
-        ra_diff = abs(ra_degrees - lst)
-        if ra_diff > HALF_CIRCLE_DEGREES:
-            ra_diff = FULL_CIRCLE_DEGREES - ra_diff
-        
-        dec_diff = abs(star["declination"] - user_lat)
-        
-        # If star is very close to being directly overhead
-        if ra_diff < threshold and dec_diff < threshold:
-            return star
-    
-    return None
+        ra_diff = np.abs(ra_degrees - lst)
+        ra_diff = np.where(ra_diff > HALF_CIRCLE_DEGREES, FULL_CIRCLE_DEGREES - ra_diff, ra_diff)
+        aligned = (ra_diff < threshold) & (np.abs(declination - user_lat) < threshold)
+
+    # Visible stars are in catalog order, so this is the lowest catalog index
+    matches = np.flatnonzero(aligned)
+    if matches.size == 0:
+        return None
+    return visible_stars[int(matches[0])].to_dict()
 
 def generate_star_message(star_name: str, star_category: str, 
-                         star_personality: str, time_of_day: str) -> Dict:
+                         star_personality: str, time_of_day: str,
+                         rng: Optional[random.Random] = None) -> Dict:
     """
     Generate a message/poem from a star based on its properties and time of day.
+    Pass a seeded `rng` (see get_star_rng) for a reproducible message.
     """
+    rng = rng or random
     messages_by_time = {
         "Dawn": [
             f"As the first light touches the horizon, I, {star_name}, whisper to you: 'Every ending is a beginning in disguise.' ✨",
@@ -403,14 +694,14 @@ def generate_star_message(star_name: str, star_category: str,
     }
     
     message_options = messages_by_time.get(time_of_day, messages_by_time["Night"])
-    message = random.choice(message_options)
+    message = rng.choice(message_options)
     
     # Add personality note
     personality_note = f"\n\n~ {star_personality}"
     
     return {
         "content": message + personality_note,
-        "note_type": random.choice(["poem", "wisdom", "insight", "uplifting"]),
+        "note_type": rng.choice(["poem", "wisdom", "insight", "uplifting"]),
         "signature": f"✨ {star_name} from the {star_category} Realm"
     }
 
@@ -424,11 +715,14 @@ STAR_CHAT_RESPONSES = [
     "✨ The universe whispers back through me: you are seen, you are valued.",
 ]
 
-def get_star_chat_response(star_name: str, star_personality: str, user_message: str) -> str:
+def get_star_chat_response(star_name: str, star_personality: str, user_message: str,
+                           rng: Optional[random.Random] = None) -> str:
     """
     Generate a chat response from a star.
+    Pass a seeded `rng` (see get_star_rng) for a reproducible reply.
     """
-    response = random.choice(STAR_CHAT_RESPONSES)
+    rng = rng or random
+    response = rng.choice(STAR_CHAT_RESPONSES)
     if "{personality}" in response:
         response = response.format(personality=star_personality)
     return f"**{star_name}:** {response}"
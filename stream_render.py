@@ -0,0 +1,31 @@
+# ======================================
+# 📡 STREAM RENDER - Cards That Fill In As Replies Arrive
+# ======================================
+
+import time
+from typing import Callable, Iterable
+import streamlit as st
+
+# Shortest gap between redraws of a streaming card, in seconds
+STREAM_REDRAW_SECONDS = 0.05
+
+def stream_card(tokens: Iterable[str], render: Callable[[str], str]) -> str:
+    """
+    Draw the card `render(text)` and redraw it as `tokens` arrive, so the
+    reply fills in instead of appearing all at once. Returns the full text;
+    if `tokens` raises, the card keeps what arrived and the error propagates.
+    """
+    placeholder = st.empty()
+    text = ""
+    last_drawn = 0.0
+    try:
+        for token in tokens:
+            text += token
+            now = time.monotonic()
+            if now - last_drawn >= STREAM_REDRAW_SECONDS:
+                placeholder.markdown(render(text + " ▌"), unsafe_allow_html=True)
+                last_drawn = now
+    finally:
+        if text:
+            placeholder.markdown(render(text), unsafe_allow_html=True)
+    return text